@@ -0,0 +1,7 @@
+# Benchmark suite for engine, simulator, protocol and server hot paths
+from .runner import (
+    BenchmarkCase, BenchmarkComparison, BenchmarkResult, compare_results, load_results, run_benchmarks,
+    save_results
+)
+
+__all__ = ['BenchmarkCase', 'BenchmarkResult', 'BenchmarkComparison', 'run_benchmarks', 'save_results', 'load_results', 'compare_results']
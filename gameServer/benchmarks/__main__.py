@@ -0,0 +1,7 @@
+"""python -m benchmarks 入口 (於 gameServer 目錄執行)"""
+
+import sys
+
+from benchmarks.runner import main
+
+sys.exit(main())
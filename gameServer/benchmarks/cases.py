@@ -0,0 +1,314 @@
+"""
+引擎、模擬器、協定與輸出器的基準測試案例
+所有案例使用固定種子的隨機數流，每次執行量測相同的工作
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Dict, List
+
+import numpy as np
+
+from benchmarks.runner import BenchmarkCase
+from core.game_engine import GameEngine, SpinType
+from core.rng import RandomStream
+from protocol.event_log_exporter import EventLogExporter
+from protocol.json_exporter import ProtoJSONExporter
+from protocol.simple_data_exporter import SimpleDataExporter
+from protocol.simple_proto import (
+    EMSGID, ESTATEID, Header, ResultRecall, SlotResult, StripsRecall, WinLine as ProtoWinLine,
+    parse_protobuf_message
+)
+from simulation.simulator import GameSimulator, SimulationConfig
+
+SEED = 152
+BATCH_SIZE = 1024        # 批量 API 每次操作的旋轉或盤面數
+GRID_POOL_SIZE = 1024    # 逐盤面案例輪流使用的盤面數
+EXPORT_RECORDS = 256     # 輸出器每次操作的結果筆數
+
+
+def _engine(seed: int = SEED) -> GameEngine:
+    """固定種子、積分充足的引擎"""
+    engine = GameEngine(rng=RandomStream(seed))
+    engine.player_credit = 10 ** 15
+    return engine
+
+
+def _sample_grids(engine: GameEngine, count: int) -> List[List[List[int]]]:
+    """以引擎抽取 count 個基礎遊戲盤面"""
+    return [list(map(list, grid)) for grid in engine.spin_batch(count).reel_results.tolist()]
+
+
+def _detailed_results(engine: GameEngine, count: int) -> List[Dict[str, Any]]:
+    """與 run_simulation_with_json_export 相同格式的詳細旋轉結果 (含有贏線的盤面)"""
+    results = []
+    for spin_number in range(1, count + 1):
+        result = engine.spin()
+        results.append({
+            "spin_number": spin_number,
+            "reels": result.reel_result,
+            "total_win": result.total_credit,
+            "wins": [{"symbol": line.symbol_id, "pay": line.credit, "positions": line.positions,
+                      "multiplier": line.multiplier, "way_id": line.line_no} for line in result.win_lines],
+            "free_spins_awarded": result.free_spins_awarded if result.is_feature_trigger else 0,
+            "scatter_count": 0,
+            "scatter_pay": result.scatter_win,
+            "war_drums_result": {},
+            "is_feature_buy": False,
+            "remaining_credit": engine.player_credit,
+            "bet_amount": engine.current_bet,
+            "spin_type": SpinType.NORMAL.name
+        })
+    return results
+
+
+def _winning_result_recall(engine: GameEngine) -> ResultRecall:
+    """有中獎線的 ResultRecall (與 /ws ResultCall 回應相同的結構)"""
+    while True:
+        result = engine.spin()
+        if result.win_lines:
+            break
+    win_lines = [ProtoWinLine(win_line_type=0, line_no=line.line_no, symbol_id=line.symbol_id,
+                              pos=line.positions, credit=line.credit, multiplier=line.multiplier,
+                              credit_long=line.credit) for line in result.win_lines]
+    slot_result = SlotResult(module_id="BS", credit=result.total_credit, rng=list(result.stop_positions),
+                             win_line_group=win_lines)
+    return ResultRecall(result=slot_result, player_cent=1000000, next_module="BS")
+
+
+# ==================== 引擎 ====================
+
+@contextmanager
+def engine_spin():
+    """GameEngine.spin 一般旋轉"""
+    engine = _engine()
+
+    def operation(count: int):
+        # 觸發免費旋轉只設定剩餘次數，不影響後續一般旋轉
+        spin = engine.spin
+        for _ in range(count):
+            spin()
+
+    yield operation
+
+
+@contextmanager
+def engine_spin_free_game():
+    """GameEngine.spin_free_game 三面戰鼓的免費旋轉"""
+    engine = _engine()
+
+    def operation(count: int):
+        # 每次設定一次剩餘免費旋轉與三面戰鼓 (最多戰鼓的購買選項)
+        spin_free_game = engine.spin_free_game
+        for _ in range(count):
+            engine.free_spins_remaining = 1
+            engine.drums_count = 3
+            spin_free_game()
+
+    yield operation
+
+
+@contextmanager
+def engine_spin_batch():
+    """GameEngine.spin_batch 批量一般旋轉"""
+    engine = _engine()
+
+    def operation(count: int):
+        for _ in range(count):
+            engine.spin_batch(BATCH_SIZE)
+
+    yield operation
+
+
+@contextmanager
+def engine_feature_rounds_batch():
+    """FeatureRoundEvaluator.play_rounds 批量免費旋轉回合 (三面戰鼓)"""
+    from core.feature_round import FeatureRoundEvaluator
+
+    evaluator = FeatureRoundEvaluator.from_engine(_engine())
+
+    def operation(count: int):
+        for _ in range(count):
+            evaluator.play_rounds(BATCH_SIZE, drums=3)
+
+    yield operation
+
+
+@contextmanager
+def simulator_batch_simulation():
+    """GameSimulator.run_batch_simulation (含預設購買策略)"""
+    simulator = GameSimulator()
+    simulator.print_stage_profile = False
+    config = SimulationConfig(total_spins=BATCH_SIZE * 16, seed=SEED)
+
+    def operation(count: int):
+        for _ in range(count):
+            simulator.run_batch_simulation(config)
+        simulator.simulation_history.clear()
+
+    yield operation
+
+
+# ==================== 贏分計算與符號變換 ====================
+
+@contextmanager
+def win_calculator_243_ways():
+    """WinCalculator.calculate_243_ways 逐盤面計算"""
+    engine = _engine()
+    grids = _sample_grids(engine, GRID_POOL_SIZE)
+    calculate = engine.win_calculator.calculate_243_ways
+
+    def operation(count: int):
+        for index in range(count):
+            calculate(grids[index % GRID_POOL_SIZE])
+
+    yield operation
+
+
+@contextmanager
+def win_calculator_243_ways_batch():
+    """WinCalculator.calculate_243_ways_batch 批量計算"""
+    engine = _engine()
+    grids = np.asarray(_sample_grids(engine, BATCH_SIZE))
+    calculate = engine.win_calculator.calculate_243_ways_batch
+
+    def operation(count: int):
+        for _ in range(count):
+            calculate(grids)
+
+    yield operation
+
+
+@contextmanager
+def symbol_transformer_transform():
+    """SymbolTransformer.transform_symbols 逐盤面變換"""
+    engine = _engine()
+    grids = _sample_grids(engine, GRID_POOL_SIZE)
+    transform = engine.symbol_transformer.transform_symbols
+
+    def operation(count: int):
+        for index in range(count):
+            transform(grids[index % GRID_POOL_SIZE])
+
+    yield operation
+
+
+# ==================== 協定 ====================
+
+@contextmanager
+def proto_result_recall():
+    """有中獎線的 ResultRecall 序列化"""
+    message = _winning_result_recall(_engine())
+
+    def operation(count: int):
+        for _ in range(count):
+            message.SerializeToString()
+
+    yield operation
+
+
+@contextmanager
+def proto_strips_recall():
+    """引擎滾輪條帶的 StripsRecall 序列化"""
+    message = StripsRecall(strips=_engine().reel_strips)
+
+    def operation(count: int):
+        for _ in range(count):
+            message.SerializeToString()
+
+    yield operation
+
+
+def state_call_bytes(stateid: int = ESTATEID.K_SPIN) -> bytes:
+    """前端發送的 StateCall (msgid、stateid)"""
+    data = bytearray()
+    data.append((1 << 3) | 0)
+    data.extend(Header._encode_varint(EMSGID.eStateCall))
+    data.append((3 << 3) | 0)
+    data.extend(Header._encode_varint(stateid))
+    return bytes(data)
+
+
+@contextmanager
+def proto_parse_message():
+    """StateCall 解析"""
+    data = state_call_bytes()
+
+    def operation(count: int):
+        for _ in range(count):
+            parse_protobuf_message(data)
+
+    yield operation
+
+
+# ==================== 輸出器 ====================
+
+@contextmanager
+def exporter_simple_data():
+    """SimpleDataExporter 轉換並寫入檔案"""
+    results = _detailed_results(_engine(), EXPORT_RECORDS)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "game_results.json")
+
+        def operation(count: int):
+            for _ in range(count):
+                exporter = SimpleDataExporter()
+                for result in results:
+                    exporter.add_result(result)
+                exporter.export_to_json(path)
+
+        yield operation
+
+
+@contextmanager
+def exporter_event_log():
+    """EventLogExporter 轉換並寫入檔案"""
+    results = _detailed_results(_engine(), EXPORT_RECORDS)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "event_log_results.json")
+
+        def operation(count: int):
+            for _ in range(count):
+                exporter = EventLogExporter()
+                for result in results:
+                    exporter.add_result_event(result)
+                exporter.export_to_json(path)
+
+        yield operation
+
+
+@contextmanager
+def exporter_proto_json():
+    """ProtoJSONExporter 批量轉換並寫入檔案"""
+    results = _detailed_results(_engine(), EXPORT_RECORDS)
+    with tempfile.TemporaryDirectory() as directory:
+        exporter = ProtoJSONExporter(directory)
+        bet_amounts = [result["bet_amount"] for result in results]
+
+        def operation(count: int):
+            for _ in range(count):
+                exporter.save_batch_results(results, bet_amounts, "batch_results.json")
+
+        yield operation
+
+
+def core_cases() -> List[BenchmarkCase]:
+    """引擎、模擬器、協定與輸出器案例"""
+    return [
+        BenchmarkCase("engine.spin", engine_spin, "spins"),
+        BenchmarkCase("engine.spin_free_game", engine_spin_free_game, "spins"),
+        BenchmarkCase("engine.spin_batch", engine_spin_batch, "spins", scale=BATCH_SIZE),
+        BenchmarkCase("engine.feature_rounds_batch", engine_feature_rounds_batch, "rounds", scale=BATCH_SIZE),
+        BenchmarkCase("simulator.batch_simulation", simulator_batch_simulation, "spins", scale=BATCH_SIZE * 16),
+        BenchmarkCase("win_calculator.calculate_243_ways", win_calculator_243_ways, "grids"),
+        BenchmarkCase("win_calculator.calculate_243_ways_batch", win_calculator_243_ways_batch, "grids",
+                      scale=BATCH_SIZE),
+        BenchmarkCase("symbol_transformer.transform_symbols", symbol_transformer_transform, "grids"),
+        BenchmarkCase("proto.result_recall.serialize", proto_result_recall, "messages"),
+        BenchmarkCase("proto.strips_recall.serialize", proto_strips_recall, "messages"),
+        BenchmarkCase("proto.parse_message", proto_parse_message, "messages"),
+        BenchmarkCase("exporter.simple_data", exporter_simple_data, "records", scale=EXPORT_RECORDS),
+        BenchmarkCase("exporter.event_log", exporter_event_log, "records", scale=EXPORT_RECORDS),
+        BenchmarkCase("exporter.proto_json", exporter_proto_json, "records", scale=EXPORT_RECORDS),
+    ]
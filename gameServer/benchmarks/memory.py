@@ -0,0 +1,203 @@
+"""
+記憶體用量基準測試 - 以 tracemalloc 與 RSS 量測長時間模擬的記憶體用量與各結構每次旋轉的大小
+每個量測在獨立的子進程中執行 (RSS 不會因前一次量測而偏低)，
+任一量測的 RSS 峰值超過記憶體上限 (simulation_config.json performance.max_memory_mb) 時 main() 返回 1
+
+用法：
+    python -m benchmarks.memory                                  # 三種模擬 x 10k/100k/1M 次旋轉
+    python -m benchmarks.memory --runs json_export --spins 100000 --no-trace
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from simulation.memory import MB, deep_sizeof, measure_memory
+from simulation.simulator import GameSimulator, SimulationConfig
+
+SEED = 152
+DEFAULT_SPINS = [10000, 100000, 1000000]
+DEFAULT_OUTPUT = os.path.join("benchmarks", "results", "memory.json")
+VOLATILITY_SESSIONS = 100
+
+
+@dataclass
+class MemoryRunResult:
+    """一次模擬的記憶體用量 (bytes)"""
+    name: str
+    spins: int
+    elapsed: float
+    rss_peak: int                   # 進程 RSS 峰值 (與記憶體上限比較)
+    rss_peak_delta: int             # 模擬期間 RSS 增加量
+    traced_peak: Optional[int]      # tracemalloc 配置峰值
+    structures: Dict[str, int] = field(default_factory=dict)  # 各結構於模擬結束時的大小
+    spilled: bool = False           # JSON 輸出的詳細結果是否溢出至磁碟
+
+    def bytes_per_spin(self) -> Dict[str, float]:
+        """RSS 增加量、配置峰值與各結構的每次旋轉大小"""
+        per_spin = {"rss_peak_delta": self.rss_peak_delta / self.spins}
+        if self.traced_peak is not None:
+            per_spin["traced_peak"] = self.traced_peak / self.spins
+        per_spin.update({name: size / self.spins for name, size in self.structures.items()})
+        return per_spin
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["bytes_per_spin"] = self.bytes_per_spin()
+        return data
+
+
+# ==================== 模擬與結構 ====================
+
+def _run_basic(simulator: GameSimulator, spins: int, max_memory_mb: Optional[float], directory: str):
+    return simulator.run_basic_simulation(SimulationConfig(total_spins=spins, seed=SEED,
+                                                           max_memory_mb=max_memory_mb))
+
+
+def _basic_structures(simulator: GameSimulator, result) -> Dict[str, int]:
+    return {
+        "win_sketch": deep_sizeof(result.win_sketch),
+        "moments": deep_sizeof([result.win_moments, result.net_moments, result.feature_moments]),
+        "game_history": deep_sizeof(simulator.game_engine.game_history),
+        "evaluation_cache": deep_sizeof(simulator.game_engine.evaluation_cache._entries)
+    }
+
+
+def _run_volatility(simulator: GameSimulator, spins: int, max_memory_mb: Optional[float], directory: str):
+    return simulator.run_volatility_analysis(VOLATILITY_SESSIONS, max(1, spins // VOLATILITY_SESSIONS))
+
+
+def _volatility_structures(simulator: GameSimulator, result) -> Dict[str, int]:
+    return {
+        "session_results": deep_sizeof(simulator.simulation_history),  # 每場次一筆 SimulationResult
+        "game_history": deep_sizeof(simulator.game_engine.game_history),
+        "evaluation_cache": deep_sizeof(simulator.game_engine.evaluation_cache._entries)
+    }
+
+
+def _run_json_export(simulator: GameSimulator, spins: int, max_memory_mb: Optional[float], directory: str):
+    config = SimulationConfig(total_spins=spins, seed=SEED, max_memory_mb=max_memory_mb)
+    return simulator.run_simulation_with_json_export(config, output_dir=directory)
+
+
+def _json_export_structures(simulator: GameSimulator, output) -> Dict[str, int]:
+    result, files = output
+    return {
+        "detailed_results": result.record_buffer["memory_bytes"],
+        "spill_file": result.record_buffer["spill_bytes"],
+        "output_files": sum(os.path.getsize(path) for path in (files or {}).values())
+    }
+
+
+RUNS: Dict[str, Tuple[Callable, Callable]] = {
+    "basic_simulation": (_run_basic, _basic_structures),
+    "volatility_analysis": (_run_volatility, _volatility_structures),
+    "json_export": (_run_json_export, _json_export_structures),
+}
+
+
+def measure_run(name: str, spins: int, max_memory_mb: Optional[float] = None,
+                trace: bool = True) -> MemoryRunResult:
+    """在目前進程中量測一次模擬 (模擬器建立不計入，模擬輸出不顯示)"""
+    run, structures = RUNS[name]
+    simulator = GameSimulator()
+    with tempfile.TemporaryDirectory() as directory:
+        with contextlib.redirect_stdout(io.StringIO()):
+            with measure_memory(trace) as measurement:
+                output = run(simulator, spins, max_memory_mb, directory)
+        sizes = structures(simulator, output)
+    spilled = name == "json_export" and output[0].record_buffer["spilled"]
+    return MemoryRunResult(name, spins, measurement.elapsed, measurement.rss_peak,
+                           measurement.rss_peak_delta, measurement.traced_peak, sizes, spilled)
+
+
+def run_memory_benchmarks(runs: Sequence[str], spins: Sequence[int], max_memory_mb: Optional[float] = None,
+                          trace: bool = True, isolate: bool = True,
+                          verbose: bool = True) -> List[MemoryRunResult]:
+    """依序量測各模擬與旋轉次數 (isolate 時每次量測使用新的子進程)"""
+    results = []
+    for name in runs:
+        if name not in RUNS:
+            raise ValueError(f"未知的模擬: {name} (可用: {', '.join(RUNS)})")
+        for count in spins:
+            if isolate:
+                context = multiprocessing.get_context("spawn")
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    result = executor.submit(measure_run, name, count, max_memory_mb, trace).result()
+            else:
+                result = measure_run(name, count, max_memory_mb, trace)
+            results.append(result)
+            if verbose:
+                print(format_result(result))
+    return results
+
+
+def format_result(result: MemoryRunResult) -> str:
+    """單次量測摘要 (各結構以每次旋轉 bytes 表示)"""
+    per_spin = result.bytes_per_spin()
+    traced = f"{result.traced_peak / MB:>9.1f}" if result.traced_peak is not None else f"{'-':>9}"
+    lines = [f"  {result.name:<20}{result.spins:>10,} 次  RSS 峰值 {result.rss_peak / MB:>8.1f} MB "
+             f"(+{result.rss_peak_delta / MB:.1f})  配置峰值 {traced} MB  "
+             f"{per_spin['rss_peak_delta']:>8.1f} B/轉  {result.elapsed:>7.1f} 秒"
+             + ("  💾 已溢出" if result.spilled else "")]
+    for name, size in result.structures.items():
+        lines.append(f"      {name:<20}{size / MB:>10.2f} MB{size / result.spins:>12.1f} B/轉")
+    return "\n".join(lines)
+
+
+def save_memory_results(results: Sequence[MemoryRunResult], path: str,
+                        max_memory_mb: Optional[float]) -> Dict[str, Any]:
+    """將量測結果寫入 JSON"""
+    data = {
+        "timestamp": datetime.now().isoformat(),
+        "max_memory_mb": max_memory_mb,
+        "results": [result.to_dict() for result in results]
+    }
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    return data
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """命令列入口，RSS 峰值超過記憶體上限時返回 1"""
+    from config.config_manager import get_simulation_settings
+
+    parser = argparse.ArgumentParser(description="好運咚咚模擬記憶體用量基準測試")
+    parser.add_argument("--runs", nargs="+", default=list(RUNS), choices=list(RUNS), help="量測的模擬")
+    parser.add_argument("--spins", nargs="+", type=int, default=DEFAULT_SPINS, help="旋轉次數")
+    parser.add_argument("--max-memory-mb", type=float, default=get_simulation_settings().max_memory_mb,
+                        help="記憶體上限 (預設讀取 simulation_config.json，0 為不限制)")
+    parser.add_argument("--no-trace", action="store_true", help="不使用 tracemalloc (只量測 RSS，較快)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="結果 JSON 路徑")
+    args = parser.parse_args(argv)
+
+    max_memory_mb = args.max_memory_mb or None
+    print(f"🧠 記憶體用量基準測試 (上限 {max_memory_mb or '不限制'} MB)")
+    results = run_memory_benchmarks(args.runs, args.spins, max_memory_mb, trace=not args.no_trace)
+    save_memory_results(results, args.output, max_memory_mb)
+    print(f"📄 結果已保存: {args.output}")
+
+    if max_memory_mb is not None:
+        over_budget = [f"{result.name} ({result.spins:,})" for result in results
+                       if result.rss_peak > max_memory_mb * MB]
+        if over_budget:
+            print(f"❌ RSS 峰值超過 {max_memory_mb} MB: {', '.join(over_budget)}")
+            return 1
+    print("✅ 所有量測都在記憶體上限內")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+"""
+基準測試執行器 - 量測各熱路徑的吞吐量或延遲，輸出 JSON 並與儲存的基準比較
+吞吐量案例以自動調整的次數重複量測取最佳值 (每秒操作數，越高越好)；
+延遲案例逐次計時取中位數 (毫秒，越低越好)。
+任一指標相對基準退步超過門檻時 main() 返回 1，找不到基準時返回 2 (除非指定 --update-baseline)
+
+基準 benchmarks/baseline.json 隨程式碼提交；數值依機器而異，
+CI 機器首次執行或更換機器時以 --update-baseline 產生基準並提交，之後每次執行與其比較
+
+用法：
+    python -m benchmarks                          # 執行並與 benchmarks/baseline.json 比較
+    python -m benchmarks --update-baseline        # 以本次結果建立或更新基準
+    python -m benchmarks --filter engine --quick  # 只執行名稱含 engine 的案例 (短時間)
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from contextlib import AbstractContextManager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_OUTPUT = os.path.join("benchmarks", "results", "latest.json")
+DEFAULT_BASELINE = os.path.join("benchmarks", "baseline.json")
+
+
+@dataclass
+class BenchmarkCase:
+    """
+    基準測試案例
+    setup 返回上下文管理器，進入時產生 operation(count)：執行 count 次操作
+    """
+    name: str
+    setup: Callable[[], AbstractContextManager]
+    unit: str = "ops"               # 操作單位 (spins、grids、messages、records、requests)
+    kind: str = "throughput"        # "throughput" (每秒操作數) 或 "latency" (每次操作毫秒)
+    scale: int = 1                  # 每次操作包含的單位數 (批量 API 以區塊為一次操作)
+
+
+@dataclass
+class BenchmarkResult:
+    """單一案例的量測結果"""
+    name: str
+    value: float                    # 吞吐量為每秒操作數，延遲為中位數毫秒
+    unit: str
+    higher_is_better: bool
+    samples: int                    # 吞吐量為每輪的單位數，延遲為計時次數
+    statistics: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class BenchmarkComparison:
+    """與基準的比較"""
+    name: str
+    baseline: float
+    current: float
+    change: float                   # 相對變化 (正值為改善)
+    regressed: bool
+
+
+def measure_throughput(operation: Callable[[int], Any], min_time: float = 0.2,
+                       repeats: int = 5, scale: int = 1) -> Dict[str, float]:
+    """
+    量測吞吐量：先增加操作次數直到單輪超過 min_time，再重複 repeats 輪
+    返回最佳與中位數每秒單位數 (操作數 x scale)
+    """
+    count = 1
+    while True:
+        started = time.perf_counter()
+        operation(count)
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time or count >= 1 << 30:
+            break
+        count *= 2 if elapsed <= 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+    rates = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        operation(count)
+        rates.append(count * scale / max(time.perf_counter() - started, 1e-12))
+    return {"best": max(rates), "median": statistics.median(rates), "count": count * scale}
+
+
+def measure_latency(operation: Callable[[int], Any], samples: int = 200, warmup: int = 10) -> Dict[str, float]:
+    """量測每次操作的延遲 (毫秒)"""
+    operation(warmup)
+    times = np.empty(samples)
+    for index in range(samples):
+        started = time.perf_counter()
+        operation(1)
+        times[index] = (time.perf_counter() - started) * 1e3
+    return {
+        "p50": float(np.percentile(times, 50)),
+        "p95": float(np.percentile(times, 95)),
+        "mean": float(times.mean()),
+        "max": float(times.max())
+    }
+
+
+def select_cases(cases: Sequence[BenchmarkCase], patterns: Optional[Iterable[str]] = None) -> List[BenchmarkCase]:
+    """依名稱子字串或萬用字元篩選案例"""
+    if not patterns:
+        return list(cases)
+    patterns = list(patterns)
+    return [case for case in cases
+            if any(pattern in case.name or fnmatch.fnmatch(case.name, pattern) for pattern in patterns)]
+
+
+def run_case(case: BenchmarkCase, min_time: float = 0.2, repeats: int = 5,
+             latency_samples: int = 200) -> BenchmarkResult:
+    """執行單一案例"""
+    with case.setup() as operation:
+        if case.kind == "latency":
+            latency = measure_latency(operation, latency_samples)
+            return BenchmarkResult(case.name, latency["p50"], f"ms/{case.unit}", False, latency_samples, latency)
+
+        throughput = measure_throughput(operation, min_time, repeats, case.scale)
+        return BenchmarkResult(case.name, throughput["best"], f"{case.unit}/s", True, int(throughput["count"]),
+                               {"median": throughput["median"]})
+
+
+def run_benchmarks(cases: Optional[Sequence[BenchmarkCase]] = None, patterns: Optional[Iterable[str]] = None,
+                   min_time: float = 0.2, repeats: int = 5, latency_samples: int = 200,
+                   verbose: bool = True) -> List[BenchmarkResult]:
+    """執行案例 (預設為全部案例，缺少伺服器相依套件時略過伺服器案例)"""
+    if cases is None:
+        cases = default_cases(verbose)
+
+    results = []
+    for case in select_cases(cases, patterns):
+        result = run_case(case, min_time, repeats, latency_samples)
+        results.append(result)
+        if verbose:
+            print(f"  {result.name:<44}{result.value:>16,.2f} {result.unit}")
+    return results
+
+
+def default_cases(verbose: bool = False) -> List[BenchmarkCase]:
+    """引擎、模擬器、協定、輸出器與伺服器案例"""
+    from benchmarks.cases import core_cases
+    from benchmarks.server_cases import server_cases
+
+    cases = core_cases()
+    extra, skipped_reason = server_cases()
+    if skipped_reason and verbose:
+        print(f"⚠️ {skipped_reason}")
+    return cases + extra
+
+
+def save_results(results: Sequence[BenchmarkResult], path: str) -> Dict[str, Any]:
+    """將結果與執行環境寫入 JSON"""
+    data = {
+        "timestamp": datetime.now().isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor()
+        },
+        "results": {result.name: asdict(result) for result in results}
+    }
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    return data
+
+
+def load_results(path: str) -> Dict[str, BenchmarkResult]:
+    """讀取 save_results 輸出的 JSON"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return {name: BenchmarkResult(**result) for name, result in data["results"].items()}
+
+
+def compare_results(current: Sequence[BenchmarkResult], baseline: Dict[str, BenchmarkResult],
+                    threshold: float = 0.1) -> List[BenchmarkComparison]:
+    """
+    與基準比較 (只比較兩邊都有的案例)
+    越高越好的指標低於基準 (1 - threshold) 倍、越低越好的指標高於基準 (1 + threshold) 倍即為退步
+    """
+    comparisons = []
+    for result in current:
+        reference = baseline.get(result.name)
+        if reference is None or reference.value <= 0:
+            continue
+        ratio = result.value / reference.value
+        if result.higher_is_better:
+            change = ratio - 1
+            regressed = ratio < 1 - threshold
+        else:
+            change = 1 - ratio
+            regressed = ratio > 1 + threshold
+        comparisons.append(BenchmarkComparison(result.name, reference.value, result.value, change, regressed))
+    return comparisons
+
+
+def format_comparisons(comparisons: Sequence[BenchmarkComparison]) -> str:
+    """比較結果表"""
+    lines = [f"{'案例':<42}{'基準':>16}{'本次':>16}{'變化':>10}"]
+    for comparison in comparisons:
+        mark = "❌" if comparison.regressed else "  "
+        lines.append(f"{comparison.name:<44}{comparison.baseline:>16,.2f}{comparison.current:>16,.2f}"
+                     f"{comparison.change * 100:>+9.1f}% {mark}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """命令列入口，有退步時返回 1，找不到基準時返回 2"""
+    parser = argparse.ArgumentParser(description="好運咚咚基準測試")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="結果 JSON 路徑")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="基準 JSON 路徑")
+    parser.add_argument("--threshold", type=float, default=0.1, help="退步門檻 (相對變化，預設 0.1)")
+    parser.add_argument("--update-baseline", action="store_true", help="以本次結果覆寫基準")
+    parser.add_argument("--filter", action="append", dest="patterns", help="只執行名稱符合的案例 (可重複)")
+    parser.add_argument("--quick", action="store_true", help="縮短量測時間 (用於檢查，不適合比較)")
+    args = parser.parse_args(argv)
+
+    min_time, repeats, latency_samples = (0.02, 2, 20) if args.quick else (0.2, 5, 200)
+    print("⏱️ 執行基準測試...")
+    results = run_benchmarks(patterns=args.patterns, min_time=min_time, repeats=repeats,
+                             latency_samples=latency_samples)
+    save_results(results, args.output)
+    print(f"📄 結果已保存: {args.output}")
+
+    if args.update_baseline:
+        save_results(results, args.baseline)
+        print(f"📌 基準已更新: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"❌ 找不到基準 {args.baseline}，以 --update-baseline 建立")
+        return 2
+
+    comparisons = compare_results(results, load_results(args.baseline), args.threshold)
+    print(format_comparisons(comparisons))
+    regressions = [comparison.name for comparison in comparisons if comparison.regressed]
+    if regressions:
+        print(f"❌ {len(regressions)} 項指標退步超過 {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    print("✅ 沒有超過門檻的退步")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
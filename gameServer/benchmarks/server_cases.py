@@ -0,0 +1,101 @@
+"""
+伺服器端到端延遲案例 - 以 FastAPI TestClient 在同一進程內啟動 spin_server
+量測 POST /api/spin 與 /ws (StateCall 旋轉 + ResultCall 取回結果) 的往返延遲。
+需要 fastapi 與 httpx，缺少時略過伺服器案例
+"""
+
+import io
+import logging
+from contextlib import contextmanager, redirect_stdout
+from typing import List, Optional, Tuple
+
+from benchmarks.runner import BenchmarkCase
+from protocol.simple_proto import EMSGID, Header
+
+
+def _load_server():
+    """匯入 TestClient 與伺服器應用 (缺少相依套件時拋出 ImportError / RuntimeError)"""
+    from fastapi.testclient import TestClient
+    import spin_server
+
+    return TestClient, spin_server
+
+
+@contextmanager
+def _client():
+    """啟動進程內伺服器 (執行生命週期並關閉伺服器日誌與輸出)"""
+    TestClient, spin_server = _load_server()
+    logger = logging.getLogger(spin_server.__name__)
+    level = logger.level
+    logger.setLevel(logging.WARNING)
+    output = io.StringIO()
+    try:
+        with redirect_stdout(output):
+            client = TestClient(spin_server.app)
+            client.__enter__()
+        try:
+            yield client
+        finally:
+            with redirect_stdout(output):
+                client.__exit__(None, None, None)
+    finally:
+        logger.setLevel(level)
+
+
+def _message_bytes(msgid: int, stateid: Optional[int] = None) -> bytes:
+    """前端發送的簡化訊息 (field 1 msgid，field 3 stateid)"""
+    data = bytearray()
+    data.append((1 << 3) | 0)
+    data.extend(Header._encode_varint(msgid))
+    if stateid is not None:
+        data.append((3 << 3) | 0)
+        data.extend(Header._encode_varint(stateid))
+    return bytes(data)
+
+
+@contextmanager
+def server_api_spin():
+    """POST /api/spin 往返延遲"""
+    with _client() as client:
+        payload = {"bet": 50, "spin_type": "normal"}
+
+        def operation(count: int):
+            for _ in range(count):
+                response = client.post("/api/spin", json=payload)
+                response.raise_for_status()
+
+        yield operation
+
+
+@contextmanager
+def server_ws_spin():
+    """/ws 一次旋轉 (StateCall 旋轉 + ResultCall) 往返延遲"""
+    from protocol.simple_proto import ESTATEID
+
+    state_call = _message_bytes(EMSGID.eStateCall, ESTATEID.K_SPIN)
+    result_call = _message_bytes(EMSGID.eResultCall)
+    with _client() as client:
+        with client.websocket_connect("/ws") as websocket:
+            websocket.send_bytes(_message_bytes(EMSGID.eLoginCall))
+            websocket.receive_bytes()
+
+            def operation(count: int):
+                for _ in range(count):
+                    websocket.send_bytes(state_call)
+                    websocket.receive_bytes()
+                    websocket.send_bytes(result_call)
+                    websocket.receive_bytes()
+
+            yield operation
+
+
+def server_cases() -> Tuple[List[BenchmarkCase], Optional[str]]:
+    """伺服器案例與略過原因 (可執行時原因為 None)"""
+    try:
+        _load_server()
+    except (ImportError, RuntimeError) as e:
+        return [], f"略過伺服器基準測試 (需要 fastapi 與 httpx): {e}"
+    return [
+        BenchmarkCase("server.api_spin", server_api_spin, "requests", kind="latency"),
+        BenchmarkCase("server.ws_spin", server_ws_spin, "spins", kind="latency"),
+    ], None
@@ -1,7 +1,13 @@
 # Core module for game engine
+from .game_model import CompiledGameModel
+from .reel_tables import ReelWindowTables
 from .game_engine import GameEngine
+from .evaluation_cache import EvaluationCache
+from .feature_round import FeatureRoundEvaluator
 from .reel_controller import ReelController
 from .win_calculator import WinCalculator
 from .symbol_transformer import SymbolTransformer
+from .samplers import AliasSampler, StopProposal
+from .profiler import SpinRangeProfiler, StageProfiler, StageStats
 
-__all__ = ['GameEngine', 'ReelController', 'WinCalculator', 'SymbolTransformer']
\ No newline at end of file
+__all__ = ['CompiledGameModel', 'ReelWindowTables', 'GameEngine', 'EvaluationCache', 'FeatureRoundEvaluator', 'ReelController', 'WinCalculator', 'SymbolTransformer', 'AliasSampler', 'StopProposal', 'StageProfiler', 'StageStats', 'SpinRangeProfiler']
\ No newline at end of file
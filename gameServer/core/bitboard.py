@@ -0,0 +1,73 @@
+"""
+盤面位元表示 - 以每個符號一個佔位遮罩表示 5x3 盤面
+位元索引與 WinLine.positions 的絕對位置相同 (reel_idx * reel_height + row)
+"""
+
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from .game_model import CompiledGameModel
+
+
+@dataclass(frozen=True)
+class GridBitboard:
+    """
+    盤面位元表示 (不可變、可雜湊)
+    masks[symbol_id] 為該符號出現位置的遮罩，WILD 遮罩即 masks[wild_id]
+    """
+    masks: Tuple[int, ...]
+    reel_count: int
+    reel_height: int
+
+    @classmethod
+    def from_reel_result(cls, reel_result: List[List[int]], model: CompiledGameModel) -> "GridBitboard":
+        """由滾輪結果建立位元表示 (超出符號表範圍的 id 忽略)"""
+        masks = [0] * model.symbol_count
+        reel_height = model.reel_height
+        for reel_idx, reel_symbols in enumerate(reel_result):
+            for row, symbol in enumerate(reel_symbols):
+                if 0 <= symbol < len(masks):
+                    masks[symbol] |= 1 << (reel_idx * reel_height + row)
+        return cls(tuple(masks), len(reel_result), reel_height)
+
+    def mask(self, symbol_id: int) -> int:
+        """符號遮罩"""
+        if 0 <= symbol_id < len(self.masks):
+            return self.masks[symbol_id]
+        return 0
+
+    def reel_counts(self, mask: int) -> List[int]:
+        """遮罩在每輪的位元數"""
+        popcount = popcount_table(self.reel_height)
+        reel_bits = (1 << self.reel_height) - 1
+        return [popcount[(mask >> (reel_idx * self.reel_height)) & reel_bits]
+                for reel_idx in range(self.reel_count)]
+
+
+_POPCOUNT_TABLES = {}
+
+
+def popcount_table(bits: int) -> Tuple[int, ...]:
+    """0 .. 2^bits - 1 的位元數查表"""
+    table = _POPCOUNT_TABLES.get(bits)
+    if table is None:
+        table = tuple(bin(value).count("1") for value in range(1 << bits))
+        _POPCOUNT_TABLES[bits] = table
+    return table
+
+
+def popcount(mask: int) -> int:
+    """遮罩位元數"""
+    return bin(mask).count("1")
+
+
+def mask_positions(mask: int) -> List[int]:
+    """遮罩轉換為絕對位置列表 (由小到大)"""
+    positions = []
+    position = 0
+    while mask:
+        if mask & 1:
+            positions.append(position)
+        mask >>= 1
+        position += 1
+    return positions
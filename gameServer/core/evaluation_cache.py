@@ -0,0 +1,109 @@
+"""
+贏分評估快取 - 以停止位置組合為鍵快取基礎遊戲贏分
+基礎遊戲贏分只由各輪停止位置決定，相同組合不需重複計算
+"""
+
+from collections import OrderedDict
+from itertools import product
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .reel_tables import ReelWindowTables
+from .win_calculator import WinCalculator, WinLine
+
+
+class EvaluationCache:
+    """
+    有界 LRU 贏分快取
+    鍵為停止位置 tuple，值為贏分線欄位的不可變 tuple (每次命中建立新的 WinLine，呼叫端可自由修改)；
+    max_size 為 None 時不限大小，為 0 時不快取
+    """
+
+    def __init__(self, win_calculator: WinCalculator, reel_tables: ReelWindowTables,
+                 max_size: Optional[int] = 50000, materialize: bool = False):
+        """
+        初始化快取
+        materialize: 建立時預先計算所有停止位置組合 (僅適用於小型條帶組)
+        """
+        self.win_calculator = win_calculator
+        self.reel_tables = reel_tables
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[int, ...], Tuple[Tuple, ...]]" = OrderedDict()
+
+        if materialize:
+            self.materialize()
+
+    @property
+    def total_combinations(self) -> int:
+        """停止位置組合總數"""
+        total = 1
+        for stop_count in self.reel_tables.stop_counts:
+            total *= stop_count
+        return total
+
+    @property
+    def hit_rate(self) -> float:
+        """命中率"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def evaluate(self, stops: Sequence[int]) -> List[WinLine]:
+        """取得停止位置組合的贏分線 (每次返回新的 WinLine 物件)"""
+        key = tuple(stops)
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            self.hits += 1
+            if self.max_size is not None:
+                self._entries.move_to_end(key)
+            return [self._to_win_line(fields) for fields in entry]
+
+        self.misses += 1
+        win_lines = self.win_calculator.calculate_243_ways_at(self.reel_tables, key)
+        if self.max_size != 0:
+            self._entries[key] = self._freeze(win_lines)
+            if self.max_size is not None and len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return win_lines
+
+    @staticmethod
+    def _freeze(win_lines: Sequence[WinLine]) -> Tuple[Tuple, ...]:
+        """贏分線轉為不可變的欄位 tuple"""
+        return tuple((line.line_no, line.symbol_id, tuple(line.positions), line.credit, line.multiplier,
+                      line.ways, line.win_type) for line in win_lines)
+
+    @staticmethod
+    def _to_win_line(fields: Tuple) -> WinLine:
+        """由欄位 tuple 建立新的 WinLine"""
+        line_no, symbol_id, positions, credit, multiplier, ways, win_type = fields
+        return WinLine(line_no, symbol_id, list(positions), credit, multiplier, ways, win_type)
+
+    def materialize(self):
+        """預先計算所有停止位置組合，組合數超過 max_size 時拋出 ValueError"""
+        total = self.total_combinations
+        if self.max_size is not None and total > self.max_size:
+            raise ValueError(f"停止位置組合數 {total} 超過快取大小 {self.max_size}")
+
+        for stops in product(*(range(stop_count) for stop_count in self.reel_tables.stop_counts)):
+            if stops not in self._entries:
+                self._entries[stops] = self._freeze(self.win_calculator.calculate_243_ways_at(self.reel_tables, stops))
+
+    def clear(self):
+        """清空快取與計數"""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """獲取快取統計"""
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate
+        }
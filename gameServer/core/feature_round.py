@@ -0,0 +1,133 @@
+"""
+免費旋轉回合評估器 - 直接以預先計算的視窗表評估整個免費旋轉回合
+不經過 GameEngine 的狀態機與 SpinResult，可一次評估多個回合 (各回合逐步同時推進)
+規則與 GameEngine.spin_free_game 相同：P 系列符號變換、戰鼓倍率 (有贏分時各戰鼓 1-10 相加)、
+前三輪皆出現 BONUS 時再觸發
+"""
+
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from .game_model import CompiledGameModel
+from .reel_tables import ReelWindowTables
+from .rng import RandomStream
+from .samplers import AliasSampler, StopProposal
+from .symbol_transformer import SymbolTransformer
+from .win_calculator import WinCalculator
+
+
+@dataclass
+class FeatureRoundBatch:
+    """批量回合結果 (各欄位為長度 n 的陣列)"""
+    total_win: np.ndarray       # 回合總贏分
+    spins: np.ndarray           # 回合旋轉次數
+    retriggers: np.ndarray      # 再觸發次數
+    max_win: np.ndarray         # 回合內單次最大贏分
+    likelihood_ratio: Optional[np.ndarray] = None   # 重要性抽樣時各回合的似然比
+
+    def __len__(self) -> int:
+        return len(self.total_win)
+
+
+class FeatureRoundEvaluator:
+    """免費旋轉回合評估器"""
+
+    # 戰鼓單鼓倍率範圍 (與 GameEngine._calculate_drum_multiplier 相同)
+    DRUM_MULTIPLIER_RANGE = (1, 10)
+
+    def __init__(self, model: CompiledGameModel, reel_tables: ReelWindowTables,
+                 win_calculator: WinCalculator, symbol_transformer: SymbolTransformer,
+                 rng: Optional[RandomStream] = None):
+        """初始化評估器 (rng 預設使用符號變換器的隨機數流)"""
+        self.model = model
+        self.reel_tables = reel_tables
+        self.win_calculator = win_calculator
+        self.symbol_transformer = symbol_transformer
+        self.rng = rng if rng is not None else symbol_transformer.rng
+        self._stop_counts = np.array(reel_tables.stop_counts)
+
+    @classmethod
+    def from_engine(cls, engine) -> "FeatureRoundEvaluator":
+        """由 GameEngine 的模型、視窗表與隨機數流建立評估器"""
+        return cls(engine.model, engine.reel_tables, engine.win_calculator,
+                   engine.symbol_transformer, engine.rng)
+
+    def play_rounds(self, count: int, drums: int = 0, initial_spins: Optional[int] = None,
+                    stop_proposal: Optional[StopProposal] = None,
+                    multiplier_weights: Optional[Sequence[float]] = None) -> FeatureRoundBatch:
+        """
+        評估 count 個免費旋轉回合
+        drums: 戰鼓數量；initial_spins: 初始免費旋轉次數 (預設為模型設定)
+        stop_proposal / multiplier_weights: 重要性抽樣用的停止位置與單鼓倍率 (1-10) 提議分布，
+        提供時結果帶有各回合的似然比
+        """
+        if initial_spins is None:
+            initial_spins = self.model.initial_free_spins
+        retrigger_spins = self.model.initial_free_spins
+        low, high = self.DRUM_MULTIPLIER_RANGE
+
+        importance = stop_proposal is not None or multiplier_weights is not None
+        likelihood = np.ones(count) if importance else None
+        multiplier_sampler = None
+        if multiplier_weights is not None:
+            if len(multiplier_weights) != high - low + 1 or min(multiplier_weights) <= 0:
+                raise ValueError("單鼓倍率提議權重必須為 10 個正數")
+            multiplier_sampler = AliasSampler(list(range(low, high + 1)), multiplier_weights)
+            weights = np.asarray(multiplier_weights, dtype=np.float64)
+            multiplier_ratios = weights.sum() / (len(weights) * weights)
+
+        remaining = np.full(count, initial_spins, dtype=np.int64)
+        total_win = np.zeros(count, dtype=np.int64)
+        spins = np.zeros(count, dtype=np.int64)
+        retriggers = np.zeros(count, dtype=np.int64)
+        max_win = np.zeros(count, dtype=np.int64)
+
+        active = np.flatnonzero(remaining > 0)
+        while active.size > 0:
+            size = active.size
+            if stop_proposal is not None:
+                stops, stop_likelihood = stop_proposal.sample(self.rng, size)
+                likelihood[active] *= stop_likelihood
+            else:
+                stops = self.rng.integers(0, self._stop_counts, size=(size, len(self._stop_counts)))
+
+            # 查表取得視窗後整盤變換 P 系列符號
+            grids = self.symbol_transformer.transform_grid(self.reel_tables.gather_windows(stops))
+            base_credit = self.win_calculator.calculate_243_ways_batch(grids)["total_credit"]
+
+            # 戰鼓倍率：有贏分且有戰鼓時為各戰鼓倍率總和，否則為 1
+            # 倍率對所有進行中回合抽取，不同賠付表的變體因此消耗相同的隨機數
+            multiplier = np.ones(size, dtype=np.int64)
+            if drums > 0:
+                if multiplier_sampler is not None:
+                    drum_values = multiplier_sampler.sample(self.rng, size * drums).reshape(size, drums)
+                else:
+                    drum_values = self.rng.integers(low, high + 1, size=(size, drums))
+                winning = base_credit > 0
+                multiplier[winning] = drum_values[winning].sum(axis=1)
+                if multiplier_sampler is not None:
+                    likelihood[active[winning]] *= multiplier_ratios[drum_values[winning] - low].prod(axis=1)
+            credit = base_credit * multiplier
+
+            # 再觸發：前三輪皆出現 BONUS (符號變換不影響 BONUS)
+            bonus = np.stack([self.reel_tables.reels[reel_idx].bonus_count_array[stops[:, reel_idx]] > 0
+                              for reel_idx in range(3)], axis=1)
+            retrigger = bonus.all(axis=1)
+
+            total_win[active] += credit
+            spins[active] += 1
+            max_win[active] = np.maximum(max_win[active], credit)
+            retriggers[active] += retrigger
+            remaining[active] += np.where(retrigger, retrigger_spins, 0) - 1
+
+            active = active[remaining[active] > 0]
+
+        return FeatureRoundBatch(total_win=total_win, spins=spins, retriggers=retriggers, max_win=max_win,
+                                 likelihood_ratio=likelihood)
+
+    def play_round(self, drums: int = 0, initial_spins: Optional[int] = None) -> Tuple[int, int]:
+        """評估單一回合，返回 (回合總贏分, 回合旋轉次數)"""
+        batch = self.play_rounds(1, drums, initial_spins)
+        return int(batch.total_win[0]), int(batch.spins[0])
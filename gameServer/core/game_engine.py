@@ -4,11 +4,44 @@
 """
 
 import json
-import random
+from collections import deque
 from typing import Dict, List, Optional, Tuple, Any
 from enum import Enum
 from dataclasses import dataclass, asdict
 
+import numpy as np
+
+from .game_model import CompiledGameModel
+from .evaluation_cache import EvaluationCache
+from .profiler import StageProfiler
+from .reel_tables import ReelWindowTables
+from .rng import RandomStream
+from .win_calculator import WinCalculator
+from .symbol_transformer import SymbolTransformer
+
+# 基礎遊戲滾輪條帶 (簡化版本)，GameEngine 與 ReelController 預設使用
+DEFAULT_REEL_STRIPS: Tuple[Tuple[int, ...], ...] = (
+    # 第1輪 - 較多低價值符號
+    (4, 5, 6, 7, 8, 4, 5, 6, 7, 8, 3, 4, 5, 6, 7, 8, 2, 3, 4, 9, 
+     5, 6, 7, 8, 1, 2, 3, 4, 5, 6, 7, 8, 0, 1, 2, 3, 4, 5, 6, 7),
+    
+    # 第2輪
+    (5, 6, 7, 8, 4, 5, 6, 7, 8, 3, 4, 5, 6, 7, 8, 2, 3, 4, 5, 9,
+     6, 7, 8, 1, 2, 3, 4, 5, 6, 7, 8, 0, 1, 2, 3, 4, 5, 6, 7, 8),
+    
+    # 第3輪 - BONUS 符號較多
+    (6, 7, 8, 4, 5, 6, 7, 8, 3, 4, 5, 6, 7, 8, 2, 3, 4, 5, 6, 9,
+     7, 8, 1, 2, 3, 4, 5, 6, 7, 8, 0, 1, 2, 3, 4, 5, 6, 7, 8, 9),
+    
+    # 第4輪
+    (7, 8, 4, 5, 6, 7, 8, 3, 4, 5, 6, 7, 8, 2, 3, 4, 5, 6, 7, 8,
+     1, 2, 3, 4, 5, 6, 7, 8, 0, 1, 2, 3, 4, 5, 6, 7, 8, 4, 5, 6),
+    
+    # 第5輪 - 較多高價值符號
+    (8, 4, 5, 6, 7, 8, 3, 4, 5, 6, 7, 8, 2, 3, 4, 5, 6, 7, 8, 1,
+     2, 3, 4, 5, 6, 7, 8, 0, 1, 2, 3, 4, 5, 6, 7, 8, 0, 1, 2, 3)
+)
+
 class GameState(Enum):
     """遊戲狀態列舉 - 對應 TypeScript 中的 ESTATEID"""
     K_IDLE = 0
@@ -61,14 +94,111 @@ class SpinResult:
     free_spins_awarded: int = 0
     multiplier: int = 1
     special_effects: List[str] = None
+    stop_positions: Optional[List[int]] = None  # 各輪實際抽取的停止位置 (視窗起點，符號變換前)
+    symbols_transformed: bool = False  # reel_result 經過符號變換，無法僅由 stop_positions 重現
+
+@dataclass
+class BatchSpinResult:
+    """批量旋轉結果 (struct-of-arrays，每個欄位第一維為旋轉索引)"""
+    stops: np.ndarray               # (n, reel_count) 停止位置
+    reel_results: np.ndarray        # (n, reel_count, reel_height) 滾輪結果
+    total_credit: np.ndarray        # (n,) 總贏分 (含散佈贏分)
+    scatter_win: np.ndarray         # (n,) 散佈贏分
+    is_feature_trigger: np.ndarray  # (n,) 是否觸發免費旋轉
+    ways: np.ndarray                # (n, symbol_count) 每個符號的中獎 Ways 數
+
+    @property
+    def size(self) -> int:
+        """旋轉次數"""
+        return len(self.total_credit)
+
+@dataclass
+class RunningStatistics:
+    """累計旋轉統計 (逐次更新，查詢為 O(1)，不依賴歷史紀錄長度)"""
+    total_spins: int = 0
+    total_win: int = 0
+    feature_triggers: int = 0
+    max_win: int = 0
+    sum_of_squares: float = 0.0
+
+    def record(self, result: SpinResult):
+        """累加一次旋轉結果"""
+        win = result.total_credit
+        self.total_spins += 1
+        self.total_win += win
+        self.sum_of_squares += win * win
+        if result.is_feature_trigger:
+            self.feature_triggers += 1
+        if win > self.max_win:
+            self.max_win = win
+
+    @property
+    def average_win(self) -> float:
+        """平均贏分"""
+        return self.total_win / self.total_spins if self.total_spins > 0 else 0
+
+    @property
+    def win_std_dev(self) -> float:
+        """贏分標準差 (母體)"""
+        if self.total_spins == 0:
+            return 0.0
+        mean = self.total_win / self.total_spins
+        return max(0.0, self.sum_of_squares / self.total_spins - mean * mean) ** 0.5
 
 class GameEngine:
     """主遊戲引擎類"""
     
-    def __init__(self, config_path: str = "config/game_config.json", paytable_path: str = "config/paytable.json"):
-        """初始化遊戲引擎"""
+    # 預設保留的最近旋轉結果數量
+    DEFAULT_HISTORY_SIZE = 1000
+    # 預設贏分快取大小 (0：只在小型條帶組時啟用不限大小的快取)
+    # 贏分快取為選用功能：正式條帶約 7900 萬組停止位置，隨機停止幾乎不會重複，有界 LRU 無法提高命中率；
+    # 重複評估相同停止位置 (例如重播、固定停止位置測試) 時以配置 evaluation_cache_size 啟用
+    DEFAULT_EVALUATION_CACHE_SIZE = 0
+    # 停止位置組合數不超過此值時可完整快取
+    EVALUATION_CACHE_FULL_LIMIT = 20000
+    
+    def __init__(self, config_path: str = "config/game_config.json", paytable_path: str = "config/paytable.json",
+                 model: Optional[CompiledGameModel] = None, rng: Optional[RandomStream] = None,
+                 history_size: Optional[int] = None, evaluation_cache_size: Optional[int] = None,
+                 profiler: Optional[StageProfiler] = None):
+        """
+        初始化遊戲引擎
+        model: 共用的編譯後遊戲模型，未提供時由配置編譯 (相同配置的引擎共用同一實例)
+        rng: 隨機數流，未提供時使用系統熵建立獨立的隨機數流
+        history_size: game_history 保留的最近結果數量，未提供時讀取配置 history_size (預設 1000)
+        evaluation_cache_size: 基礎遊戲贏分 LRU 快取大小，未提供時讀取配置 evaluation_cache_size
+            (預設 0：組合數不超過 EVALUATION_CACHE_FULL_LIMIT 時完整快取，否則停用)
+        profiler: 階段計時器 (與贏分計算器、符號變換器共用)，未提供時建立停用的計時器
+        """
         self.load_config(config_path, paytable_path)
+        if history_size is None:
+            history_size = self.config.get("history_size", self.DEFAULT_HISTORY_SIZE)
+        self.history_size = history_size
+        if evaluation_cache_size is None:
+            evaluation_cache_size = self.config.get("evaluation_cache_size", self.DEFAULT_EVALUATION_CACHE_SIZE)
+        self.evaluation_cache_size = evaluation_cache_size
+        self.model = model if model is not None else CompiledGameModel.from_config(self.config, self.paytable)
+        self.rng = rng if rng is not None else RandomStream()
+        self.profiler = profiler if profiler is not None else StageProfiler()
+        
+        # 計算器與變換器只建立一次，每次旋轉重複使用
+        self.win_calculator = WinCalculator(self.config, self.paytable, self.model, self.profiler)
+        self.symbol_transformer = SymbolTransformer(self.config, self.model, self.rng, self.profiler)
+        
+        self.reel_strips: Optional[List[List[int]]] = None
+        self.evaluation_cache: Optional[EvaluationCache] = None
         self.reset_game_state()
+    
+    def set_rng(self, rng: RandomStream):
+        """替換引擎及其元件使用的隨機數流"""
+        self.rng = rng
+        self.symbol_transformer.rng = rng
+    
+    def set_profiler(self, profiler: StageProfiler):
+        """替換引擎及其元件使用的階段計時器"""
+        self.profiler = profiler
+        self.win_calculator.profiler = profiler
+        self.symbol_transformer.profiler = profiler
         
     def load_config(self, config_path: str, paytable_path: str):
         """載入遊戲配置"""
@@ -104,37 +234,34 @@ class GameEngine:
         self.free_spins_total_win = 0
         self.feature_multiplier = 1
         self.drums_count = 0
-        self.game_history = []
+        self.game_history = deque(maxlen=self.history_size)  # 只保留最近 history_size 筆
+        self.statistics = RunningStatistics()
         
-        # 滾輪條帶定義 (簡化版本)
-        self.reel_strips = self._generate_reel_strips()
+        # 滾輪條帶定義 (簡化版本) 與預先計算的視窗表
+        self.set_reel_strips(self._generate_reel_strips())
+    
+    def set_reel_strips(self, reel_strips: List[List[int]]):
+        """設定滾輪條帶並重建視窗表與贏分快取 (條帶與快取大小未改變時沿用)"""
+        if reel_strips != self.reel_strips:
+            self.reel_strips = [list(strip) for strip in reel_strips]
+            self.reel_tables = ReelWindowTables.from_strips(self.model, self.reel_strips)
+            self.evaluation_cache = None
+        max_size = self._evaluation_cache_max_size()
+        if self.evaluation_cache is None or self.evaluation_cache.max_size != max_size:
+            self.evaluation_cache = EvaluationCache(self.win_calculator, self.reel_tables, max_size)
+    
+    def _evaluation_cache_max_size(self) -> Optional[int]:
+        """贏分快取大小：已設定時使用設定值，否則只在可完整快取時不限大小 (None)"""
+        if self.evaluation_cache_size != 0:
+            return self.evaluation_cache_size
+        total = 1
+        for stop_count in self.reel_tables.stop_counts:
+            total *= stop_count
+        return None if total <= self.EVALUATION_CACHE_FULL_LIMIT else 0
     
     def _generate_reel_strips(self) -> List[List[int]]:
         """生成滾輪條帶"""
-        # 基礎遊戲滾輪條帶 (簡化版本)
-        base_strips = [
-            # 第1輪 - 較多低價值符號
-            [4, 5, 6, 7, 8, 4, 5, 6, 7, 8, 3, 4, 5, 6, 7, 8, 2, 3, 4, 9, 
-             5, 6, 7, 8, 1, 2, 3, 4, 5, 6, 7, 8, 0, 1, 2, 3, 4, 5, 6, 7],
-            
-            # 第2輪
-            [5, 6, 7, 8, 4, 5, 6, 7, 8, 3, 4, 5, 6, 7, 8, 2, 3, 4, 5, 9,
-             6, 7, 8, 1, 2, 3, 4, 5, 6, 7, 8, 0, 1, 2, 3, 4, 5, 6, 7, 8],
-            
-            # 第3輪 - BONUS 符號較多
-            [6, 7, 8, 4, 5, 6, 7, 8, 3, 4, 5, 6, 7, 8, 2, 3, 4, 5, 6, 9,
-             7, 8, 1, 2, 3, 4, 5, 6, 7, 8, 0, 1, 2, 3, 4, 5, 6, 7, 8, 9],
-            
-            # 第4輪
-            [7, 8, 4, 5, 6, 7, 8, 3, 4, 5, 6, 7, 8, 2, 3, 4, 5, 6, 7, 8,
-             1, 2, 3, 4, 5, 6, 7, 8, 0, 1, 2, 3, 4, 5, 6, 7, 8, 4, 5, 6],
-            
-            # 第5輪 - 較多高價值符號
-            [8, 4, 5, 6, 7, 8, 3, 4, 5, 6, 7, 8, 2, 3, 4, 5, 6, 7, 8, 1,
-             2, 3, 4, 5, 6, 7, 8, 0, 1, 2, 3, 4, 5, 6, 7, 8, 0, 1, 2, 3]
-        ]
-        
-        return base_strips
+        return [list(strip) for strip in DEFAULT_REEL_STRIPS]
     
     def spin(self, spin_type: SpinType = SpinType.NORMAL) -> SpinResult:
         """執行一次旋轉"""
@@ -144,18 +271,25 @@ class GameEngine:
         if spin_type != SpinType.NORMAL:
             return self._handle_feature_buy(spin_type)
         
-        # 正常旋轉邏輯
-        reel_result = self._generate_reel_result()
+        profiler = self.profiler
+        started = profiler.start()
+        
+        # 正常旋轉邏輯：抽取停止位置後查表
+        stops = self._generate_stops()
+        lookup_started = profiler.start()
+        reel_result = self.reel_tables.reel_result(stops)
         
         # 檢查免費旋轉觸發
-        is_feature_trigger, free_spins = self._check_feature_trigger(reel_result)
+        is_feature_trigger = self.reel_tables.is_feature_trigger(stops)
+        profiler.stop("lookup", lookup_started)
+        free_spins = self.model.initial_free_spins if is_feature_trigger else 0
         
         if is_feature_trigger:
             self.free_spins_remaining = free_spins
             self.current_state = GameState.K_FEATURE_TRIGGER
         
-        # 計算贏分
-        win_lines = self._calculate_wins(reel_result)
+        # 計算贏分 (相同停止位置組合由快取返回)
+        win_lines = self.evaluation_cache.evaluate(stops)
         total_credit = sum(line.credit for line in win_lines)
         
         # 創建旋轉結果
@@ -165,37 +299,74 @@ class GameEngine:
             total_credit=total_credit,
             scatter_win=0,
             is_feature_trigger=is_feature_trigger,
-            free_spins_awarded=free_spins if is_feature_trigger else 0
+            free_spins_awarded=free_spins if is_feature_trigger else 0,
+            stop_positions=stops
         )
         
         # 更新遊戲狀態
         self.player_credit += total_credit - self.current_bet
-        self.game_history.append(result)
+        self._record_result(result)
         
         self.current_state = GameState.K_IDLE
+        profiler.stop("spin", started)
         return result
     
+    def spin_batch(self, n: int, spin_type: SpinType = SpinType.NORMAL) -> BatchSpinResult:
+        """
+        批量執行 n 次一般旋轉
+        一次向量化抽取 n x reel_count 個停止位置並批量計算 243 Ways 贏分，
+        不為每次旋轉建立 SpinResult / WinLine。
+        批量結果只更新玩家積分，不寫入遊戲歷史，也不啟動免費旋轉。
+        """
+        if spin_type != SpinType.NORMAL:
+            raise ValueError("批量旋轉僅支援一般旋轉")
+        if n <= 0:
+            raise ValueError("旋轉次數必須大於 0")
+        
+        profiler = self.profiler
+        started = profiler.start()
+        
+        # 與 _generate_stops 相同的停止位置範圍: 0 .. len(strip) - reel_height
+        rng_started = profiler.start()
+        stop_ranges = np.array(self.reel_tables.stop_counts)
+        stops = self.rng.integers(0, stop_ranges, size=(n, len(stop_ranges)))
+        profiler.stop("rng", rng_started)
+        
+        lookup_started = profiler.start()
+        reel_results = self.reel_tables.gather_windows(stops)
+        symbol_counts, bonus_counts = self.reel_tables.gather_counts(stops)
+        profiler.stop("lookup", lookup_started)
+        wins = self.win_calculator.calculate_243_ways_counts_batch(symbol_counts, bonus_counts)
+        
+        # 前三輪各至少一個 BONUS 即觸發
+        is_feature_trigger = (bonus_counts[:, :3] > 0).sum(axis=1) >= 3
+        
+        self.player_credit += int(wins["total_credit"].sum()) - self.current_bet * n
+        profiler.stop("spin_batch", started)
+        
+        return BatchSpinResult(
+            stops=stops,
+            reel_results=reel_results,
+            total_credit=wins["total_credit"],
+            scatter_win=wins["scatter_win"],
+            is_feature_trigger=is_feature_trigger,
+            ways=wins["ways"]
+        )
+    
+    def _generate_stops(self) -> List[int]:
+        """抽取每輪停止位置 (0 .. len(strip) - reel_height)"""
+        started = self.profiler.start()
+        stops = [self.rng.randint(0, stop_count - 1) for stop_count in self.reel_tables.stop_counts]
+        self.profiler.stop("rng", started)
+        return stops
+    
     def _generate_reel_result(self) -> List[List[int]]:
-        """生成滾輪結果"""
-        result = []
-        reel_height = self.config["reel_config"]["reel_height"]
-        
-        for reel_idx in range(self.config["reel_config"]["reel_count"]):
-            strip = self.reel_strips[reel_idx]
-            start_pos = random.randint(0, len(strip) - reel_height)
-            reel_symbols = []
-            
-            for i in range(reel_height):
-                symbol_idx = (start_pos + i) % len(strip)
-                reel_symbols.append(strip[symbol_idx])
-            
-            result.append(reel_symbols)
-        
-        return result
+        """生成滾輪結果 (查表取得各輪視窗)"""
+        return self.reel_tables.reel_result(self._generate_stops())
     
     def _check_feature_trigger(self, reel_result: List[List[int]]) -> Tuple[bool, int]:
         """檢查免費旋轉觸發"""
-        bonus_symbol_id = self.config["symbols"]["BONUS"]["id"]
+        bonus_symbol_id = self.model.scatter_id
         bonus_count = 0
         
         # 檢查前三輪是否有 BONUS 符號
@@ -206,15 +377,13 @@ class GameEngine:
                     break  # 每輪最多計算一個
         
         if bonus_count >= 3:
-            return True, self.config.get("free_spins", {}).get("initial_spins", 7)
+            return True, self.model.initial_free_spins
         
         return False, 0
     
     def _calculate_wins(self, reel_result: List[List[int]]) -> List[WinLine]:
         """計算贏分 - 243 Ways"""
-        from .win_calculator import WinCalculator
-        calculator = WinCalculator(self.config, self.paytable)
-        return calculator.calculate_243_ways(reel_result)
+        return self.win_calculator.calculate_243_ways(reel_result)
     
     def _handle_feature_buy(self, spin_type: SpinType) -> SpinResult:
         """處理特色購買"""
@@ -245,11 +414,16 @@ class GameEngine:
         if self.free_spins_remaining <= 0:
             raise ValueError("沒有剩餘的免費旋轉")
         
+        profiler = self.profiler
+        started = profiler.start()
         self.current_state = GameState.K_FEATURE_SPIN
         self.free_spins_remaining -= 1
         
         # 生成免費旋轉結果 (可能有不同的滾輪條帶)
-        reel_result = self._generate_reel_result()
+        stops = self._generate_stops()
+        lookup_started = profiler.start()
+        reel_result = self.reel_tables.reel_result(stops)
+        profiler.stop("lookup", lookup_started)
         
         # 符號變換邏輯
         transformed_result = self._apply_symbol_transformation(reel_result)
@@ -274,11 +448,13 @@ class GameEngine:
             scatter_win=0,
             is_feature_trigger=is_retrigger,
             free_spins_awarded=additional_spins if is_retrigger else 0,
-            multiplier=drum_multiplier
+            multiplier=drum_multiplier,
+            stop_positions=stops,
+            symbols_transformed=True
         )
         
         self.free_spins_total_win += total_credit
-        self.game_history.append(result)
+        self._record_result(result)
         
         if self.free_spins_remaining == 0:
             self.current_state = GameState.K_ENDGAME
@@ -286,24 +462,30 @@ class GameEngine:
             self.free_spins_total_win = 0
             self.drums_count = 0
         
+        profiler.stop("free_spin", started)
         return result
     
+    def _record_result(self, result: SpinResult):
+        """記錄旋轉結果：寫入有界歷史並更新累計統計"""
+        self.game_history.append(result)
+        self.statistics.record(result)
+    
     def _apply_symbol_transformation(self, reel_result: List[List[int]]) -> List[List[int]]:
         """應用符號變換邏輯"""
-        from .symbol_transformer import SymbolTransformer
-        transformer = SymbolTransformer(self.config)
-        return transformer.transform_symbols(reel_result)
+        return self.symbol_transformer.transform_symbols(reel_result)
     
     def _calculate_drum_multiplier(self, has_win: bool) -> int:
         """計算戰鼓倍率"""
         if not has_win or self.drums_count == 0:
             return 1
         
+        started = self.profiler.start()
         total_multiplier = 0
         for _ in range(self.drums_count):
             # 隨機生成 1-10 的倍率
-            drum_mult = random.randint(1, 10)
+            drum_mult = self.rng.randint(1, 10)
             total_multiplier += drum_mult
+        self.profiler.stop("rng", started)
         
         return max(1, total_multiplier)
     
@@ -316,23 +498,28 @@ class GameEngine:
             "free_spins_remaining": self.free_spins_remaining,
             "free_spins_total_win": self.free_spins_total_win,
             "drums_count": self.drums_count,
-            "total_spins": len(self.game_history)
+            "total_spins": self.statistics.total_spins
         }
     
     def get_statistics(self) -> Dict[str, Any]:
-        """獲取遊戲統計信息"""
-        if not self.game_history:
+        """獲取遊戲統計信息 (來自累計統計，O(1))"""
+        stats = self.statistics
+        if stats.total_spins == 0:
             return {"message": "沒有遊戲歷史"}
         
-        total_spins = len(self.game_history)
-        total_win = sum(result.total_credit for result in self.game_history)
-        feature_triggers = sum(1 for result in self.game_history if result.is_feature_trigger)
+        total_spins = stats.total_spins
+        total_win = stats.total_win
+        feature_triggers = stats.feature_triggers
         
         return {
             "total_spins": total_spins,
             "total_win": total_win,
             "feature_triggers": feature_triggers,
-            "feature_trigger_rate": feature_triggers / total_spins if total_spins > 0 else 0,
-            "average_win": total_win / total_spins if total_spins > 0 else 0,
-            "rtp_estimate": (total_win / (total_spins * self.current_bet)) * 100 if total_spins > 0 else 0
+            "feature_trigger_rate": feature_triggers / total_spins,
+            "average_win": stats.average_win,
+            "rtp_estimate": (total_win / (total_spins * self.current_bet)) * 100,
+            "max_win": stats.max_win,
+            "win_std_dev": stats.win_std_dev,
+            "history_size": len(self.game_history),
+            "evaluation_cache": self.evaluation_cache.get_statistics()
         }
\ No newline at end of file
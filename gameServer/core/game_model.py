@@ -0,0 +1,174 @@
+"""
+編譯後遊戲模型 - 將遊戲配置與賠付表預先編譯為密集整數表
+由 GameEngine、WinCalculator、SymbolTransformer 與 ReelController 共用同一實例
+"""
+
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import cached_property
+from types import MappingProxyType
+from typing import Dict, Any, Optional, Tuple, Mapping
+
+import numpy as np
+
+# P 系列符號名稱 (免費旋轉中會互相變換)
+P_SYMBOL_NAMES = ("P1", "P2", "P3", "P4", "P5")
+
+# 已編譯模型快取：相同配置內容的引擎共用同一個模型 (LRU，最多保留 MODEL_CACHE_SIZE 個)
+MODEL_CACHE_SIZE = 32
+_MODEL_CACHE: "OrderedDict[str, CompiledGameModel]" = OrderedDict()
+
+
+def clear_model_cache():
+    """清空已編譯模型快取 (已建立的引擎仍保有其模型)"""
+    _MODEL_CACHE.clear()
+
+
+@dataclass(frozen=True, eq=False)
+class CompiledGameModel:
+    """
+    不可變的編譯後遊戲模型
+    pays[symbol_id][count] 與 scatter_pays[count] 為密集整數表，
+    取代每次查詢時以字串鍵讀取 paytable 的方式
+    """
+    reel_count: int
+    reel_height: int
+    symbol_names: Tuple[str, ...]          # id -> 名稱
+    symbol_ids: Mapping[str, int]          # 名稱 -> id
+    pays: Tuple[Tuple[int, ...], ...]      # [symbol_id][連續輪數] -> 賠付
+    scatter_pays: Tuple[int, ...]          # [散佈符號數量] -> 賠付
+    wild_id: int
+    scatter_id: int
+    is_wild: Tuple[bool, ...]
+    is_scatter: Tuple[bool, ...]
+    p_symbol_ids: Tuple[int, ...]          # P1..P5 的 id (不存在者略過)
+    ways_symbol_ids: Tuple[int, ...]       # 需要計算 Ways 贏分的符號
+    initial_free_spins: int
+
+    @property
+    def symbol_count(self) -> int:
+        """符號表大小 (最大 id + 1)"""
+        return len(self.symbol_names)
+
+    @cached_property
+    def pay_matrix(self) -> np.ndarray:
+        """Ways 賠付表的 NumPy 版本 (唯讀)，供批量計算使用"""
+        matrix = np.array(self.pays, dtype=np.int64).reshape(len(self.pays), -1)
+        matrix.setflags(write=False)
+        return matrix
+
+    @cached_property
+    def scatter_pay_array(self) -> np.ndarray:
+        """散佈賠付表的 NumPy 版本 (唯讀)"""
+        array = np.array(self.scatter_pays, dtype=np.int64)
+        array.setflags(write=False)
+        return array
+
+    def symbol_name(self, symbol_id: int) -> str:
+        """根據ID獲取符號名稱"""
+        if 0 <= symbol_id < len(self.symbol_names):
+            return self.symbol_names[symbol_id]
+        return "UNKNOWN"
+
+    def symbol_id(self, symbol_name: str) -> int:
+        """獲取符號ID，不存在時返回 -1"""
+        return self.symbol_ids.get(symbol_name, -1)
+
+    def get_payout(self, symbol_id: int, count: int) -> int:
+        """獲取符號 Ways 賠付"""
+        if 0 <= symbol_id < len(self.pays) and 0 <= count < len(self.pays[symbol_id]):
+            return self.pays[symbol_id][count]
+        return 0
+
+    def get_scatter_payout(self, count: int) -> int:
+        """獲取散佈符號賠付"""
+        if 0 <= count < len(self.scatter_pays):
+            return self.scatter_pays[count]
+        return 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any],
+                    paytable: Optional[Dict[str, Any]] = None) -> "CompiledGameModel":
+        """
+        由配置與賠付表取得編譯後模型
+        相同內容的配置會返回同一個快取實例 (快取最多保留最近使用的 MODEL_CACHE_SIZE 個模型)
+        """
+        paytable = paytable or {}
+        fingerprint = json.dumps([config, paytable], sort_keys=True, ensure_ascii=False, default=str)
+
+        model = _MODEL_CACHE.get(fingerprint)
+        if model is None:
+            model = cls._compile(config, paytable)
+            _MODEL_CACHE[fingerprint] = model
+            if len(_MODEL_CACHE) > MODEL_CACHE_SIZE:
+                _MODEL_CACHE.popitem(last=False)
+        else:
+            _MODEL_CACHE.move_to_end(fingerprint)
+        return model
+
+    @classmethod
+    def _compile(cls, config: Dict[str, Any], paytable: Dict[str, Any]) -> "CompiledGameModel":
+        """將配置編譯為密集表"""
+        reel_config = config.get("reel_config", {})
+        reel_count = reel_config.get("reel_count", 5)
+        reel_height = reel_config.get("reel_height", 3)
+
+        symbols = config.get("symbols", {})
+        symbol_ids = {name: data.get("id", -1) for name, data in symbols.items()}
+        valid_ids = [symbol_id for symbol_id in symbol_ids.values() if symbol_id >= 0]
+        table_size = max(valid_ids) + 1 if valid_ids else 0
+
+        symbol_names = ["UNKNOWN"] * table_size
+        for name, symbol_id in symbol_ids.items():
+            if symbol_id >= 0 and symbol_names[symbol_id] == "UNKNOWN":
+                symbol_names[symbol_id] = name
+
+        wild_id = symbol_ids.get("WILD", -1)
+        scatter_id = symbol_ids.get("BONUS", -1)
+
+        # Ways 賠付表：[symbol_id][count]
+        base_game_pays = paytable.get("base_game", {})
+        max_count = reel_count
+        for symbol_pays in base_game_pays.values():
+            for count in symbol_pays:
+                max_count = max(max_count, int(count))
+
+        pays = []
+        for symbol_id in range(table_size):
+            symbol_pays = base_game_pays.get(symbol_names[symbol_id], {})
+            pays.append(tuple(symbol_pays.get(str(count), 0) for count in range(max_count + 1)))
+
+        # 散佈賠付表：[count]，全盤最多 reel_count * reel_height 個
+        scatter_name = symbol_names[scatter_id] if scatter_id >= 0 else ""
+        scatter_symbol_pays = paytable.get("scatter_pays", {}).get(scatter_name, {})
+        scatter_pays = tuple(
+            scatter_symbol_pays.get(str(count), 0) for count in range(reel_count * reel_height + 1)
+        )
+
+        # 與 WinCalculator 原有規則一致：檢查 0..len(symbols)-1，排除散佈符號，
+        # 且只保留至少有一個非零賠付的符號
+        ways_symbol_ids = tuple(
+            symbol_id for symbol_id in range(min(len(symbols), table_size))
+            if symbol_id != scatter_id and any(pays[symbol_id])
+        )
+
+        p_symbol_ids = tuple(
+            symbol_ids[name] for name in P_SYMBOL_NAMES if symbol_ids.get(name, -1) >= 0
+        )
+
+        return cls(
+            reel_count=reel_count,
+            reel_height=reel_height,
+            symbol_names=tuple(symbol_names),
+            symbol_ids=MappingProxyType(dict(symbol_ids)),
+            pays=tuple(pays),
+            scatter_pays=scatter_pays,
+            wild_id=wild_id,
+            scatter_id=scatter_id,
+            is_wild=tuple(symbol_id == wild_id for symbol_id in range(table_size)),
+            is_scatter=tuple(symbol_id == scatter_id for symbol_id in range(table_size)),
+            p_symbol_ids=p_symbol_ids,
+            ways_symbol_ids=ways_symbol_ids,
+            initial_free_spins=config.get("free_spins", {}).get("initial_spins", 7)
+        )
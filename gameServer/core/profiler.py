@@ -0,0 +1,154 @@
+"""
+階段計時器 - 記錄引擎各階段的牆鐘時間與呼叫次數
+階段名稱：spin / free_spin / spin_batch (整次旋轉)、rng (隨機數)、lookup (視窗查表)、
+evaluation (贏分計算)、transformation (符號變換)、serialization (結果輸出)；
+整次旋轉包含其內部階段，因此各階段時間不可直接相加。
+預設停用，停用時每個階段只多一次旗標檢查，可於執行期間以 enable() / disable() 切換；
+SpinRangeProfiler 以 cProfile 分析指定的旋轉範圍
+"""
+
+import cProfile
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+
+@dataclass
+class StageStats:
+    """單一階段的累計"""
+    calls: int = 0
+    total_time: float = 0.0     # 秒
+    max_time: float = 0.0       # 單次最長 (秒)
+
+    @property
+    def mean_time(self) -> float:
+        """平均每次用時 (秒)"""
+        return self.total_time / self.calls if self.calls > 0 else 0.0
+
+
+class StageProfiler:
+    """
+    階段計時器
+    熱路徑以 start() / stop() 成對使用：停用時 start() 返回 0，stop() 直接返回；
+    非熱路徑可使用 measure() 上下文管理器
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.stages: Dict[str, StageStats] = {}
+
+    def enable(self):
+        """開始記錄"""
+        self.enabled = True
+
+    def disable(self):
+        """停止記錄 (已累計的資料保留)"""
+        self.enabled = False
+
+    def reset(self):
+        """清除累計資料"""
+        self.stages = {}
+
+    def start(self) -> float:
+        """階段開始時間 (停用時為 0)"""
+        return time.perf_counter() if self.enabled else 0.0
+
+    def stop(self, stage: str, started: float):
+        """記錄階段結束 (start() 時停用則不記錄)"""
+        if not started:
+            return
+        elapsed = time.perf_counter() - started
+        stats = self.stages.get(stage)
+        if stats is None:
+            stats = self.stages[stage] = StageStats()
+        stats.calls += 1
+        stats.total_time += elapsed
+        if elapsed > stats.max_time:
+            stats.max_time = elapsed
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        """以上下文管理器記錄一個階段"""
+        started = self.start()
+        try:
+            yield
+        finally:
+            self.stop(stage, started)
+
+    def merge(self, other: "StageProfiler"):
+        """合併另一個計時器的累計資料"""
+        for stage, other_stats in other.stages.items():
+            stats = self.stages.setdefault(stage, StageStats())
+            stats.calls += other_stats.calls
+            stats.total_time += other_stats.total_time
+            stats.max_time = max(stats.max_time, other_stats.max_time)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """各階段摘要 (可導出，時間單位為秒)"""
+        return {
+            stage: {
+                "calls": stats.calls,
+                "total_time": stats.total_time,
+                "mean_time": stats.mean_time,
+                "max_time": stats.max_time
+            }
+            for stage, stats in self.stages.items()
+        }
+
+    def format_report(self, wall_time: Optional[float] = None) -> str:
+        """
+        各階段時間表 (依總時間排序)
+        wall_time: 整體用時 (秒)，提供時加上各階段佔比
+        """
+        lines: List[str] = [f"{'階段':<14}{'次數':>10}{'總時間(ms)':>14}{'平均(µs)':>12}{'最長(µs)':>12}"
+                            + (f"{'佔比':>8}" if wall_time else "")]
+        for stage, stats in sorted(self.stages.items(), key=lambda item: item[1].total_time, reverse=True):
+            line = (f"{stage:<14}{stats.calls:>10,}{stats.total_time * 1e3:>14.1f}"
+                    f"{stats.mean_time * 1e6:>12.1f}{stats.max_time * 1e6:>12.1f}")
+            if wall_time:
+                line += f"{stats.total_time / wall_time * 100:>7.1f}%"
+            lines.append(line)
+        return "\n".join(lines)
+
+
+class SpinRangeProfiler:
+    """
+    以 cProfile 分析指定的旋轉範圍 [start, end)，範圍結束時寫入 pstats 檔案
+    模擬迴圈在每次旋轉 (或每個區塊) 前呼叫 update()，迴圈結束後呼叫 finish()
+    """
+
+    def __init__(self, start: int, end: int, output_path: str):
+        if start < 0 or end <= start:
+            raise ValueError(f"無效的旋轉範圍: [{start}, {end})")
+        self.start = start
+        self.end = end
+        self.output_path = output_path
+        self.finished = False
+        self._profile = None
+
+    def update(self, spin_index: int, count: int = 1):
+        """即將執行 [spin_index, spin_index + count) 的旋轉"""
+        if self.finished:
+            return
+        if spin_index >= self.end:
+            self.finish()
+        elif self._profile is None and spin_index + count > self.start:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def finish(self) -> Optional[str]:
+        """停止分析並寫入檔案，返回檔案路徑 (範圍內沒有旋轉時為 None)"""
+        if self.finished:
+            return None
+        self.finished = True
+        if self._profile is None:
+            return None
+        self._profile.disable()
+        directory = os.path.dirname(self.output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._profile.dump_stats(self.output_path)
+        self._profile = None
+        return self.output_path
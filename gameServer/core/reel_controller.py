@@ -3,10 +3,13 @@
 實現好運咚咚遊戲的滾輪機制，包括慢動作效果
 """
 
-from typing import List, Dict, Any, Tuple
-import random
+from typing import List, Dict, Any, Tuple, Optional
 import time
 
+from .game_engine import DEFAULT_REEL_STRIPS
+from .game_model import CompiledGameModel
+from .rng import RandomStream
+
 class ReelState:
     """滾輪狀態列舉"""
     IDLE = "idle"
@@ -18,9 +21,19 @@ class ReelState:
 class ReelController:
     """滾輪控制器類"""
     
-    def __init__(self, config: Dict[str, Any]):
-        """初始化滾輪控制器"""
+    # 觸發特色的條件機率達此門檻時才播放慢動作
+    SLOW_MOTION_MIN_PROBABILITY = 0.05
+    
+    def __init__(self, config: Dict[str, Any], model: Optional[CompiledGameModel] = None,
+                 rng: Optional[RandomStream] = None, reel_strips: Optional[List[List[int]]] = None):
+        """
+        初始化滾輪控制器 (model 為共用的編譯後遊戲模型，rng 為隨機數流)
+        reel_strips 未提供時使用 GameEngine 的預設滾輪條帶
+        """
         self.config = config
+        self.rng = rng if rng is not None else RandomStream()
+        self.model = model if model is not None else CompiledGameModel.from_config(config)
+        self.bonus_symbol_id = self.model.scatter_id if self.model.scatter_id >= 0 else 9
         self.reel_config = config.get("reel_config", {})
         self.reel_count = self.reel_config.get("reel_count", 5)
         self.reel_height = self.reel_config.get("reel_height", 3)
@@ -31,42 +44,19 @@ class ReelController:
         self.target_positions = [0] * self.reel_count
         self.slow_motion_flags = [False] * self.reel_count
         
-        # 滾輪條帶 (從 GameEngine 獲取或生成)
-        self.reel_strips = self._generate_default_strips()
+        # 滾輪條帶 (與 GameEngine 相同) 與視窗 -> 停止位置索引
+        self.set_reel_strips(reel_strips if reel_strips is not None
+                             else [list(strip) for strip in DEFAULT_REEL_STRIPS])
         
         # 旋轉參數
         self.spin_duration = 3.0  # 基礎旋轉時間 (秒)
         self.slow_motion_duration = 2.0  # 慢動作額外時間
         self.reel_stop_intervals = [0.0, 0.5, 1.0, 1.5, 2.0]  # 各滾輪停止時間偏移
     
-    def _generate_default_strips(self) -> List[List[int]]:
-        """生成默認的滾輪條帶"""
-        # 這裡提供一個簡化的條帶生成邏輯
-        # 實際遊戲中會從配置文件或服務器獲取
-        
-        base_symbols = [0, 1, 2, 3, 4, 5, 6, 7, 8]  # P5, P4, P3, P2, P1, K, Q, J, T
-        bonus_symbol = 9  # BONUS
-        wild_symbol = 10  # WILD
-        
-        strips = []
-        for reel_idx in range(self.reel_count):
-            strip = []
-            strip_length = 40  # 每個滾輪40個符號
-            
-            for i in range(strip_length):
-                if i % 15 == 0:  # 每15個位置放一個BONUS
-                    strip.append(bonus_symbol)
-                elif i % 20 == 0:  # 每20個位置放一個WILD
-                    strip.append(wild_symbol)
-                else:
-                    # 隨機選擇基礎符號，權重向低價值符號傾斜
-                    weights = [1, 2, 3, 4, 5, 6, 6, 7, 7]  # T, J 權重最高
-                    symbol = random.choices(base_symbols, weights=weights)[0]
-                    strip.append(symbol)
-            
-            strips.append(strip)
-        
-        return strips
+    @classmethod
+    def from_engine(cls, engine, rng: Optional[RandomStream] = None) -> "ReelController":
+        """由 GameEngine 建立控制器，共用其設定、遊戲模型與滾輪條帶"""
+        return cls(engine.config, engine.model, rng, engine.reel_strips)
     
     def set_reel_strips(self, strips: List[List[int]]):
         """設置滾輪條帶"""
@@ -74,12 +64,62 @@ class ReelController:
             raise ValueError(f"條帶數量 {len(strips)} 與滾輪數量 {self.reel_count} 不匹配")
         
         self.reel_strips = strips
+        self.stop_index = self._build_stop_index()
+        self.bonus_probabilities = self._build_bonus_probabilities()
+    
+    def _build_stop_index(self) -> List[Dict[Tuple[int, ...], List[int]]]:
+        """
+        建立每輪的視窗索引：視窗符號 tuple -> 可停止位置列表 (由小到大)
+        包含條帶首尾相接的視窗，與逐一比對所有起始位置的結果相同
+        """
+        stop_index = []
+        for reel_strip in self.reel_strips:
+            strip_length = len(reel_strip)
+            reel_index: Dict[Tuple[int, ...], List[int]] = {}
+            for start_pos in range(strip_length):
+                window = tuple(reel_strip[(start_pos + i) % strip_length] for i in range(self.reel_height))
+                reel_index.setdefault(window, []).append(start_pos)
+            stop_index.append(reel_index)
+        return stop_index
+    
+    def _build_bonus_probabilities(self) -> List[float]:
+        """
+        計算每輪停止視窗含 BONUS 的精確機率
+        停止位置範圍與 GameEngine 相同 (0 .. len(strip) - reel_height，均勻抽取)
+        """
+        probabilities = []
+        for reel_strip in self.reel_strips:
+            stop_count = max(1, len(reel_strip) - self.reel_height + 1)
+            bonus_stops = sum(
+                1 for start_pos in range(stop_count)
+                if self.bonus_symbol_id in reel_strip[start_pos:start_pos + self.reel_height]
+            )
+            probabilities.append(bonus_stops / stop_count)
+        return probabilities
+    
+    def find_stop_positions(self, reel_idx: int, window: List[int]) -> List[int]:
+        """查詢視窗在指定滾輪上所有可停止的位置 (找不到時返回空列表)"""
+        return self.stop_index[reel_idx].get(tuple(window), [])
+    
+    def choose_stop_position(self, reel_idx: int, window: List[int], uniform: bool = False) -> int:
+        """
+        選擇視窗的停止位置
+        uniform: 在多個符合的位置中均勻隨機選擇，否則取第一個；找不到時返回 0
+        """
+        positions = self.find_stop_positions(reel_idx, window)
+        if not positions:
+            return 0
+        if uniform and len(positions) > 1:
+            return self.rng.choice(positions)
+        return positions[0]
     
-    def start_spin(self, target_result: List[List[int]], slow_motion_flags: List[bool] = None):
+    def start_spin(self, target_result: List[List[int]], slow_motion_flags: List[bool] = None,
+                   uniform_stops: bool = False):
         """
         開始旋轉
         target_result: 目標結果 (5x3)
         slow_motion_flags: 慢動作標記 (對應每個滾輪)
+        uniform_stops: 目標視窗在條帶上有多個位置時均勻隨機選擇
         """
         if len(target_result) != self.reel_count:
             raise ValueError(f"目標結果滾輪數量 {len(target_result)} 與配置不匹配")
@@ -91,7 +131,7 @@ class ReelController:
             self.slow_motion_flags = [False] * self.reel_count
         
         # 計算目標位置
-        self.target_positions = self._calculate_target_positions(target_result)
+        self.target_positions = self._calculate_target_positions(target_result, uniform_stops)
         
         # 設置所有滾輪為旋轉狀態
         self.reel_states = [ReelState.SPINNING] * self.reel_count
@@ -99,33 +139,10 @@ class ReelController:
         # 模擬旋轉過程
         self._simulate_spinning_process()
     
-    def _calculate_target_positions(self, target_result: List[List[int]]) -> List[int]:
-        """計算每個滾輪的目標位置"""
-        target_positions = []
-        
-        for reel_idx in range(self.reel_count):
-            reel_strip = self.reel_strips[reel_idx]
-            target_symbols = target_result[reel_idx]
-            
-            # 在條帶中尋找匹配的位置
-            strip_length = len(reel_strip)
-            best_position = 0
-            
-            for start_pos in range(strip_length):
-                match_count = 0
-                for i in range(self.reel_height):
-                    strip_symbol = reel_strip[(start_pos + i) % strip_length]
-                    target_symbol = target_symbols[i]
-                    if strip_symbol == target_symbol:
-                        match_count += 1
-                
-                if match_count == self.reel_height:
-                    best_position = start_pos
-                    break
-            
-            target_positions.append(best_position)
-        
-        return target_positions
+    def _calculate_target_positions(self, target_result: List[List[int]], uniform: bool = False) -> List[int]:
+        """計算每個滾輪的目標位置 (查詢視窗索引)"""
+        return [self.choose_stop_position(reel_idx, target_result[reel_idx], uniform)
+                for reel_idx in range(self.reel_count)]
     
     def _simulate_spinning_process(self):
         """模擬旋轉過程"""
@@ -174,59 +191,63 @@ class ReelController:
     def check_slow_motion_trigger(self, current_symbols: List[List[int]]) -> List[bool]:
         """
         檢查慢動作觸發條件
-        根據遊戲規則：當前兩輪出現 BONUS 符號時，第三輪觸發慢動作
+        觸發輪 (前三輪) 停止前，以前面已停止滾輪的結果計算特色觸發的條件機率：
+        前面任一輪缺少 BONUS 時為 0，否則為本輪至第三輪 BONUS 機率的乘積；
+        條件機率不低於 SLOW_MOTION_MIN_PROBABILITY 且結果尚未確定 (< 1) 時觸發慢動作
         """
-        bonus_symbol_id = self.config.get("symbols", {}).get("BONUS", {}).get("id", 9)
+        bonus_symbol_id = self.bonus_symbol_id
         slow_motion_flags = [False] * self.reel_count
+        trigger_reels = min(3, self.reel_count, len(current_symbols))
         
-        # 檢查前兩輪是否有 BONUS
-        bonus_in_reel_1 = any(symbol == bonus_symbol_id for symbol in current_symbols[0])
-        bonus_in_reel_2 = any(symbol == bonus_symbol_id for symbol in current_symbols[1])
-        
-        # 如果前兩輪都有 BONUS，第三輪觸發慢動作
-        if bonus_in_reel_1 and bonus_in_reel_2 and len(slow_motion_flags) > 2:
-            slow_motion_flags[2] = True
+        for reel_idx in range(1, trigger_reels):
+            if any(bonus_symbol_id not in current_symbols[idx] for idx in range(reel_idx)):
+                break  # 已停止的滾輪缺少 BONUS，之後不可能觸發
+            
+            conditional_probability = 1.0
+            for idx in range(reel_idx, trigger_reels):
+                conditional_probability *= self.bonus_probabilities[idx]
+            slow_motion_flags[reel_idx] = self.SLOW_MOTION_MIN_PROBABILITY <= conditional_probability < 1.0
         
         return slow_motion_flags
     
     def predict_feature_trigger(self, current_symbols: List[List[int]]) -> Dict[str, Any]:
         """
         預測特色觸發機率
-        基於當前滾輪狀態分析觸發可能性
+        已停止的前三輪必須各有 BONUS，未停止的輪以條帶精確機率相乘 (各輪獨立)
         """
-        bonus_symbol_id = self.config.get("symbols", {}).get("BONUS", {}).get("id", 9)
+        bonus_symbol_id = self.bonus_symbol_id
         
         # 統計已停止滾輪中的 BONUS 數量
         bonus_count = 0
         bonus_positions = []
+        missing_stopped_reel = False
+        trigger_probability = 1.0
         
         for reel_idx in range(min(3, len(current_symbols))):  # 只檢查前3輪
             if self.reel_states[reel_idx] == ReelState.STOPPED:
-                for pos, symbol in enumerate(current_symbols[reel_idx]):
-                    if symbol == bonus_symbol_id:
-                        bonus_count += 1
-                        bonus_positions.append((reel_idx, pos))
-                        break  # 每輪最多計算一個
+                if bonus_symbol_id in current_symbols[reel_idx]:
+                    pos = current_symbols[reel_idx].index(bonus_symbol_id)  # 每輪最多計算一個
+                    bonus_count += 1
+                    bonus_positions.append((reel_idx, pos))
+                else:
+                    missing_stopped_reel = True
+            else:
+                trigger_probability *= self.bonus_probabilities[reel_idx]
         
         # 計算剩餘滾輪的觸發機率
         remaining_reels = 3 - len([r for r in self.reel_states[:3] if r == ReelState.STOPPED])
         needed_bonus = max(0, 3 - bonus_count)
         
-        if needed_bonus > remaining_reels:
+        if missing_stopped_reel or needed_bonus > remaining_reels:
             trigger_probability = 0.0
-        elif needed_bonus == 0:
-            trigger_probability = 1.0
-        else:
-            # 簡化的機率計算 (實際遊戲中會基於滾輪條帶的精確分析)
-            bonus_rate = 0.1  # 假設每輪 10% 機率出現 BONUS
-            trigger_probability = bonus_rate ** needed_bonus
         
         return {
             "current_bonus_count": bonus_count,
             "needed_bonus": needed_bonus,
             "remaining_reels": remaining_reels,
             "trigger_probability": trigger_probability,
-            "bonus_positions": bonus_positions
+            "bonus_positions": bonus_positions,
+            "reel_bonus_probabilities": self.bonus_probabilities[:3]
         }
     
     def get_reel_state_info(self) -> Dict[str, Any]:
@@ -248,24 +269,7 @@ class ReelController:
     
     def validate_target_result(self, target_result: List[List[int]]) -> bool:
         """驗證目標結果是否可以在滾輪條帶中找到"""
-        for reel_idx, target_symbols in enumerate(target_result):
-            reel_strip = self.reel_strips[reel_idx]
-            strip_length = len(reel_strip)
-            
-            found = False
-            for start_pos in range(strip_length):
-                match = True
-                for i in range(len(target_symbols)):
-                    strip_symbol = reel_strip[(start_pos + i) % strip_length]
-                    if strip_symbol != target_symbols[i]:
-                        match = False
-                        break
-                
-                if match:
-                    found = True
-                    break
-            
-            if not found:
-                return False
-        
-        return True
\ No newline at end of file
+        return all(
+            tuple(target_symbols) in self.stop_index[reel_idx]
+            for reel_idx, target_symbols in enumerate(target_result)
+        )
\ No newline at end of file
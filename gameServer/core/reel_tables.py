@@ -0,0 +1,130 @@
+"""
+滾輪視窗表 - 預先計算每個滾輪所有停止位置的可見視窗
+旋轉時只需抽取停止位置並查表，不再逐格掃描滾輪結果
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .game_model import CompiledGameModel
+
+
+@dataclass(frozen=True, eq=False)
+class ReelWindowTable:
+    """
+    單一滾輪的視窗表 (第一維為停止位置)
+    symbol_counts[stop][symbol_id] 為含 WILD 替代的數量；
+    WILD 欄為 WILD 本身數量，BONUS 欄為 BONUS 本身數量 (散佈符號不被替代)
+    """
+    reel_index: int
+    windows: Tuple[Tuple[int, ...], ...]                     # [stop] -> 視窗符號
+    symbol_counts: Tuple[Tuple[int, ...], ...]               # [stop][symbol_id] -> 數量
+    bonus_counts: Tuple[int, ...]                            # [stop] -> BONUS 數量
+    positions: Tuple[Tuple[Tuple[int, ...], ...], ...]       # [stop][symbol_id] -> 絕對位置
+    window_array: np.ndarray                                 # (stops, reel_height)
+    count_array: np.ndarray                                  # (stops, symbol_count)
+    bonus_count_array: np.ndarray                            # (stops,)
+
+    @property
+    def stop_count(self) -> int:
+        """可停止位置數"""
+        return len(self.windows)
+
+    @property
+    def has_bonus(self) -> Tuple[bool, ...]:
+        """[stop] -> 視窗內是否有 BONUS"""
+        return tuple(count > 0 for count in self.bonus_counts)
+
+
+@dataclass(frozen=True, eq=False)
+class ReelWindowTables:
+    """全部滾輪的視窗表"""
+    model: CompiledGameModel
+    reels: Tuple[ReelWindowTable, ...]
+
+    @property
+    def stop_counts(self) -> List[int]:
+        """各輪可停止位置數"""
+        return [reel.stop_count for reel in self.reels]
+
+    @classmethod
+    def from_strips(cls, model: CompiledGameModel, reel_strips: Sequence[Sequence[int]],
+                    stop_counts: Optional[Sequence[int]] = None) -> "ReelWindowTables":
+        """
+        由滾輪條帶建立視窗表
+        stop_counts: 每輪可停止位置數，預設與 GameEngine 相同 (len(strip) - reel_height + 1)
+        """
+        reel_height = model.reel_height
+        if stop_counts is None:
+            stop_counts = [len(strip) - reel_height + 1 for strip in reel_strips]
+
+        reels = tuple(
+            cls._build_reel(model, reel_idx, list(strip), stop_counts[reel_idx])
+            for reel_idx, strip in enumerate(reel_strips)
+        )
+        return cls(model=model, reels=reels)
+
+    @staticmethod
+    def _build_reel(model: CompiledGameModel, reel_idx: int, strip: List[int],
+                    stop_count: int) -> ReelWindowTable:
+        """建立單輪視窗表"""
+        reel_height = model.reel_height
+        symbol_count = model.symbol_count
+
+        windows, symbol_counts, bonus_counts, positions = [], [], [], []
+        for stop in range(stop_count):
+            window = tuple(strip[(stop + row) % len(strip)] for row in range(reel_height))
+
+            stop_positions = []
+            for symbol_id in range(symbol_count):
+                substitutable = symbol_id != model.scatter_id and symbol_id != model.wild_id
+                stop_positions.append(tuple(
+                    reel_idx * reel_height + row for row, symbol in enumerate(window)
+                    if symbol == symbol_id or (substitutable and symbol == model.wild_id)
+                ))
+
+            windows.append(window)
+            positions.append(tuple(stop_positions))
+            symbol_counts.append(tuple(len(symbol_positions) for symbol_positions in stop_positions))
+            bonus_counts.append(sum(1 for symbol in window if symbol == model.scatter_id))
+
+        window_array = np.array(windows, dtype=np.int64).reshape(stop_count, reel_height)
+        count_array = np.array(symbol_counts, dtype=np.int64).reshape(stop_count, symbol_count)
+        bonus_count_array = np.array(bonus_counts, dtype=np.int64)
+        for array in (window_array, count_array, bonus_count_array):
+            array.setflags(write=False)
+
+        return ReelWindowTable(
+            reel_index=reel_idx,
+            windows=tuple(windows),
+            symbol_counts=tuple(symbol_counts),
+            bonus_counts=tuple(bonus_counts),
+            positions=tuple(positions),
+            window_array=window_array,
+            count_array=count_array,
+            bonus_count_array=bonus_count_array
+        )
+
+    # ==================== 單次查表 ====================
+
+    def reel_result(self, stops: Sequence[int]) -> List[List[int]]:
+        """由停止位置取得滾輪結果 (與逐格讀取條帶相同)"""
+        return [list(reel.windows[stop]) for reel, stop in zip(self.reels, stops)]
+
+    def is_feature_trigger(self, stops: Sequence[int], trigger_reels: int = 3) -> bool:
+        """前 trigger_reels 輪是否皆有 BONUS"""
+        return all(reel.bonus_counts[stop] > 0 for reel, stop in zip(self.reels[:trigger_reels], stops))
+
+    # ==================== 批量查表 ====================
+
+    def gather_windows(self, stops: np.ndarray) -> np.ndarray:
+        """(n, reel_count) 停止位置 -> (n, reel_count, reel_height) 滾輪結果"""
+        return np.stack([reel.window_array[stops[:, reel_idx]] for reel_idx, reel in enumerate(self.reels)], axis=1)
+
+    def gather_counts(self, stops: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(n, reel_count) 停止位置 -> ((n, reel_count, symbol_count) 符號數量, (n, reel_count) BONUS 數量)"""
+        counts = np.stack([reel.count_array[stops[:, reel_idx]] for reel_idx, reel in enumerate(self.reels)], axis=1)
+        bonus = np.stack([reel.bonus_count_array[stops[:, reel_idx]] for reel_idx, reel in enumerate(self.reels)], axis=1)
+        return counts, bonus
@@ -0,0 +1,97 @@
+"""
+隨機數流 - 可注入遊戲引擎、特色功能與模擬器的隨機數來源
+以 numpy.random.Generator 為基礎，支援計數器型生成器、區塊預取與獨立子流
+"""
+
+from bisect import bisect_right
+from itertools import accumulate
+from typing import List, Optional, Sequence, Union, Any
+
+import numpy as np
+
+# 可用的位元生成器 (Philox 為計數器型，PCG64 為預設)
+BIT_GENERATORS = {
+    "PCG64": np.random.PCG64,
+    "PCG64DXSM": np.random.PCG64DXSM,
+    "Philox": np.random.Philox,
+    "SFC64": np.random.SFC64
+}
+
+SeedLike = Union[None, int, np.random.SeedSequence]
+
+
+class RandomStream:
+    """
+    隨機數流
+    純量抽取從預先產生的區塊讀取，區塊用完時一次性補充；
+    spawn() 產生統計上互相獨立的子流，供不同會話或工作進程使用
+    """
+
+    def __init__(self, seed: SeedLike = None, bit_generator: str = "PCG64", block_size: int = 4096):
+        """
+        初始化隨機數流
+        seed: 整數種子、SeedSequence 或 None (使用系統熵)
+        bit_generator: 位元生成器名稱，見 BIT_GENERATORS
+        block_size: 純量抽取的預取區塊大小
+        """
+        if bit_generator not in BIT_GENERATORS:
+            raise ValueError(f"不支援的位元生成器: {bit_generator}")
+
+        if isinstance(seed, np.random.SeedSequence):
+            self.seed_sequence = seed
+        else:
+            self.seed_sequence = np.random.SeedSequence(seed)
+
+        self.bit_generator_name = bit_generator
+        self.block_size = block_size
+        self.generator = np.random.Generator(BIT_GENERATORS[bit_generator](self.seed_sequence))
+
+        self._uniform_block: List[float] = []
+        self._uniform_index = 0
+
+    def spawn(self, count: int) -> List["RandomStream"]:
+        """產生 count 個獨立子流"""
+        return [
+            RandomStream(child, self.bit_generator_name, self.block_size)
+            for child in self.seed_sequence.spawn(count)
+        ]
+
+    # ==================== 純量抽取 (區塊預取) ====================
+
+    def random(self) -> float:
+        """[0, 1) 均勻分布"""
+        if self._uniform_index >= len(self._uniform_block):
+            self._uniform_block = self.generator.random(self.block_size).tolist()
+            self._uniform_index = 0
+
+        value = self._uniform_block[self._uniform_index]
+        self._uniform_index += 1
+        return value
+
+    def randint(self, a: int, b: int) -> int:
+        """[a, b] 均勻整數 (與 random.randint 相同的閉區間)"""
+        return a + int(self.random() * (b - a + 1))
+
+    def choice(self, population: Sequence[Any]) -> Any:
+        """從序列中均勻選擇一個元素"""
+        return population[int(self.random() * len(population))]
+
+    def weighted_choice(self, population: Sequence[Any], weights: Sequence[float]) -> Any:
+        """依權重選擇一個元素 (與 random.choices(population, weights)[0] 相同)"""
+        cum_weights = list(accumulate(weights))
+        return population[bisect_right(cum_weights, self.random() * cum_weights[-1], 0, len(cum_weights) - 1)]
+
+    def gauss(self, mu: float = 0.0, sigma: float = 1.0) -> float:
+        """常態分布"""
+        return float(self.generator.normal(mu, sigma))
+
+    # ==================== 區塊抽取 ====================
+
+    def integers(self, low: Any, high: Any, size: Any = None) -> np.ndarray:
+        """[low, high) 均勻整數陣列，low/high 可為陣列 (逐欄不同範圍)"""
+        return self.generator.integers(low, high, size=size)
+
+    def uniform(self, size: Any = None) -> np.ndarray:
+        """[0, 1) 均勻分布陣列"""
+        return self.generator.random(size)
+
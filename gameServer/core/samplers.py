@@ -0,0 +1,140 @@
+"""
+加權抽樣器 - Vose 別名法 (alias method)
+建立一次後每次抽樣為 O(1)，並支援一次抽取多個樣本；
+另提供重要性抽樣用的停止位置提議分布
+"""
+
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .rng import RandomStream
+
+
+class AliasSampler:
+    """
+    別名法加權抽樣器
+    建表 O(n)，抽樣只需一個均勻整數與一個均勻小數
+    """
+
+    # sample_list 的樣本數達到此值時改用向量化路徑 (遊戲內的少量抽樣維持純量路徑的隨機數用法)
+    VECTORIZE_THRESHOLD = 32
+
+    def __init__(self, values: Sequence[Any], weights: Sequence[float]):
+        """由候選值與權重建表 (權重不需標準化)"""
+        if len(values) == 0 or len(values) != len(weights):
+            raise ValueError("候選值與權重長度必須相同且不為空")
+        total = float(sum(weights))
+        if total <= 0 or any(weight < 0 for weight in weights):
+            raise ValueError("權重必須非負且總和大於 0")
+
+        size = len(values)
+        self.values = tuple(values)
+        self.weights = tuple(weights)
+
+        scaled = [weight * size / total for weight in weights]
+        probability = [1.0] * size
+        alias = list(range(size))
+        small = [i for i, value in enumerate(scaled) if value < 1.0]
+        large = [i for i, value in enumerate(scaled) if value >= 1.0]
+
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            probability[less] = scaled[less]
+            alias[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+        # 剩餘項目因浮點誤差留下，機率視為 1
+
+        self.probability = tuple(probability)
+        self.alias = tuple(alias)
+        self._probability_array = np.array(probability)
+        self._alias_array = np.array(alias)
+        self._values_array = np.array(values)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def sample(self, rng: RandomStream, k: Optional[int] = None) -> Any:
+        """
+        抽樣
+        k 為 None 時返回單一值，否則返回長度 k 的陣列
+        """
+        if k is None:
+            scaled = rng.random() * len(self.values)
+            index = int(scaled)
+            if scaled - index < self.probability[index]:
+                return self.values[index]
+            return self.values[self.alias[index]]
+
+        index = rng.integers(0, len(self.values), size=k)
+        accept = rng.uniform(k) < self._probability_array[index]
+        return self._values_array[np.where(accept, index, self._alias_array[index])]
+
+    def sample_list(self, rng: RandomStream, k: int) -> List[Any]:
+        """抽取 k 個樣本並返回列表 (少於 VECTORIZE_THRESHOLD 個時以純量路徑抽取，否則向量化抽取)"""
+        if k >= self.VECTORIZE_THRESHOLD:
+            return self.sample(rng, k).tolist()
+        return [self.sample(rng) for _ in range(k)]
+
+    def probabilities(self) -> List[float]:
+        """各候選值的實際抽樣機率 (由別名表還原)"""
+        size = len(self.values)
+        result = [0.0] * size
+        for index in range(size):
+            result[index] += self.probability[index] / size
+            result[self.alias[index]] += (1.0 - self.probability[index]) / size
+        return result
+
+
+class StopProposal:
+    """
+    停止位置重要性抽樣提議分布
+    每輪依 stop_weights 加權抽取停止位置 (權重必須全為正，確保估計不偏)，
+    並返回相對均勻抽樣的似然比 Π p(s) / q(s)；
+    mixture < 1 時為防禦性混合：每次旋轉以 mixture 機率使用加權提議、否則均勻抽取，
+    似然比上限為 1 / (1 - mixture)
+    """
+
+    def __init__(self, stop_weights: Sequence[Sequence[float]], mixture: float = 1.0):
+        """stop_weights: 每輪各停止位置的提議權重；mixture: 使用加權提議的機率"""
+        if not 0 < mixture <= 1:
+            raise ValueError("mixture 必須介於 0 (不含) 與 1 之間")
+        self.mixture = mixture
+        self.samplers = []
+        self.likelihood_ratios = []
+        for weights in stop_weights:
+            weights = np.asarray(weights, dtype=np.float64)
+            if len(weights) == 0 or (weights <= 0).any():
+                raise ValueError("停止位置提議權重必須全為正")
+            self.samplers.append(AliasSampler(list(range(len(weights))), weights.tolist()))
+            # p(s) / q(s) = (1 / n) / (w / Σw)
+            self.likelihood_ratios.append(weights.sum() / (len(weights) * weights))
+
+    @classmethod
+    def uniform(cls, stop_counts: Sequence[int]) -> "StopProposal":
+        """均勻提議 (似然比恆為 1)"""
+        return cls([[1.0] * stop_count for stop_count in stop_counts])
+
+    @property
+    def stop_counts(self) -> List[int]:
+        """每輪停止位置數"""
+        return [len(sampler) for sampler in self.samplers]
+
+    def sample(self, rng: RandomStream, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """抽取 k 組停止位置，返回 ((k, reel_count) 停止位置, (k,) 似然比)"""
+        stops = np.stack([sampler.sample(rng, k) for sampler in self.samplers], axis=1)
+        if self.mixture < 1:
+            uniform_rows = rng.uniform(k) >= self.mixture
+            uniform_count = int(uniform_rows.sum())
+            if uniform_count > 0:
+                stops[uniform_rows] = rng.integers(0, self.stop_counts, size=(uniform_count, len(self.samplers)))
+
+        likelihood = np.ones(k)
+        for reel_idx, ratios in enumerate(self.likelihood_ratios):
+            likelihood *= ratios[stops[:, reel_idx]]
+        if self.mixture < 1:
+            # 混合提議 q = (1 - α)·p + α·q_w，似然比 p / q = 1 / ((1 - α) + α·q_w / p)
+            likelihood = 1.0 / ((1 - self.mixture) + self.mixture / likelihood)
+        return stops, likelihood
@@ -3,16 +3,26 @@
 實現好運咚咚遊戲中 P 系列符號的隨機變換機制
 """
 
-from typing import List, Dict, Any, Tuple
-import random
+from typing import List, Dict, Any, Tuple, Optional
+
+import numpy as np
+
+from .game_model import CompiledGameModel
+from .profiler import StageProfiler
+from .rng import RandomStream
+from .samplers import AliasSampler
 
 class SymbolTransformer:
     """符號變換器類"""
     
-    def __init__(self, config: Dict[str, Any]):
-        """初始化符號變換器"""
+    def __init__(self, config: Dict[str, Any], model: Optional[CompiledGameModel] = None,
+                 rng: Optional[RandomStream] = None, profiler: Optional[StageProfiler] = None):
+        """初始化符號變換器 (model 為共用的編譯後遊戲模型，rng 為隨機數流，profiler 記錄 transformation 階段)"""
         self.config = config
+        self.profiler = profiler if profiler is not None else StageProfiler()
         self.symbols = config.get("symbols", {})
+        self.model = model if model is not None else CompiledGameModel.from_config(config)
+        self.rng = rng if rng is not None else RandomStream()
         
         # P 系列符號 ID
         self.p_symbols = {
@@ -31,40 +41,76 @@ class SymbolTransformer:
             "P4": 15,
             "P5": 10   # 最低機率 (~30% 相對於 P1)
         }
+        
+        # P 系列符號 ID 集合，避免逐格以名稱查詢
+        self.p_symbol_id_set = frozenset(self.model.p_symbol_ids)
+        
+        # 符號 ID -> 是否為 P 系列的查表陣列，供整盤變換使用
+        self.is_p_symbol = np.zeros(self.model.symbol_count, dtype=bool)
+        self.is_p_symbol[list(self.model.p_symbol_ids)] = True
+        
+        # 由變換權重預先建立別名表，每次抽樣 O(1)
+        self.p_symbol_sampler = AliasSampler(
+            [self.p_symbols[name] for name in self.transform_weights],
+            list(self.transform_weights.values())
+        )
     
     def _get_symbol_id(self, symbol_name: str) -> int:
         """獲取符號ID"""
-        return self.symbols.get(symbol_name, {}).get("id", -1)
+        return self.model.symbol_id(symbol_name)
     
     def _get_symbol_name(self, symbol_id: int) -> str:
         """根據ID獲取符號名稱"""
-        for name, data in self.symbols.items():
-            if data.get("id") == symbol_id:
-                return name
-        return "UNKNOWN"
+        return self.model.symbol_name(symbol_id)
     
     def transform_symbols(self, reel_result: List[List[int]]) -> List[List[int]]:
         """
         應用符號變換邏輯
         在免費旋轉中，所有 P 系列符號會隨機變換成其他 P 系列符號
         """
-        transformed_result = []
-        
-        for reel_symbols in reel_result:
-            transformed_reel = []
-            for symbol in reel_symbols:
-                transformed_symbol = self._transform_single_symbol(symbol)
-                transformed_reel.append(transformed_symbol)
-            transformed_result.append(transformed_reel)
-        
+        started = self.profiler.start()
+        transformed_result = [list(reel_symbols) for reel_symbols in reel_result]
+        
+        # 先找出全部 P 系列位置，再一次抽取所需的新符號
+        p_positions = []
+        for reel_idx, reel_symbols in enumerate(transformed_result):
+            for pos, symbol in enumerate(reel_symbols):
+                if symbol in self.p_symbol_id_set:
+                    p_positions.append((reel_idx, pos))
+                elif self._is_treasure_symbol(symbol):
+                    reel_symbols[pos] = self._apply_treasure_transform(symbol)
+        
+        new_symbols = self.p_symbol_sampler.sample_list(self.rng, len(p_positions))
+        for (reel_idx, pos), symbol in zip(p_positions, new_symbols):
+            transformed_result[reel_idx][pos] = symbol
+        
+        self.profiler.stop("transformation", started)
         return transformed_result
     
+    def transform_grid(self, grid: np.ndarray) -> np.ndarray:
+        """
+        整盤向量化符號變換
+        grid 可為平坦 (15,)、單盤 (5, 3) 或批量 (n, 5, 3) 的整數陣列，返回相同形狀的新陣列；
+        以查表找出全部 P 系列格子後一次抽取所有新符號；符號 ID 超出符號表範圍時拋出 ValueError
+        """
+        started = self.profiler.start()
+        grid = np.asarray(grid)
+        if grid.size and (grid.min() < 0 or grid.max() >= len(self.is_p_symbol)):
+            raise ValueError(f"符號 ID 超出範圍 [0, {len(self.is_p_symbol)})")
+        transformed = grid.copy()
+        p_cells = self.is_p_symbol[grid]
+        
+        p_count = int(p_cells.sum())
+        if p_count > 0:
+            transformed[p_cells] = self.p_symbol_sampler.sample(self.rng, p_count)
+        
+        self.profiler.stop("transformation", started)
+        return transformed
+    
     def _transform_single_symbol(self, symbol_id: int) -> int:
         """變換單個符號"""
-        symbol_name = self._get_symbol_name(symbol_id)
-        
         # 只變換 P 系列符號
-        if symbol_name in self.p_symbols:
+        if symbol_id in self.p_symbol_id_set:
             return self._random_p_symbol()
         
         # 檢查是否為特殊的寶藏符號變換
@@ -75,11 +121,7 @@ class SymbolTransformer:
     
     def _random_p_symbol(self) -> int:
         """隨機選擇一個 P 系列符號"""
-        symbols = list(self.p_symbols.keys())
-        weights = [self.transform_weights[symbol] for symbol in symbols]
-        
-        chosen_symbol = random.choices(symbols, weights=weights)[0]
-        return self.p_symbols[chosen_symbol]
+        return self.p_symbol_sampler.sample(self.rng)
     
     def _is_treasure_symbol(self, symbol_id: int) -> bool:
         """檢查是否為寶藏符號 (簡化實現)"""
@@ -140,7 +182,7 @@ class SymbolTransformer:
             # 主對角線變換
             if i < reel_count and i < len(transformed_result[i]):
                 symbol = transformed_result[i][i]
-                if self._get_symbol_name(symbol) in self.p_symbols:
+                if symbol in self.p_symbol_id_set:
                     transformed_result[i][i] = self._random_p_symbol()
         
         return transformed_result
@@ -181,10 +223,8 @@ class SymbolTransformer:
                     changed_symbols += 1
                     
                     # 檢查是否為 P 系列符號變換
-                    orig_name = self._get_symbol_name(original_symbol)
-                    trans_name = self._get_symbol_name(transformed_symbol)
-                    
-                    if orig_name in self.p_symbols and trans_name in self.p_symbols:
+                    if (original_symbol in self.p_symbol_id_set and
+                            transformed_symbol in self.p_symbol_id_set):
                         p_symbol_changes += 1
         
         return {
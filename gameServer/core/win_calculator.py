@@ -3,10 +3,17 @@
 實現好運咚咚遊戲的 243 Ways 贏分機制
 """
 
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional
 from dataclasses import dataclass
 import json
 
+import numpy as np
+
+from .bitboard import GridBitboard, mask_positions, popcount, popcount_table
+from .game_model import CompiledGameModel
+from .profiler import StageProfiler
+from .reel_tables import ReelWindowTables
+
 @dataclass
 class WinLine:
     """贏分線數據結構"""
@@ -21,60 +28,196 @@ class WinLine:
 class WinCalculator:
     """243 Ways 贏分計算器"""
     
-    def __init__(self, config: Dict[str, Any], paytable: Dict[str, Any]):
-        """初始化計算器"""
+    def __init__(self, config: Dict[str, Any], paytable: Dict[str, Any],
+                 model: Optional[CompiledGameModel] = None, profiler: Optional[StageProfiler] = None):
+        """初始化計算器 (model 為共用的編譯後遊戲模型，profiler 記錄 evaluation 階段)"""
         self.config = config
+        self.profiler = profiler if profiler is not None else StageProfiler()
         self.paytable = paytable
         self.symbols = config.get("symbols", {})
-        self.wild_symbol_id = self._get_symbol_id("WILD")
-        self.scatter_symbol_id = self._get_symbol_id("BONUS")
+        self.model = model if model is not None else CompiledGameModel.from_config(config, paytable)
+        self.wild_symbol_id = self.model.wild_id
+        self.scatter_symbol_id = self.model.scatter_id
     
     def _get_symbol_id(self, symbol_name: str) -> int:
         """獲取符號ID"""
-        return self.symbols.get(symbol_name, {}).get("id", -1)
+        return self.model.symbol_id(symbol_name)
     
     def _get_symbol_name(self, symbol_id: int) -> str:
         """根據ID獲取符號名稱"""
-        for name, data in self.symbols.items():
-            if data.get("id") == symbol_id:
-                return name
-        return "UNKNOWN"
+        return self.model.symbol_name(symbol_id)
     
     def calculate_243_ways(self, reel_result: List[List[int]]) -> List[WinLine]:
         """計算 243 Ways 贏分"""
+        started = self.profiler.start()
         win_lines = []
+        board = GridBitboard.from_reel_result(reel_result, self.model)
         
         # 計算普通符號的 Ways 贏分
-        ways_wins = self._calculate_ways_wins(reel_result)
+        ways_wins = self._calculate_ways_wins(reel_result, board)
         win_lines.extend(ways_wins)
         
         # 計算散佈符號贏分
-        scatter_wins = self._calculate_scatter_wins(reel_result)
+        scatter_wins = self._calculate_scatter_wins(reel_result, board)
         win_lines.extend(scatter_wins)
         
+        self.profiler.stop("evaluation", started)
         return win_lines
     
-    def _calculate_ways_wins(self, reel_result: List[List[int]]) -> List[WinLine]:
-        """計算 Ways 贏分"""
+    def calculate_243_ways_at(self, tables: ReelWindowTables, stops: List[int]) -> List[WinLine]:
+        """
+        由停止位置計算 243 Ways 贏分
+        直接讀取視窗表中預先計算的數量與位置，結果與 calculate_243_ways 相同
+        """
+        started = self.profiler.start()
         win_lines = []
+        reels = tables.reels
+        pays = self.model.pays
+        
+        for symbol_id in self.model.ways_symbol_ids:
+            consecutive_count = 0
+            ways_multiplier = 1
+            for reel, stop in zip(reels, stops):
+                symbol_count_in_reel = reel.symbol_counts[stop][symbol_id]
+                if symbol_count_in_reel == 0:
+                    break  # 連續中斷
+                consecutive_count += 1
+                ways_multiplier *= symbol_count_in_reel
+            
+            if consecutive_count >= 3:  # 至少3連才有贏分
+                payout = pays[symbol_id][consecutive_count]
+                if payout > 0:
+                    positions = []
+                    for reel, stop in zip(reels[:consecutive_count], stops):
+                        positions.extend(reel.positions[stop][symbol_id])
+                    
+                    win_lines.append(WinLine(
+                        line_no=len(win_lines) + 1,
+                        symbol_id=symbol_id,
+                        positions=positions,
+                        credit=payout * ways_multiplier,
+                        multiplier=1,
+                        ways=ways_multiplier,
+                        win_type="normal"
+                    ))
+        
+        if self.scatter_symbol_id != -1:
+            scatter_count = sum(reel.bonus_counts[stop] for reel, stop in zip(reels, stops))
+            if scatter_count >= 3:  # 至少3個才有散佈贏分
+                payout = self.model.get_scatter_payout(scatter_count)
+                if payout > 0:
+                    positions = []
+                    for reel, stop in zip(reels, stops):
+                        positions.extend(reel.positions[stop][self.scatter_symbol_id])
+                    
+                    win_lines.append(WinLine(
+                        line_no=999,  # 散佈贏分使用特殊線號
+                        symbol_id=self.scatter_symbol_id,
+                        positions=positions,
+                        credit=payout,
+                        multiplier=1,
+                        ways=1,
+                        win_type="scatter"
+                    ))
+        
+        self.profiler.stop("evaluation", started)
+        return win_lines
+    
+    def calculate_243_ways_batch(self, reel_results: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        批量計算 243 Ways 贏分
+        reel_results: (n, reel_count, reel_height) 整數陣列
+        返回 total_credit / scatter_win / ways (n, symbol_count)，不建立 WinLine
+        """
+        started = self.profiler.start()
+        grids = np.asarray(reel_results)
+        symbol_counts = np.zeros(grids.shape[:2] + (self.model.symbol_count,), dtype=np.int64)
+        
+        if self.wild_symbol_id >= 0:
+            wild_cells = grids == self.wild_symbol_id
+        else:
+            wild_cells = np.zeros(grids.shape, dtype=bool)
+        
+        for symbol_id in self.model.ways_symbol_ids:
+            # 每輪符號數量 (含 WILD 替代)
+            symbol_counts[:, :, symbol_id] = ((grids == symbol_id) | wild_cells).sum(axis=2)
+        
+        if self.scatter_symbol_id != -1:
+            scatter_counts = (grids == self.scatter_symbol_id).sum(axis=2)
+        else:
+            scatter_counts = np.zeros(grids.shape[:2], dtype=np.int64)
+        
+        wins = self._ways_from_counts_batch(symbol_counts, scatter_counts)
+        self.profiler.stop("evaluation", started)
+        return wins
+    
+    def calculate_243_ways_counts_batch(self, symbol_counts: np.ndarray,
+                                        scatter_counts: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        由每輪符號數量批量計算 243 Ways 贏分
+        symbol_counts: (n, reel_count, symbol_count) 含 WILD 替代的數量 (可直接取自視窗表)
+        scatter_counts: (n, reel_count) 散佈符號數量
+        """
+        started = self.profiler.start()
+        wins = self._ways_from_counts_batch(symbol_counts, scatter_counts)
+        self.profiler.stop("evaluation", started)
+        return wins
+    
+    def _ways_from_counts_batch(self, symbol_counts: np.ndarray,
+                                scatter_counts: np.ndarray) -> Dict[str, np.ndarray]:
+        """calculate_243_ways_counts_batch 的計算本體"""
+        spin_count = symbol_counts.shape[0]
+        pay_matrix = self.model.pay_matrix
+        
+        total_credit = np.zeros(spin_count, dtype=np.int64)
+        ways = np.zeros((spin_count, self.model.symbol_count), dtype=np.int64)
         
-        # 檢查每種可能的符號組合
-        for symbol_id in range(len(self.symbols)):
-            if symbol_id == self.scatter_symbol_id:
-                continue  # 散佈符號單獨處理
+        for symbol_id in self.model.ways_symbol_ids:
+            # 連續中斷後的輪不計
+            per_reel = symbol_counts[:, :, symbol_id]
+            consecutive = np.cumprod(per_reel > 0, axis=1)
+            count = consecutive.sum(axis=1)
+            symbol_ways = np.where(consecutive > 0, per_reel, 1).prod(axis=1)
             
-            symbol_name = self._get_symbol_name(symbol_id)
-            ways_data = self._find_ways_for_symbol(reel_result, symbol_id)
+            payout = np.where(count >= 3, pay_matrix[symbol_id][count], 0)  # 至少3連才有贏分
+            symbol_ways = np.where(payout > 0, symbol_ways, 0)
+            ways[:, symbol_id] = symbol_ways
+            total_credit += payout * symbol_ways
+        
+        scatter_win = np.zeros(spin_count, dtype=np.int64)
+        if self.scatter_symbol_id != -1:
+            scatter_count = scatter_counts.sum(axis=1)
+            scatter_win = np.where(scatter_count >= 3,
+                                   self.model.scatter_pay_array[scatter_count], 0)
+            total_credit += scatter_win
+        
+        return {
+            "total_credit": total_credit,
+            "scatter_win": scatter_win,
+            "ways": ways
+        }
+    
+    def _calculate_ways_wins(self, reel_result: List[List[int]],
+                             board: Optional[GridBitboard] = None) -> List[WinLine]:
+        """計算 Ways 贏分"""
+        if board is None:
+            board = GridBitboard.from_reel_result(reel_result, self.model)
+        win_lines = []
+        
+        # 檢查每種有賠付的符號 (散佈符號單獨處理)
+        pays = self.model.pays
+        for symbol_id in self.model.ways_symbol_ids:
+            ways_data = self._find_ways_for_symbol(reel_result, symbol_id, board)
             
             if ways_data["count"] >= 3:  # 至少3連才有贏分
-                payout = self._get_payout(symbol_name, ways_data["count"])
+                payout = pays[symbol_id][ways_data["count"]]
                 if payout > 0:
                     credit = payout * ways_data["ways"]
                     
                     win_line = WinLine(
                         line_no=len(win_lines) + 1,
                         symbol_id=symbol_id,
-                        positions=ways_data["positions"],
+                        positions=mask_positions(ways_data["mask"]),  # 只在中獎時由遮罩展開位置
                         credit=credit,
                         multiplier=1,
                         ways=ways_data["ways"],
@@ -84,62 +227,61 @@ class WinCalculator:
         
         return win_lines
     
-    def _find_ways_for_symbol(self, reel_result: List[List[int]], target_symbol: int) -> Dict[str, Any]:
-        """找到指定符號的 Ways 數據"""
-        reel_count = len(reel_result)
+    def _find_ways_for_symbol(self, reel_result: List[List[int]], target_symbol: int,
+                              board: Optional[GridBitboard] = None) -> Dict[str, Any]:
+        """
+        找到指定符號的 Ways 數據
+        以位元遮罩計算：符號遮罩與 WILD 遮罩取聯集後，逐輪查表取得位元數
+        返回 count (連續輪數)、ways 與 mask (中獎位置遮罩)
+        """
+        if board is None:
+            board = GridBitboard.from_reel_result(reel_result, self.model)
+        
+        reel_height = board.reel_height
+        reel_bits = (1 << reel_height) - 1
+        reel_popcount = popcount_table(reel_height)
+        symbol_mask = board.mask(target_symbol) | board.mask(self.wild_symbol_id)
+        
         consecutive_count = 0
         ways_multiplier = 1
-        all_positions = []
+        win_mask = 0
         
         # 從左到右檢查連續的滾輪
-        for reel_idx in range(reel_count):
-            reel_symbols = reel_result[reel_idx]
-            symbol_count_in_reel = 0
-            reel_positions = []
-            
-            # 計算當前滾輪中目標符號的數量（包括 WILD 替代）
-            for pos, symbol in enumerate(reel_symbols):
-                if symbol == target_symbol or symbol == self.wild_symbol_id:
-                    symbol_count_in_reel += 1
-                    reel_positions.append(reel_idx * 3 + pos)  # 轉換為絕對位置
-            
-            if symbol_count_in_reel > 0:
-                consecutive_count += 1
-                ways_multiplier *= symbol_count_in_reel
-                all_positions.extend(reel_positions)
-            else:
+        for reel_idx in range(board.reel_count):
+            shift = reel_idx * reel_height
+            reel_mask = (symbol_mask >> shift) & reel_bits
+            if reel_mask == 0:
                 break  # 連續中斷
+            consecutive_count += 1
+            ways_multiplier *= reel_popcount[reel_mask]
+            win_mask |= reel_mask << shift
         
         return {
             "count": consecutive_count,
             "ways": ways_multiplier,
-            "positions": all_positions
+            "mask": win_mask
         }
     
-    def _calculate_scatter_wins(self, reel_result: List[List[int]]) -> List[WinLine]:
+    def _calculate_scatter_wins(self, reel_result: List[List[int]],
+                                board: Optional[GridBitboard] = None) -> List[WinLine]:
         """計算散佈符號贏分"""
         if self.scatter_symbol_id == -1:
             return []
+        if board is None:
+            board = GridBitboard.from_reel_result(reel_result, self.model)
         
         # 計算全盤散佈符號數量
-        scatter_count = 0
-        scatter_positions = []
-        
-        for reel_idx, reel_symbols in enumerate(reel_result):
-            for pos, symbol in enumerate(reel_symbols):
-                if symbol == self.scatter_symbol_id:
-                    scatter_count += 1
-                    scatter_positions.append(reel_idx * 3 + pos)
+        scatter_mask = board.mask(self.scatter_symbol_id)
+        scatter_count = popcount(scatter_mask)
         
         if scatter_count >= 3:  # 至少3個才有散佈贏分
-            symbol_name = self._get_symbol_name(self.scatter_symbol_id)
-            payout = self._get_scatter_payout(symbol_name, scatter_count)
+            payout = self.model.get_scatter_payout(scatter_count)
             
             if payout > 0:
                 win_line = WinLine(
                     line_no=999,  # 散佈贏分使用特殊線號
                     symbol_id=self.scatter_symbol_id,
-                    positions=scatter_positions,
+                    positions=mask_positions(scatter_mask),
                     credit=payout,
                     multiplier=1,
                     ways=1,
@@ -151,15 +293,13 @@ class WinCalculator:
     
     def _get_payout(self, symbol_name: str, count: int) -> int:
         """獲取符號賠付"""
-        base_game_pays = self.paytable.get("base_game", {})
-        symbol_pays = base_game_pays.get(symbol_name, {})
-        return symbol_pays.get(str(count), 0)
+        return self.model.get_payout(self.model.symbol_id(symbol_name), count)
     
     def _get_scatter_payout(self, symbol_name: str, count: int) -> int:
         """獲取散佈符號賠付"""
-        scatter_pays = self.paytable.get("scatter_pays", {})
-        symbol_pays = scatter_pays.get(symbol_name, {})
-        return symbol_pays.get(str(count), 0)
+        if self.model.symbol_id(symbol_name) != self.scatter_symbol_id:
+            return 0
+        return self.model.get_scatter_payout(count)
     
     def validate_win_line(self, win_line: WinLine, reel_result: List[List[int]]) -> bool:
         """驗證贏分線的正確性"""
@@ -6,7 +6,8 @@
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
 from enum import Enum
-import random
+
+from core.rng import RandomStream
 
 class PurchaseOption(Enum):
     """購買選項列舉"""
@@ -25,9 +26,10 @@ class PurchaseConfig:
 class FeatureBuyController:
     """特色購買控制器"""
     
-    def __init__(self, config: Dict[str, Any]):
-        """初始化特色購買控制器"""
+    def __init__(self, config: Dict[str, Any], rng: Optional[RandomStream] = None):
+        """初始化特色購買控制器 (rng 為隨機數流)"""
         self.config = config
+        self.rng = rng if rng is not None else RandomStream()
         
         # 載入購買選項配置
         feature_buy_config = config.get("feature_buy", {})
@@ -251,8 +253,9 @@ class FeatureBuyController:
         config = self.purchase_options[option]
         
         # 初始化特色
-        free_spins = FreeSpinsFeature(self.config)
-        war_drums = WarDrumsFeature(self.config)
+        free_spins_rng, war_drums_rng = self.rng.spawn(2)
+        free_spins = FreeSpinsFeature(self.config, free_spins_rng)
+        war_drums = WarDrumsFeature(self.config, war_drums_rng)
         war_drums.set_active_drums(config.drums_count)
         
         simulation_results = []
@@ -263,7 +266,7 @@ class FeatureBuyController:
             
             for spin in range(7):
                 # 模擬基礎贏分
-                base_win = max(0, int(random.gauss(200, 100)))  # 正態分布，平均200
+                base_win = max(0, int(self.rng.gauss(200, 100)))  # 正態分布，平均200
                 
                 # 模擬戰鼓倍率
                 drum_results = war_drums.roll_drums(base_win > 0)
@@ -5,7 +5,8 @@
 
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
-import random
+
+from core.rng import RandomStream
 
 @dataclass
 class FreeSpinsConfig:
@@ -18,9 +19,10 @@ class FreeSpinsConfig:
 class FreeSpinsFeature:
     """免費旋轉特色類"""
     
-    def __init__(self, config: Dict[str, Any]):
-        """初始化免費旋轉特色"""
+    def __init__(self, config: Dict[str, Any], rng: Optional[RandomStream] = None):
+        """初始化免費旋轉特色 (rng 為隨機數流)"""
         self.config = config
+        self.rng = rng if rng is not None else RandomStream()
         self.free_spins_config = FreeSpinsConfig(
             initial_spins=config.get("free_spins", {}).get("initial_spins", 7),
             max_spins=config.get("free_spins", {}).get("max_spins", 70),
@@ -171,15 +173,15 @@ class FreeSpinsFeature:
             
             for spin in range(sim_spins):
                 # 模擬基礎贏分 (簡化)
-                base_win = random.randint(0, 1000)
+                base_win = self.rng.randint(0, 1000)
                 
                 # 模擬倍率 (戰鼓)
-                multiplier = random.randint(1, 30)  # 假設最大30倍
+                multiplier = self.rng.randint(1, 30)  # 假設最大30倍
                 
                 sim_total_win += base_win * multiplier
                 
                 # 模擬再觸發 (5% 機率)
-                if random.random() < 0.05 and sim_spins < self.free_spins_config.max_spins:
+                if self.rng.random() < 0.05 and sim_spins < self.free_spins_config.max_spins:
                     additional = min(7, self.free_spins_config.max_spins - sim_spins)
                     sim_spins += additional
                     sim_retriggers += 1
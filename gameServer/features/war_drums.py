@@ -3,9 +3,11 @@
 實現好運咚咚遊戲的戰鼓倍率機制
 """
 
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Tuple, Optional
 from dataclasses import dataclass
-import random
+
+from core.rng import RandomStream
+from core.samplers import AliasSampler
 
 @dataclass
 class DrumResult:
@@ -26,9 +28,10 @@ class WarDrumsConfig:
 class WarDrumsFeature:
     """戰鼓倍率特色類"""
     
-    def __init__(self, config: Dict[str, Any]):
-        """初始化戰鼓特色"""
+    def __init__(self, config: Dict[str, Any], rng: Optional[RandomStream] = None):
+        """初始化戰鼓特色 (rng 為隨機數流)"""
         self.config = config
+        self.rng = rng if rng is not None else RandomStream()
         self.war_drums_config = WarDrumsConfig()
         
         # 從配置中載入參數
@@ -54,6 +57,8 @@ class WarDrumsFeature:
         
         # 倍率權重分布 (基於真實老虎機邏輯)
         self.multiplier_weights = self._generate_multiplier_weights()
+        self.multiplier_sampler = AliasSampler(list(self.multiplier_weights.keys()),
+                                               list(self.multiplier_weights.values()))
     
     def _generate_multiplier_weights(self) -> Dict[int, float]:
         """生成倍率權重分布"""
@@ -89,9 +94,9 @@ class WarDrumsFeature:
             return []
         
         drum_results = []
+        multipliers = self.multiplier_sampler.sample_list(self.rng, self.active_drums)
         
-        for drum_id in range(self.active_drums):
-            multiplier = self._roll_single_drum()
+        for drum_id, multiplier in enumerate(multipliers):
             effect_type = self._determine_effect_type(multiplier)
             
             drum_result = DrumResult(
@@ -109,10 +114,7 @@ class WarDrumsFeature:
     
     def _roll_single_drum(self) -> int:
         """滾動單個戰鼓"""
-        multipliers = list(self.multiplier_weights.keys())
-        weights = list(self.multiplier_weights.values())
-        
-        return random.choices(multipliers, weights=weights)[0]
+        return self.multiplier_sampler.sample(self.rng)
     
     def _determine_effect_type(self, multiplier: int) -> str:
         """根據倍率確定特效類型"""
@@ -192,11 +194,12 @@ class WarDrumsFeature:
             "total_multipliers": []
         }
         
-        for _ in range(num_simulations):
-            # 模擬3個戰鼓
+        # 一次抽取全部模擬所需的倍率 (每次模擬3個戰鼓)
+        all_multipliers = self.multiplier_sampler.sample(self.rng, num_simulations * 3).reshape(-1, 3).tolist()
+        
+        for multipliers in all_multipliers:
             drums = []
-            for _ in range(3):
-                multiplier = self._roll_single_drum()
+            for multiplier in multipliers:
                 effect = self._determine_effect_type(multiplier)
                 drums.append(DrumResult(0, multiplier, effect))
             
@@ -243,11 +246,9 @@ class WarDrumsFeature:
             
             # 模擬該選項的平均倍率
             total_multipliers = []
-            for _ in range(1000):
-                drum_results = []
-                for _ in range(drums_count):
-                    mult = self._roll_single_drum()
-                    drum_results.append(DrumResult(0, mult, "normal"))
+            all_multipliers = self.multiplier_sampler.sample(self.rng, 1000 * drums_count).reshape(1000, drums_count).tolist()
+            for multipliers in all_multipliers:
+                drum_results = [DrumResult(0, mult, "normal") for mult in multipliers]
                 
                 total_mult = self.calculate_total_multiplier(drum_results)
                 total_multipliers.append(total_mult)
@@ -127,8 +127,9 @@ def run_feature_buy_demo():
         except Exception as e:
             print(f"✗ 購買失敗: {e}")
 
-def run_simulation_analysis(spins: int = None, export_json: bool = False, json_dir: str = "json_output"):
-    """運行模擬分析"""
+def run_simulation_analysis(spins: int = None, export_json: bool = False, json_dir: str = "json_output",
+                            workers: int = 1):
+    """運行模擬分析 (workers > 1 時以多進程分片模擬)"""
     settings = get_simulation_settings()
     if spins is None:
         spins = settings.basic_total_spins
@@ -136,6 +137,8 @@ def run_simulation_analysis(spins: int = None, export_json: bool = False, json_d
     print(f"\n=== 運行 {spins:,} 次旋轉模擬分析 ===")
     if export_json:
         print(f"📁 JSON 結果將輸出至: {json_dir}")
+    elif workers > 1:
+        print(f"⚙️  使用 {workers} 個工作進程")
     
     simulator = GameSimulator()
     
@@ -146,7 +149,8 @@ def run_simulation_analysis(spins: int = None, export_json: bool = False, json_d
         player_initial_credit=1000000,
         feature_buy_enabled=True,
         auto_buy_threshold=0.08,  # 8% 機率購買特色
-        seed=42  # 固定種子確保結果可重現
+        seed=42,  # 固定種子確保結果可重現
+        max_memory_mb=settings.max_memory_mb or None  # 詳細結果接近記憶體上限時溢出至磁碟 (0 為不限制)
     )
     
     print("🔄 執行模擬中...")
@@ -160,6 +164,9 @@ def run_simulation_analysis(spins: int = None, export_json: bool = False, json_d
                 export_json=True, 
                 output_dir=json_dir
             )
+        elif workers > 1:
+            # 多進程分片模擬
+            result = simulator.run_parallel_simulation(config, workers)
         else:
             # 使用標準模擬方法
             result = simulator.run_basic_simulation(config)
@@ -248,6 +255,32 @@ def run_volatility_analysis():
     except Exception as e:
         print(f"✗ 波動性分析失敗: {e}")
 
+def run_exact_analysis():
+    """運行基礎遊戲精確分析"""
+    print("\n=== 基礎遊戲精確分析 (完整停止位置列舉) ===")
+    
+    simulator = GameSimulator()
+    
+    try:
+        result = simulator.run_exact_base_game_analysis()
+        
+        print(f"✓ 計算完成 (用時 {result.calculation_time:.2f} 秒)")
+        print("\n📊 精確結果:")
+        print("-" * 50)
+        print(f"停止位置組合: {result.total_combinations:,}")
+        print(f"基礎遊戲 RTP: {result.rtp_percentage:.4f}%")
+        print(f"命中率:       {result.hit_frequency:.4%}")
+        print(f"特色觸發機率: {result.feature_trigger_probability:.6%}")
+        print(f"贏分標準差:   {result.win_std_dev:.2f}")
+        print(f"最大贏分:     {result.max_win:,}")
+        
+        print(f"\n📈 各符號 RTP 貢獻:")
+        for symbol_name, symbol_rtp in result.symbol_rtp.items():
+            print(f"  {symbol_name:<6}: {symbol_rtp:7.4f}%")
+        
+    except Exception as e:
+        print(f"✗ 精確分析失敗: {e}")
+
 def show_settings():
     """顯示目前設定"""
     from config.config_manager import config_manager
@@ -261,6 +294,8 @@ def main():
     parser.add_argument("--simulate", type=int, metavar="N", help="運行 N 次旋轉的模擬分析")
     parser.add_argument("--feature-analysis", action="store_true", help="運行特色購買分析")
     parser.add_argument("--volatility", action="store_true", help="運行波動性分析")
+    parser.add_argument("--workers", type=int, metavar="K", help="模擬使用的工作進程數 (預設 1)")
+    parser.add_argument("--exact", action="store_true", help="運行基礎遊戲精確 RTP 分析 (完整列舉)")
     parser.add_argument("--all", action="store_true", help="運行所有分析")
     parser.add_argument("--settings", action="store_true", help="顯示目前的模擬設定")
     parser.add_argument("--config", type=str, metavar="FILE", help="使用指定的設定檔")
@@ -297,7 +332,7 @@ def main():
         
         if args.simulate or args.all:
             spins = args.simulate if args.simulate else None
-            run_simulation_analysis(spins, export_json=args.json, json_dir=args.json_dir)
+            run_simulation_analysis(spins, export_json=args.json, json_dir=args.json_dir, workers=args.workers or 1)
         
         if args.feature_analysis or args.all:
             run_feature_buy_analysis()
@@ -305,6 +340,9 @@ def main():
         if args.volatility or args.all:
             run_volatility_analysis()
         
+        if args.exact or args.all:
+            run_exact_analysis()
+        
         print(f"\n✅ 程序執行完成!")
         
     except KeyboardInterrupt:
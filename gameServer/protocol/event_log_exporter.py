@@ -6,9 +6,15 @@
 import json
 import os
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterable, List, Any, Optional
 from pathlib import Path
 
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.profiler import StageProfiler
+from protocol.json_stream import JsonArrayStream, close_object_array, open_object_array
+
 
 class EventLogExporter:
     """
@@ -34,15 +40,18 @@ class EventLogExporter:
     }
     """
     
-    def __init__(self, game_id: str = "PSS-ON-00152", start_time: datetime = None):
+    def __init__(self, game_id: str = "PSS-ON-00152", start_time: datetime = None,
+                 profiler: Optional[StageProfiler] = None):
         """
         初始化事件日誌輸出器
         
         Args:
             game_id: 遊戲 ID
             start_time: 開始時間（用於生成時間戳）
+            profiler: 階段計時器 (記錄 serialization 階段)
         """
         self.game_id = game_id
+        self.profiler = profiler if profiler is not None else StageProfiler()
         self.start_time = start_time or datetime.now()
         self.serial_counter = 0
         self.logs = []
@@ -98,6 +107,7 @@ class EventLogExporter:
             game_result: 遊戲結果數據
             is_reconnected: 是否為重連結果（包含更多資訊）
         """
+        started = self.profiler.start()
         event_type = "reconnected_Result" if is_reconnected else "result"
         
         # 轉換遊戲結果格式
@@ -111,6 +121,7 @@ class EventLogExporter:
         }
         self.logs.append(event)
         self.serial_counter += 1
+        self.profiler.stop("serialization", started)
         
     def _convert_game_result(self, game_result: Dict[str, Any], 
                            is_reconnected: bool = False) -> Dict[str, Any]:
@@ -238,6 +249,7 @@ class EventLogExporter:
         Returns:
             輸出檔案的完整路徑
         """
+        started = self.profiler.start()
         # 確保目錄存在
         os.makedirs(os.path.dirname(output_path) if os.path.dirname(output_path) else ".", exist_ok=True)
         
@@ -253,8 +265,65 @@ class EventLogExporter:
                 json.dump(output_data, f, indent=2, ensure_ascii=False)
             else:
                 json.dump(output_data, f, ensure_ascii=False)
-                
+        
+        self.profiler.stop("serialization", started)
         return os.path.abspath(output_path)
+    
+    def stream_results_to_json(self, results: Iterable[Dict[str, Any]], output_path: str,
+                               add_connection_events: bool = True, reconnect_interval: int = 50,
+                               pretty: bool = True, chunk_size: int = 256) -> str:
+        """
+        添加遊戲結果事件並串流寫入 JSON 檔案 (已添加的事件先寫入)
+        只保留 chunk_size 筆事件，寫入後清空 self.logs
+        
+        Args:
+            results: 遊戲結果 (可為只能讀取一次的迭代器)
+            output_path: 輸出路徑
+            add_connection_events: 是否添加登入、連線與斷線事件
+            reconnect_interval: 每隔多少個 spin 模擬一次斷線重連
+            pretty: 是否格式化輸出
+            chunk_size: 每次寫入的事件筆數
+            
+        Returns:
+            輸出檔案的完整路徑
+        """
+        os.makedirs(os.path.dirname(output_path) if os.path.dirname(output_path) else ".", exist_ok=True)
+        
+        with open(output_path, 'w', encoding='utf-8') as f:
+            stream = open_object_array(f, {"game_id": self.game_id}, "logs", pretty)
+            
+            # 添加初始登入和連線事件
+            if add_connection_events:
+                self.add_signin_event()
+                self.add_connection_event()
+            
+            for i, result in enumerate(results):
+                # 每隔一定數量的 spin，模擬斷線重連 (重連後的第一個結果包含完整資訊)
+                if add_connection_events and i > 0 and i % reconnect_interval == 0:
+                    self.add_disconnection_event()
+                    self.add_signin_event()
+                    self.add_connection_event()
+                    self.add_result_event(result, is_reconnected=True)
+                else:
+                    self.add_result_event(result, is_reconnected=False)
+                if len(self.logs) >= chunk_size:
+                    self._flush_logs(stream)
+            
+            # 添加最終斷線事件
+            if add_connection_events:
+                self.add_disconnection_event()
+            self._flush_logs(stream)
+            stream.close()
+            close_object_array(f, pretty)
+        
+        return os.path.abspath(output_path)
+    
+    def _flush_logs(self, stream: JsonArrayStream):
+        """寫入並清空已添加的事件"""
+        started = self.profiler.start()
+        stream.write_all(self.logs)
+        self.logs = []
+        self.profiler.stop("serialization", started)
         
     def get_json_string(self, pretty: bool = True) -> str:
         """
@@ -277,49 +346,28 @@ class EventLogExporter:
             return json.dumps(output_data, ensure_ascii=False)
 
 
-def export_simulation_to_event_log(results: List[Dict[str, Any]], 
+def export_simulation_to_event_log(results: Iterable[Dict[str, Any]], 
                                    output_path: str,
                                    game_id: str = "PSS-ON-00152",
                                    add_connection_events: bool = True,
-                                   reconnect_interval: int = 50) -> str:
+                                   reconnect_interval: int = 50,
+                                   profiler: Optional[StageProfiler] = None) -> str:
     """
-    將模擬結果輸出為事件日誌格式
+    將模擬結果輸出為事件日誌格式 (逐筆串流寫入，不保留全部事件)
     
     Args:
-        results: 遊戲結果列表
+        results: 遊戲結果列表或可迭代物件
         output_path: 輸出路徑
         game_id: 遊戲 ID
         add_connection_events: 是否添加連線/斷線事件
         reconnect_interval: 每隔多少個 spin 進行一次重連
+        profiler: 階段計時器 (記錄 serialization 階段)
         
     Returns:
         輸出檔案的完整路徑
     """
-    exporter = EventLogExporter(game_id=game_id)
-    
-    # 添加初始登入和連線事件
-    if add_connection_events:
-        exporter.add_signin_event()
-        exporter.add_connection_event()
-    
-    # 添加遊戲結果
-    for i, result in enumerate(results):
-        # 每隔一定數量的 spin，模擬斷線重連
-        if add_connection_events and i > 0 and i % reconnect_interval == 0:
-            exporter.add_disconnection_event()
-            exporter.add_signin_event()
-            exporter.add_connection_event()
-            # 重連後的第一個結果包含完整資訊
-            exporter.add_result_event(result, is_reconnected=True)
-        else:
-            exporter.add_result_event(result, is_reconnected=False)
-    
-    # 添加最終斷線事件
-    if add_connection_events:
-        exporter.add_disconnection_event()
-    
-    # 輸出檔案
-    return exporter.export_to_json(output_path)
+    exporter = EventLogExporter(game_id=game_id, profiler=profiler)
+    return exporter.stream_results_to_json(results, output_path, add_connection_events, reconnect_interval)
 
 
 # 測試程式碼
@@ -7,9 +7,15 @@ import json
 import os
 import time
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Sequence
 from dataclasses import dataclass, asdict
 
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.profiler import StageProfiler
+from protocol.json_stream import close_object_array, open_object_array
+
 
 @dataclass
 class WinLineData:
@@ -154,14 +160,16 @@ class ResultRecallData:
 class ProtoJSONExporter:
     """Proto JSON 輸出器"""
     
-    def __init__(self, output_dir: str = "output"):
+    def __init__(self, output_dir: str = "output", profiler: Optional[StageProfiler] = None):
         """
         初始化輸出器
         
         Args:
             output_dir: 輸出目錄
+            profiler: 階段計時器 (記錄 serialization 階段)
         """
         self.output_dir = output_dir
+        self.profiler = profiler if profiler is not None else StageProfiler()
         self.ensure_output_dir()
         self.session_id = int(time.time())
         
@@ -284,6 +292,7 @@ class ProtoJSONExporter:
         Returns:
             保存的檔案路徑
         """
+        started = self.profiler.start()
         proto_json = self.convert_game_result_to_proto_json(game_result, spin_number, bet_amount)
         
         if filename is None:
@@ -295,43 +304,34 @@ class ProtoJSONExporter:
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(proto_json, f, indent=2, ensure_ascii=False)
         
+        self.profiler.stop("serialization", started)
         return filepath
     
-    def save_batch_results(self, results: List[Dict[str, Any]], 
-                          bet_amounts: List[int] = None, 
+    def save_batch_results(self, results: Sequence[Dict[str, Any]], 
+                          bet_amounts: Sequence[int] = None, 
                           filename: str = None) -> str:
         """
-        批量保存遊戲結果到 JSON 檔案
+        批量保存遊戲結果到 JSON 檔案 (逐筆轉換並串流寫入)
         
         Args:
-            results: 遊戲結果列表
+            results: 遊戲結果列表 (可迭代且提供 len() 的序列，例如 SpillBuffer)
             bet_amounts: 下注金額列表
             filename: 檔案名稱（可選）
             
         Returns:
             保存的檔案路徑
         """
+        started = self.profiler.start()
         if bet_amounts is None:
             bet_amounts = [10] * len(results)  # 預設下注額
         
-        batch_data = {
-            "session_info": {
-                "session_id": self.session_id,
-                "total_spins": len(results),
-                "timestamp": datetime.now().isoformat(),
-                "game_module": "00152"
-            },
-            "results": []
+        session_info = {
+            "session_id": self.session_id,
+            "total_spins": len(results),
+            "timestamp": datetime.now().isoformat(),
+            "game_module": "00152"
         }
         
-        for i, (result, bet) in enumerate(zip(results, bet_amounts)):
-            proto_json = self.convert_game_result_to_proto_json(result, i + 1, bet)
-            batch_data["results"].append({
-                "spin_number": i + 1,
-                "bet_amount": bet,
-                "result_recall": proto_json
-            })
-        
         if filename is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"batch_results_{timestamp}_{len(results)}_spins.json"
@@ -339,14 +339,23 @@ class ProtoJSONExporter:
         filepath = os.path.join(self.output_dir, filename)
         
         with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(batch_data, f, indent=2, ensure_ascii=False)
-        
+            stream = open_object_array(f, {"session_info": session_info}, "results")
+            for i, (result, bet) in enumerate(zip(results, bet_amounts)):
+                stream.write({
+                    "spin_number": i + 1,
+                    "bet_amount": bet,
+                    "result_recall": self.convert_game_result_to_proto_json(result, i + 1, bet)
+                })
+            stream.close()
+            close_object_array(f)
+        
+        self.profiler.stop("serialization", started)
         return filepath
     
-    def create_summary_report(self, results: List[Dict[str, Any]], 
-                            bet_amounts: List[int] = None) -> Dict[str, Any]:
+    def create_summary_report(self, results: Sequence[Dict[str, Any]], 
+                            bet_amounts: Sequence[int] = None) -> Dict[str, Any]:
         """
-        創建摘要報告
+        創建摘要報告 (單次遍歷結果)
         
         Args:
             results: 遊戲結果列表
@@ -355,22 +364,29 @@ class ProtoJSONExporter:
         Returns:
             摘要報告字典
         """
-        if not results:
+        total_spins = len(results)
+        if total_spins == 0:
             return {}
         
         if bet_amounts is None:
-            bet_amounts = [10] * len(results)
+            bet_amounts = [10] * total_spins
         
-        total_spins = len(results)
         total_bet = sum(bet_amounts)
-        total_win = sum(result.get('total_win', 0) for result in results)
-        
-        win_spins = sum(1 for result in results if result.get('total_win', 0) > 0)
-        feature_triggers = sum(1 for result in results if result.get('free_spins_awarded', 0) > 0)
-        war_drums_triggers = sum(1 for result in results 
-                               if result.get('war_drums_result', {}).get('total_multiplier', 1) > 1)
-        
-        max_win = max((result.get('total_win', 0) for result in results), default=0)
+        total_win = 0
+        win_spins = 0
+        feature_triggers = 0
+        war_drums_triggers = 0
+        max_win = 0
+        for result in results:
+            win = result.get('total_win', 0)
+            total_win += win
+            max_win = max(max_win, win)
+            if win > 0:
+                win_spins += 1
+            if result.get('free_spins_awarded', 0) > 0:
+                feature_triggers += 1
+            if result.get('war_drums_result', {}).get('total_multiplier', 1) > 1:
+                war_drums_triggers += 1
         
         return {
             "summary": {
@@ -390,23 +406,25 @@ class ProtoJSONExporter:
 
 
 # 輔助函數
-def export_simulation_results_to_json(results: List[Dict[str, Any]], 
-                                     bet_amounts: List[int] = None,
+def export_simulation_results_to_json(results: Sequence[Dict[str, Any]], 
+                                     bet_amounts: Sequence[int] = None,
                                      output_dir: str = "json_output",
-                                     include_summary: bool = True) -> Dict[str, str]:
+                                     include_summary: bool = True,
+                                     profiler: Optional[StageProfiler] = None) -> Dict[str, str]:
     """
     將模擬結果輸出為 JSON 檔案
     
     Args:
-        results: 遊戲結果列表
+        results: 遊戲結果列表 (批量結果與摘要各遍歷一次)
         bet_amounts: 下注金額列表
         output_dir: 輸出目錄
         include_summary: 是否包含摘要報告
+        profiler: 階段計時器 (記錄 serialization 階段)
         
     Returns:
         包含檔案路徑的字典
     """
-    exporter = ProtoJSONExporter(output_dir)
+    exporter = ProtoJSONExporter(output_dir, profiler)
     file_paths = {}
     
     # 保存批量結果
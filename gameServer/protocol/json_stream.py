@@ -0,0 +1,64 @@
+"""
+JSON 串流寫入 - 逐項寫入陣列，輸出與 json.dump 整體寫入 (indent=2 或預設分隔符號) 相同，
+輸出器因此只需保留一小段已轉換的結果
+"""
+
+import json
+from typing import Any, Dict, Iterable, TextIO
+
+INDENT = "  "
+
+
+class JsonArrayStream:
+    """
+    逐項寫入 JSON 陣列
+    depth: 陣列在外層結構中的縮排層級 (頂層陣列為 0，物件欄位中的陣列為 1)
+    """
+
+    def __init__(self, f: TextIO, pretty: bool = True, depth: int = 0):
+        self.f = f
+        self.pretty = pretty
+        self.depth = depth
+        self.count = 0
+        self._item_prefix = "\n" + INDENT * (depth + 1)
+        f.write("[")
+
+    def write(self, item: Any):
+        """寫入一項"""
+        if self.pretty:
+            text = json.dumps(item, indent=2, ensure_ascii=False).replace("\n", self._item_prefix)
+            self.f.write(("," if self.count else "") + self._item_prefix + text)
+        else:
+            self.f.write((", " if self.count else "") + json.dumps(item, ensure_ascii=False))
+        self.count += 1
+
+    def write_all(self, items: Iterable[Any]):
+        """依序寫入多項"""
+        for item in items:
+            self.write(item)
+
+    def close(self):
+        """寫入陣列結尾"""
+        if self.pretty and self.count:
+            self.f.write("\n" + INDENT * self.depth)
+        self.f.write("]")
+
+
+def open_object_array(f: TextIO, fields: Dict[str, Any], array_key: str, pretty: bool = True) -> JsonArrayStream:
+    """
+    寫入物件開頭與 fields 欄位，返回最後一個欄位 array_key 的陣列串流
+    陣列 close() 後需呼叫 close_object_array() 寫入物件結尾
+    """
+    f.write("{")
+    key_prefix = "\n" + INDENT if pretty else ""
+    separator = "," if pretty else ", "
+    for key, value in fields.items():
+        text = json.dumps(value, indent=2 if pretty else None, ensure_ascii=False).replace("\n", "\n" + INDENT)
+        f.write(key_prefix + json.dumps(key, ensure_ascii=False) + ": " + text + separator)
+    f.write(key_prefix + json.dumps(array_key, ensure_ascii=False) + ": ")
+    return JsonArrayStream(f, pretty, depth=1)
+
+
+def close_object_array(f: TextIO, pretty: bool = True):
+    """寫入 open_object_array 開啟的物件結尾"""
+    f.write("\n}" if pretty else "}")
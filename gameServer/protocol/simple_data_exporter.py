@@ -5,9 +5,15 @@
 
 import json
 import os
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterable, List, Any, Optional
 from pathlib import Path
 
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.profiler import StageProfiler
+from protocol.json_stream import JsonArrayStream
+
 
 class SimpleDataExporter:
     """
@@ -32,9 +38,10 @@ class SimpleDataExporter:
     ]
     """
     
-    def __init__(self):
-        """初始化簡化輸出器"""
+    def __init__(self, profiler: Optional[StageProfiler] = None):
+        """初始化簡化輸出器 (profiler 記錄 serialization 階段)"""
         self.results = []
+        self.profiler = profiler if profiler is not None else StageProfiler()
         
     def add_result(self, game_result: Dict[str, Any]) -> None:
         """
@@ -43,8 +50,10 @@ class SimpleDataExporter:
         Args:
             game_result: 遊戲結果數據
         """
+        started = self.profiler.start()
         data = self._convert_game_result(game_result)
         self.results.append(data)
+        self.profiler.stop("serialization", started)
         
     def _convert_game_result(self, game_result: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -139,6 +148,7 @@ class SimpleDataExporter:
         Returns:
             輸出檔案的完整路徑
         """
+        started = self.profiler.start()
         # 確保目錄存在
         os.makedirs(os.path.dirname(output_path) if os.path.dirname(output_path) else ".", exist_ok=True)
         
@@ -148,8 +158,44 @@ class SimpleDataExporter:
                 json.dump(self.results, f, indent=2, ensure_ascii=False)
             else:
                 json.dump(self.results, f, ensure_ascii=False)
-                
+        
+        self.profiler.stop("serialization", started)
         return os.path.abspath(output_path)
+    
+    def stream_to_json(self, results: Iterable[Dict[str, Any]], output_path: str,
+                       pretty: bool = True, chunk_size: int = 256) -> str:
+        """
+        逐筆轉換並串流寫入 JSON 檔案 (輸出與 add_result + export_to_json 相同)
+        只保留 chunk_size 筆已轉換的結果，寫入後清空 self.results
+        
+        Args:
+            results: 遊戲結果 (可為只能讀取一次的迭代器)
+            output_path: 輸出路徑
+            pretty: 是否格式化輸出
+            chunk_size: 每次寫入的結果筆數
+            
+        Returns:
+            輸出檔案的完整路徑
+        """
+        os.makedirs(os.path.dirname(output_path) if os.path.dirname(output_path) else ".", exist_ok=True)
+        
+        with open(output_path, 'w', encoding='utf-8') as f:
+            stream = JsonArrayStream(f, pretty)
+            for result in results:
+                self.add_result(result)
+                if len(self.results) >= chunk_size:
+                    self._flush_results(stream)
+            self._flush_results(stream)
+            stream.close()
+        
+        return os.path.abspath(output_path)
+    
+    def _flush_results(self, stream: JsonArrayStream):
+        """寫入並清空已轉換的結果"""
+        started = self.profiler.start()
+        stream.write_all(self.results)
+        self.results = []
+        self.profiler.stop("serialization", started)
         
     def get_json_string(self, pretty: bool = True) -> str:
         """
@@ -167,26 +213,22 @@ class SimpleDataExporter:
             return json.dumps(self.results, ensure_ascii=False)
 
 
-def export_simulation_to_simple_data(results: List[Dict[str, Any]], 
-                                    output_path: str) -> str:
+def export_simulation_to_simple_data(results: Iterable[Dict[str, Any]], 
+                                    output_path: str,
+                                    profiler: Optional[StageProfiler] = None) -> str:
     """
-    將模擬結果輸出為簡化數據格式
+    將模擬結果輸出為簡化數據格式 (逐筆串流寫入，不保留全部轉換結果)
     
     Args:
-        results: 遊戲結果列表
+        results: 遊戲結果列表或可迭代物件
         output_path: 輸出路徑
+        profiler: 階段計時器 (記錄 serialization 階段)
         
     Returns:
         輸出檔案的完整路徑
     """
-    exporter = SimpleDataExporter()
-    
-    # 添加所有遊戲結果
-    for result in results:
-        exporter.add_result(result)
-    
-    # 輸出檔案
-    return exporter.export_to_json(output_path)
+    exporter = SimpleDataExporter(profiler)
+    return exporter.stream_to_json(results, output_path)
 
 
 # 測試程式碼
@@ -2,5 +2,6 @@
 from .simulator import GameSimulator
 from .statistics import StatisticsAnalyzer
 from .reports import ReportGenerator
+from .exact_analysis import ExactBaseGameCalculator
 
-__all__ = ['GameSimulator', 'StatisticsAnalyzer', 'ReportGenerator']
\ No newline at end of file
+__all__ = ['GameSimulator', 'StatisticsAnalyzer', 'ReportGenerator', 'ExactBaseGameCalculator']
\ No newline at end of file
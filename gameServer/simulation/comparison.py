@@ -0,0 +1,218 @@
+"""
+共同隨機數比較 - 以相同的隨機數驅動多個變體 (賠付表、滾輪條帶、購買策略)
+每個付費單位的停止位置、購買決策與免費回合隨機數在各變體間共用，
+變體差異只來自規則本身，RTP 差以配對估計量計算信賴區間，所需旋轉數遠少於獨立模擬
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.feature_round import FeatureRoundEvaluator
+from core.game_engine import GameEngine, SpinType
+from core.rng import RandomStream, SeedLike
+from simulation.estimators import PairedRatioEstimator, RatioEstimator, StreamingMoments, z_score
+from simulation.simulator import GameSimulator
+
+
+@dataclass
+class ComparisonVariant:
+    """比較變體"""
+    name: str
+    config_path: str = "config/game_config.json"
+    paytable_path: str = "config/paytable.json"
+    reel_strips: Optional[List[List[int]]] = None   # 未提供時使用配置的滾輪條帶
+    buy_probability: float = 0.0                    # 每個付費單位購買特色的機率 (1.0 為每次購買)
+    buy_options: Tuple[SpinType, ...] = tuple(GameSimulator.BUY_OPTIONS)   # 購買時均勻選擇
+
+    def build_engine(self) -> GameEngine:
+        """建立變體使用的引擎 (贏分快取只在小型條帶組時啟用)"""
+        engine = GameEngine(self.config_path, self.paytable_path, evaluation_cache_size=0)
+        if self.reel_strips is not None:
+            engine.set_reel_strips(self.reel_strips)
+        return engine
+
+
+@dataclass
+class VariantSummary:
+    """變體結果摘要"""
+    name: str
+    spins: int
+    total_bet: int
+    total_win: int
+    rtp_percentage: float
+    volatility: float           # 每單位贏分標準差 / 平均押注
+
+
+@dataclass
+class PairedComparison:
+    """變體相對基準變體的配對比較 (百分比)"""
+    variant: str
+    baseline: str
+    rtp_difference: float
+    standard_error: float
+    confidence_interval: Tuple[float, float]
+    unpaired_standard_error: float      # 以獨立隨機數模擬時的標準誤差
+    variance_reduction: float           # 獨立模擬變異數 / 配對變異數
+    volatility_difference: float
+    volatility_confidence_interval: Tuple[float, float]   # 以區塊批次平均估計
+
+
+@dataclass
+class ComparisonResult:
+    """共同隨機數比較結果"""
+    spins: int
+    confidence: float
+    variants: Dict[str, VariantSummary] = field(default_factory=dict)
+    comparisons: List[PairedComparison] = field(default_factory=list)
+    simulation_time: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """轉為可導出的字典"""
+        return {
+            "spins": self.spins,
+            "confidence": self.confidence,
+            "variants": {name: vars(summary) for name, summary in self.variants.items()},
+            "comparisons": [vars(comparison) for comparison in self.comparisons],
+            "simulation_time": self.simulation_time
+        }
+
+
+class CommonRandomNumbersRunner:
+    """
+    共同隨機數比較執行器
+    第一個變體為基準；每個區塊先抽取共用的均勻亂數 (停止位置、購買決策、購買選項)，
+    各變體以自己的條帶長度換算停止位置；免費回合依戰鼓數分組，
+    各組以 (區塊, 戰鼓數) 決定的種子建立隨機數流，使相同條帶的變體得到相同的回合隨機數
+    """
+
+    def __init__(self, variants: Sequence[ComparisonVariant], base_bet: int = 50):
+        if len(variants) < 2:
+            raise ValueError("至少需要兩個變體")
+        if len({variant.name for variant in variants}) != len(variants):
+            raise ValueError("變體名稱不可重複")
+        self.variants = list(variants)
+        self.base_bet = base_bet
+        self.engines = [variant.build_engine() for variant in self.variants]
+        self.reel_count = max(engine.model.reel_count for engine in self.engines)
+
+    def _simulate_block(self, variant: ComparisonVariant, engine: GameEngine, stop_uniforms: np.ndarray,
+                        decision_uniforms: np.ndarray, option_uniforms: np.ndarray,
+                        round_seed: np.random.SeedSequence) -> Tuple[np.ndarray, np.ndarray]:
+        """以共用亂數模擬一個區塊，返回每個付費單位的 (bets, wins)"""
+        size = len(decision_uniforms)
+        bets = np.full(size, self.base_bet, dtype=np.int64)
+        wins = np.zeros(size, dtype=np.int64)
+
+        buy = decision_uniforms < variant.buy_probability
+        base_units = np.flatnonzero(~buy)
+        round_units = {}
+
+        if base_units.size > 0:
+            stop_counts = np.array(engine.reel_tables.stop_counts)
+            stops = (stop_uniforms[base_units, :len(stop_counts)] * stop_counts).astype(np.int64)
+            symbol_counts, bonus_counts = engine.reel_tables.gather_counts(stops)
+            wins[base_units] = engine.win_calculator.calculate_243_ways_counts_batch(
+                symbol_counts, bonus_counts)["total_credit"]
+            round_units[0] = base_units[(bonus_counts[:, :3] > 0).all(axis=1)]
+
+        buy_units = np.flatnonzero(buy)
+        if buy_units.size > 0:
+            option_index = (option_uniforms[buy_units] * len(variant.buy_options)).astype(np.int64)
+            for index, option in enumerate(variant.buy_options):
+                units = buy_units[option_index == index]
+                bets[units] = self.base_bet * GameSimulator.BUY_COST_MULTIPLIERS[option]
+                drums = GameSimulator.BUY_DRUMS[option]
+                round_units[drums] = np.union1d(round_units.get(drums, np.zeros(0, dtype=np.int64)), units)
+
+        for drums, units in sorted(round_units.items()):
+            if units.size == 0:
+                continue
+            engine.set_rng(RandomStream(np.random.SeedSequence(
+                round_seed.entropy, spawn_key=tuple(round_seed.spawn_key) + (drums,))))
+            rounds = FeatureRoundEvaluator.from_engine(engine).play_rounds(units.size, drums)
+            wins[units] += rounds.total_win
+
+        return bets, wins
+
+    def run(self, spins: int, seed: SeedLike = None, block_size: int = 50000,
+            confidence: float = 0.95) -> ComparisonResult:
+        """執行比較"""
+        start_time = time.time()
+        master = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        tape_seed, round_master = master.spawn(2)
+        tape = RandomStream(tape_seed)
+
+        baseline = self.variants[0]
+        estimators = [RatioEstimator() for _ in self.variants]
+        moments = [StreamingMoments() for _ in self.variants]
+        paired = {variant.name: PairedRatioEstimator() for variant in self.variants[1:]}
+        block_volatility_differences = {variant.name: [] for variant in self.variants[1:]}
+
+        remaining = spins
+        while remaining > 0:
+            size = min(block_size, remaining)
+            remaining -= size
+
+            stop_uniforms = tape.uniform((size, self.reel_count))
+            decision_uniforms = tape.uniform(size)
+            option_uniforms = tape.uniform(size)
+            round_seed = round_master.spawn(1)[0]
+
+            outcomes = []
+            for index, (variant, engine) in enumerate(zip(self.variants, self.engines)):
+                bets, wins = self._simulate_block(variant, engine, stop_uniforms, decision_uniforms,
+                                                  option_uniforms, round_seed)
+                estimators[index].add_block(bets, wins)
+                moments[index].add_array(wins)
+                outcomes.append((bets, wins, wins.std(ddof=1) / bets.mean() if size > 1 else 0.0))
+
+            base_bets, base_wins, base_volatility = outcomes[0]
+            for variant, (bets, wins, volatility) in zip(self.variants[1:], outcomes[1:]):
+                paired[variant.name].add_block(bets, wins, base_bets, base_wins)
+                block_volatility_differences[variant.name].append(volatility - base_volatility)
+
+        result = ComparisonResult(spins=spins, confidence=confidence)
+        for variant, estimator, moment in zip(self.variants, estimators, moments):
+            result.variants[variant.name] = VariantSummary(
+                name=variant.name,
+                spins=estimator.count,
+                total_bet=estimator.sum_bet,
+                total_win=estimator.sum_win,
+                rtp_percentage=estimator.ratio * 100,
+                volatility=moment.std_dev / (estimator.sum_bet / estimator.count)
+            )
+
+        z = z_score(confidence)
+        for variant in self.variants[1:]:
+            estimator = paired[variant.name]
+            lower, upper = estimator.confidence_interval(confidence)
+            volatility_difference = result.variants[variant.name].volatility - result.variants[baseline.name].volatility
+            block_differences = np.array(block_volatility_differences[variant.name])
+            if len(block_differences) > 1:
+                volatility_half_width = float(z * block_differences.std(ddof=1) / np.sqrt(len(block_differences)))
+            else:
+                volatility_half_width = float('inf')
+
+            result.comparisons.append(PairedComparison(
+                variant=variant.name,
+                baseline=baseline.name,
+                rtp_difference=estimator.difference * 100,
+                standard_error=estimator.standard_error * 100,
+                confidence_interval=(lower * 100, upper * 100),
+                unpaired_standard_error=estimator.unpaired_standard_error * 100,
+                variance_reduction=(estimator.unpaired_standard_error / estimator.standard_error) ** 2
+                if estimator.standard_error > 0 else float('inf'),
+                volatility_difference=volatility_difference,
+                volatility_confidence_interval=(volatility_difference - volatility_half_width,
+                                                volatility_difference + volatility_half_width)
+            ))
+
+        result.simulation_time = time.time() - start_time
+        return result
@@ -0,0 +1,389 @@
+"""
+RTP 估計器 - 以每次付費旋轉的 (押注, 贏分) 線上累計比率估計量與其變異數
+RTP = Σ贏分 / Σ押注 為比率估計量，變異數以 delta method 計算，
+不假設贏分為伯努利分布，適用於高倍率、長尾的贏分分布；
+另提供可合併的線上動差累計器 (平均、變異數、偏態、峰態)
+"""
+
+from dataclasses import dataclass, field
+from statistics import NormalDist
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+
+def z_score(confidence: float) -> float:
+    """雙尾常態分位數"""
+    return NormalDist().inv_cdf((1 + confidence) / 2)
+
+
+@dataclass
+class RatioEstimator:
+    """
+    比率估計量累計器
+    累計量皆為整數 (押注與贏分為整數積分)，平方和不受浮點誤差影響
+    """
+    count: int = 0
+    sum_win: int = 0
+    sum_bet: int = 0
+    sum_win_sq: int = 0
+    sum_bet_sq: int = 0
+    sum_win_bet: int = 0
+
+    def add(self, bet: int, win: int):
+        """加入一次付費旋轉"""
+        self.count += 1
+        self.sum_win += win
+        self.sum_bet += bet
+        self.sum_win_sq += win * win
+        self.sum_bet_sq += bet * bet
+        self.sum_win_bet += win * bet
+
+    def add_block(self, bets: np.ndarray, wins: np.ndarray):
+        """加入一個區塊的付費旋轉 (int64 陣列)"""
+        bets = np.asarray(bets, dtype=np.int64)
+        wins = np.asarray(wins, dtype=np.int64)
+        self.count += len(bets)
+        self.sum_win += int(wins.sum())
+        self.sum_bet += int(bets.sum())
+        self.sum_win_sq += int(np.dot(wins, wins))
+        self.sum_bet_sq += int(np.dot(bets, bets))
+        self.sum_win_bet += int(np.dot(wins, bets))
+
+    def merge(self, other: "RatioEstimator"):
+        """合併另一個累計器"""
+        self.count += other.count
+        self.sum_win += other.sum_win
+        self.sum_bet += other.sum_bet
+        self.sum_win_sq += other.sum_win_sq
+        self.sum_bet_sq += other.sum_bet_sq
+        self.sum_win_bet += other.sum_win_bet
+
+    @property
+    def ratio(self) -> float:
+        """RTP (比例，非百分比)"""
+        return self.sum_win / self.sum_bet if self.sum_bet > 0 else 0.0
+
+    @property
+    def variance(self) -> float:
+        """比率估計量的變異數 (delta method，使用樣本共變異數)"""
+        n = self.count
+        if n < 2 or self.sum_bet == 0:
+            return float('inf')
+
+        mean_bet = self.sum_bet / n
+        ratio = self.ratio
+        # Σ(w - R·b)² = Σw² - 2R·Σwb + R²·Σb²，其中 Σ(w - R·b) = 0
+        residual_sq = self.sum_win_sq - 2 * ratio * self.sum_win_bet + ratio * ratio * self.sum_bet_sq
+        return max(0.0, residual_sq) / (n - 1) / (n * mean_bet * mean_bet)
+
+    @property
+    def standard_error(self) -> float:
+        """RTP 標準誤差 (比例)"""
+        return self.variance ** 0.5
+
+    def half_width(self, confidence: float = 0.95) -> float:
+        """信賴區間半寬 (比例)"""
+        return z_score(confidence) * self.standard_error
+
+    def confidence_interval(self, confidence: float = 0.95) -> Tuple[float, float]:
+        """RTP 信賴區間 (比例)"""
+        half_width = self.half_width(confidence)
+        return self.ratio - half_width, self.ratio + half_width
+
+
+@dataclass
+class StreamingMoments:
+    """
+    線上動差累計器 (Welford 更新，Chan/Pébay 成對合併)
+    每次加入 O(1)，保存平均值與二至四階中心動差和，可精確合併分片與場次結果
+    """
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    m3: float = 0.0
+    m4: float = 0.0
+
+    def add(self, value: float):
+        """加入一個值"""
+        previous = self.count
+        self.count += 1
+        delta = value - self.mean
+        delta_n = delta / self.count
+        delta_n2 = delta_n * delta_n
+        term = delta * delta_n * previous
+        self.mean += delta_n
+        self.m4 += term * delta_n2 * (self.count * self.count - 3 * self.count + 3) \
+            + 6 * delta_n2 * self.m2 - 4 * delta_n * self.m3
+        self.m3 += term * delta_n * (self.count - 2) - 3 * delta_n * self.m2
+        self.m2 += term
+
+    def add_array(self, values: np.ndarray):
+        """批量加入 (先以 numpy 計算區塊動差再合併)"""
+        values = np.asarray(values, dtype=np.float64)
+        if values.size == 0:
+            return
+        mean = float(values.mean())
+        centered = values - mean
+        squared = centered * centered
+        self.merge(StreamingMoments(
+            count=int(values.size),
+            mean=mean,
+            m2=float(squared.sum()),
+            m3=float((squared * centered).sum()),
+            m4=float((squared * squared).sum())
+        ))
+
+    def merge(self, other: "StreamingMoments"):
+        """合併另一個累計器"""
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2, self.m3, self.m4 = other.count, other.mean, other.m2, other.m3, other.m4
+            return
+
+        count_a, count_b = self.count, other.count
+        count = count_a + count_b
+        delta = other.mean - self.mean
+        delta2 = delta * delta
+
+        m4 = self.m4 + other.m4 \
+            + delta2 * delta2 * count_a * count_b * (count_a * count_a - count_a * count_b + count_b * count_b) / count ** 3 \
+            + 6 * delta2 * (count_a * count_a * other.m2 + count_b * count_b * self.m2) / count ** 2 \
+            + 4 * delta * (count_a * other.m3 - count_b * self.m3) / count
+        m3 = self.m3 + other.m3 \
+            + delta2 * delta * count_a * count_b * (count_a - count_b) / count ** 2 \
+            + 3 * delta * (count_a * other.m2 - count_b * self.m2) / count
+        m2 = self.m2 + other.m2 + delta2 * count_a * count_b / count
+
+        self.count = count
+        self.mean += delta * count_b / count
+        self.m2, self.m3, self.m4 = m2, m3, m4
+
+    @property
+    def variance(self) -> float:
+        """樣本變異數"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std_dev(self) -> float:
+        """樣本標準差"""
+        return self.variance ** 0.5
+
+    @property
+    def skewness(self) -> float:
+        """偏態係數 (g1)"""
+        if self.count < 2 or self.m2 <= 0:
+            return 0.0
+        return (self.count ** 0.5) * self.m3 / self.m2 ** 1.5
+
+    @property
+    def kurtosis(self) -> float:
+        """超額峰態係數 (g2)"""
+        if self.count < 2 or self.m2 <= 0:
+            return 0.0
+        return self.count * self.m4 / (self.m2 * self.m2) - 3
+
+    def summary(self) -> Dict[str, float]:
+        """摘要 (可導出)"""
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "std_dev": self.std_dev,
+            "skewness": self.skewness,
+            "kurtosis": self.kurtosis
+        }
+
+
+@dataclass
+class PairedRatioEstimator:
+    """
+    成對比率差估計量 (共同隨機數比較用)
+    兩個變體以相同隨機數逐單位配對，RTP 差 R_a - R_b 的變異數以配對殘差
+    e = (w_a - R_a·b_a) / mean_b_a - (w_b - R_b·b_b) / mean_b_b 計算，
+    正相關越強，差值的標準誤差越小
+    """
+    first: RatioEstimator = field(default_factory=RatioEstimator)
+    second: RatioEstimator = field(default_factory=RatioEstimator)
+    sum_win_win: int = 0
+    sum_win_bet: int = 0       # Σ w_a·b_b
+    sum_bet_win: int = 0       # Σ b_a·w_b
+    sum_bet_bet: int = 0
+
+    def add_block(self, first_bets: np.ndarray, first_wins: np.ndarray,
+                  second_bets: np.ndarray, second_wins: np.ndarray):
+        """加入一個區塊的配對單位 (int64 陣列，長度相同)"""
+        first_bets = np.asarray(first_bets, dtype=np.int64)
+        first_wins = np.asarray(first_wins, dtype=np.int64)
+        second_bets = np.asarray(second_bets, dtype=np.int64)
+        second_wins = np.asarray(second_wins, dtype=np.int64)
+        self.first.add_block(first_bets, first_wins)
+        self.second.add_block(second_bets, second_wins)
+        self.sum_win_win += int(np.dot(first_wins, second_wins))
+        self.sum_win_bet += int(np.dot(first_wins, second_bets))
+        self.sum_bet_win += int(np.dot(first_bets, second_wins))
+        self.sum_bet_bet += int(np.dot(first_bets, second_bets))
+
+    @property
+    def difference(self) -> float:
+        """RTP 差 (比例)"""
+        return self.first.ratio - self.second.ratio
+
+    @property
+    def variance(self) -> float:
+        """RTP 差的變異數 (配對 delta method)"""
+        n = self.first.count
+        if n < 2 or self.first.sum_bet == 0 or self.second.sum_bet == 0:
+            return float('inf')
+
+        ratio_a, ratio_b = self.first.ratio, self.second.ratio
+        mean_bet_a, mean_bet_b = self.first.sum_bet / n, self.second.sum_bet / n
+        residual_a = self.first.variance * n * mean_bet_a * mean_bet_a * (n - 1)
+        residual_b = self.second.variance * n * mean_bet_b * mean_bet_b * (n - 1)
+        cross = self.sum_win_win - ratio_b * self.sum_win_bet - ratio_a * self.sum_bet_win \
+            + ratio_a * ratio_b * self.sum_bet_bet
+        residual_sq = residual_a / mean_bet_a ** 2 + residual_b / mean_bet_b ** 2 \
+            - 2 * cross / (mean_bet_a * mean_bet_b)
+        return max(0.0, residual_sq) / (n - 1) / n
+
+    @property
+    def standard_error(self) -> float:
+        """RTP 差標準誤差 (比例)"""
+        return self.variance ** 0.5
+
+    @property
+    def unpaired_standard_error(self) -> float:
+        """以獨立隨機數各自模擬時的 RTP 差標準誤差 (比例)"""
+        return (self.first.variance + self.second.variance) ** 0.5
+
+    def confidence_interval(self, confidence: float = 0.95) -> Tuple[float, float]:
+        """RTP 差信賴區間 (比例)"""
+        half_width = z_score(confidence) * self.standard_error
+        return self.difference - half_width, self.difference + half_width
+
+
+class ControlVariateEstimator:
+    """
+    控制變量 RTP 估計量
+    每個單位除 (押注, 贏分) 外再記錄 k 個期望值已知的控制變量 x (例如精確計算的基礎遊戲贏分)，
+    以最佳係數 β = S_xx⁻¹ Cov(x, w - R·b) 修正分子：R_cv = (w̄ - β·(x̄ - μ)) / b̄，
+    殘差變異數降低的倍數即等效樣本數增益
+    """
+
+    def __init__(self, control_means: Sequence[float]):
+        """control_means: 各控制變量的已知期望值"""
+        self.control_means = np.asarray(control_means, dtype=np.float64)
+        size = len(self.control_means)
+        self.ratio_estimator = RatioEstimator()
+        self.sum_x = np.zeros(size)
+        self.sum_xx = np.zeros((size, size))
+        self.sum_x_win = np.zeros(size)
+        self.sum_x_bet = np.zeros(size)
+
+    @property
+    def count(self) -> int:
+        return self.ratio_estimator.count
+
+    def add(self, bet: int, win: int, controls: Sequence[float]):
+        """加入一個單位 (純量路徑，供逐次旋轉模擬使用)"""
+        self.ratio_estimator.add(bet, win)
+        for i, x_i in enumerate(controls):
+            self.sum_x[i] += x_i
+            self.sum_x_win[i] += x_i * win
+            self.sum_x_bet[i] += x_i * bet
+            for j, x_j in enumerate(controls):
+                self.sum_xx[i, j] += x_i * x_j
+
+    def add_block(self, bets: np.ndarray, wins: np.ndarray, controls: np.ndarray):
+        """加入一個區塊 (controls 形狀為 (n, k))"""
+        controls = np.asarray(controls, dtype=np.float64)
+        self.ratio_estimator.add_block(bets, wins)
+        self.sum_x += controls.sum(axis=0)
+        self.sum_xx += controls.T @ controls
+        self.sum_x_win += controls.T @ np.asarray(wins, dtype=np.float64)
+        self.sum_x_bet += controls.T @ np.asarray(bets, dtype=np.float64)
+
+    def merge(self, other: "ControlVariateEstimator"):
+        """合併另一個控制變量相同的累計器"""
+        if not np.array_equal(self.control_means, other.control_means):
+            raise ValueError("只能合併控制變量期望值相同的估計量")
+        self.ratio_estimator.merge(other.ratio_estimator)
+        self.sum_x += other.sum_x
+        self.sum_xx += other.sum_xx
+        self.sum_x_win += other.sum_x_win
+        self.sum_x_bet += other.sum_x_bet
+
+    def _fit(self) -> Tuple[np.ndarray, float, float]:
+        """返回 (β, 原始殘差變異數, 修正後殘差變異數)"""
+        n = self.count
+        ratio = self.ratio_estimator.ratio
+        base = self.ratio_estimator
+        residual_variance = max(0.0, base.sum_win_sq - 2 * ratio * base.sum_win_bet
+                                + ratio * ratio * base.sum_bet_sq) / (n - 1)
+
+        mean_x = self.sum_x / n
+        covariance_xx = (self.sum_xx - n * np.outer(mean_x, mean_x)) / (n - 1)
+        # Σ(w - R·b) = 0，因此 Cov(x, w - R·b) = Σx(w - R·b) / (n - 1)
+        covariance_xd = (self.sum_x_win - ratio * self.sum_x_bet) / (n - 1)
+        beta = np.linalg.pinv(covariance_xx) @ covariance_xd
+        adjusted_variance = max(0.0, residual_variance - float(beta @ covariance_xd))
+        return beta, residual_variance, adjusted_variance
+
+    @property
+    def ratio(self) -> float:
+        """控制變量修正後的 RTP (比例)"""
+        n = self.count
+        if n < 2 or self.ratio_estimator.sum_bet == 0:
+            return self.ratio_estimator.ratio
+        beta, _, _ = self._fit()
+        adjusted_win = self.ratio_estimator.sum_win / n - float(beta @ (self.sum_x / n - self.control_means))
+        return adjusted_win / (self.ratio_estimator.sum_bet / n)
+
+    @property
+    def variance(self) -> float:
+        """修正後 RTP 的變異數"""
+        n = self.count
+        if n < 2 or self.ratio_estimator.sum_bet == 0:
+            return float('inf')
+        _, _, adjusted_variance = self._fit()
+        mean_bet = self.ratio_estimator.sum_bet / n
+        return adjusted_variance / (n * mean_bet * mean_bet)
+
+    @property
+    def standard_error(self) -> float:
+        """修正後 RTP 標準誤差 (比例)"""
+        return self.variance ** 0.5
+
+    @property
+    def variance_reduction(self) -> float:
+        """變異數降低倍數 (等效樣本數增益)"""
+        if self.count < 2:
+            return 1.0
+        _, residual_variance, adjusted_variance = self._fit()
+        return residual_variance / adjusted_variance if adjusted_variance > 0 else float('inf')
+
+    @property
+    def effective_sample_size(self) -> float:
+        """等效的一般估計樣本數"""
+        return self.count * self.variance_reduction
+
+    def half_width(self, confidence: float = 0.95) -> float:
+        """信賴區間半寬 (比例)"""
+        return z_score(confidence) * self.standard_error
+
+    def confidence_interval(self, confidence: float = 0.95) -> Tuple[float, float]:
+        """修正後 RTP 信賴區間 (比例)"""
+        half_width = self.half_width(confidence)
+        return self.ratio - half_width, self.ratio + half_width
+
+    def summary(self, confidence: float = 0.95) -> Dict[str, float]:
+        """摘要 (百分比)"""
+        lower, upper = self.confidence_interval(confidence)
+        return {
+            "rtp_percentage": self.ratio * 100,
+            "standard_error": self.standard_error * 100,
+            "confidence_interval": {"lower": lower * 100, "upper": upper * 100},
+            "plain_standard_error": self.ratio_estimator.standard_error * 100,
+            "variance_reduction": self.variance_reduction,
+            "effective_sample_size": self.effective_sample_size
+        }
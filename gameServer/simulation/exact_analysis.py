@@ -0,0 +1,153 @@
+"""
+基礎遊戲精確分析 - 以完整停止位置列舉計算 RTP 與贏分分布
+不使用蒙地卡羅模擬，結果與 WinCalculator 的 243 Ways 規則一致
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.game_model import CompiledGameModel
+from core.reel_tables import ReelWindowTables
+
+
+@dataclass
+class ExactBaseGameResult:
+    """基礎遊戲精確分析結果"""
+    total_combinations: int                 # 停止位置組合總數
+    bet: int
+    expected_win: float                     # 每次旋轉期望贏分
+    rtp_percentage: float
+    hit_frequency: float                    # 贏分 > 0 的機率
+    feature_trigger_probability: float      # 前三輪皆出現 BONUS 的機率
+    win_std_dev: float                      # 每次旋轉贏分標準差
+    max_win: int
+    symbol_rtp: Dict[str, float] = field(default_factory=dict)     # 各符號 RTP 貢獻 (%)
+    win_counts: Dict[int, int] = field(default_factory=dict)       # 贏分 -> 組合數
+    calculation_time: float = 0.0
+
+    def win_pmf(self) -> Dict[int, float]:
+        """贏分機率分布"""
+        return {win: count / self.total_combinations for win, count in self.win_counts.items()}
+
+
+class ExactBaseGameCalculator:
+    """
+    基礎遊戲精確計算器
+    每個滾輪先依視窗內容 (含 WILD 的各符號數量、BONUS 數量) 分組並記錄出現次數，
+    再列舉各輪分組的笛卡兒積，結果等同列舉全部停止位置組合
+    """
+
+    def __init__(self, model: CompiledGameModel, reel_strips: List[List[int]],
+                 stop_counts: Optional[List[int]] = None):
+        """
+        初始化計算器
+        stop_counts: 每輪可停止位置數，預設與 GameEngine 相同 (len(strip) - reel_height + 1)
+        """
+        self.model = model
+        self.reel_strips = [list(strip) for strip in reel_strips]
+        self.reel_height = model.reel_height
+
+        self.reel_tables = ReelWindowTables.from_strips(model, self.reel_strips, stop_counts)
+        self.stop_counts = self.reel_tables.stop_counts
+
+        # 需要計算的符號欄位：各 Ways 符號，最後一欄為 BONUS 數量
+        self.ways_symbol_ids = list(model.ways_symbol_ids)
+        self.reel_groups = [self._group_reel_windows(reel_idx) for reel_idx in range(len(self.reel_strips))]
+
+    @classmethod
+    def from_engine(cls, engine) -> "ExactBaseGameCalculator":
+        """由 GameEngine 的模型與滾輪條帶建立計算器"""
+        return cls(engine.model, engine.reel_strips, engine.reel_tables.stop_counts)
+
+    def _group_reel_windows(self, reel_idx: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        將單輪所有停止位置的視窗依內容分組
+        返回 (signatures (k, 欄位數), multiplicities (k,))
+        """
+        reel = self.reel_tables.reels[reel_idx]
+        columns = np.column_stack([reel.count_array[:, self.ways_symbol_ids], reel.bonus_count_array])
+        signatures, multiplicities = np.unique(columns, axis=0, return_counts=True)
+        return signatures.astype(np.int64), multiplicities.astype(np.int64)
+
+    def calculate(self, bet: int, chunk_size: int = 1_000_000) -> ExactBaseGameResult:
+        """列舉所有組合並計算精確統計"""
+        start_time = time.time()
+
+        reel_count = len(self.reel_groups)
+        group_sizes = [len(multiplicities) for _, multiplicities in self.reel_groups]
+        total_groups = int(np.prod(group_sizes))
+        total_combinations = int(np.prod(self.stop_counts))
+
+        pay_matrix = self.model.pay_matrix
+        scatter_pays = self.model.scatter_pay_array
+        symbol_credit = np.zeros(len(self.ways_symbol_ids), dtype=np.float64)
+        scatter_credit = 0.0
+        win_counts: Dict[int, int] = {}
+        trigger_weight = 0
+        trigger_reels = min(3, reel_count)
+
+        for chunk_start in range(0, total_groups, chunk_size):
+            flat_index = np.arange(chunk_start, min(chunk_start + chunk_size, total_groups))
+            reel_indices = np.unravel_index(flat_index, group_sizes)
+
+            weights = np.ones(len(flat_index), dtype=np.int64)
+            counts = []
+            for reel_idx, group_index in enumerate(reel_indices):
+                signatures, multiplicities = self.reel_groups[reel_idx]
+                weights *= multiplicities[group_index]
+                counts.append(signatures[group_index])
+            counts = np.stack(counts, axis=1)  # (chunk, reel_count, 欄位數)
+
+            total_win = np.zeros(len(flat_index), dtype=np.int64)
+            for column, symbol_id in enumerate(self.ways_symbol_ids):
+                per_reel = counts[:, :, column]
+                consecutive = np.cumprod(per_reel > 0, axis=1)
+                count = consecutive.sum(axis=1)
+                ways = np.where(consecutive > 0, per_reel, 1).prod(axis=1)
+                credit = np.where(count >= 3, pay_matrix[symbol_id][count], 0) * ways
+                total_win += credit
+                symbol_credit[column] += float(np.dot(credit, weights))
+
+            scatter_count = counts[:, :, -1].sum(axis=1)
+            scatter_win = np.where(scatter_count >= 3, scatter_pays[scatter_count], 0)
+            total_win += scatter_win
+            scatter_credit += float(np.dot(scatter_win, weights))
+
+            trigger = (counts[:, :trigger_reels, -1] > 0).sum(axis=1) >= 3
+            trigger_weight += int(weights[trigger].sum())
+
+            unique_wins, inverse = np.unique(total_win, return_inverse=True)
+            summed = np.bincount(inverse.ravel(), weights=weights)
+            for win, weight in zip(unique_wins.tolist(), summed.tolist()):
+                win_counts[win] = win_counts.get(win, 0) + int(round(weight))
+
+        expected_win = sum(win * count for win, count in win_counts.items()) / total_combinations
+        second_moment = sum(win * win * count for win, count in win_counts.items()) / total_combinations
+        hit_combinations = sum(count for win, count in win_counts.items() if win > 0)
+
+        symbol_rtp = {
+            self.model.symbol_name(symbol_id): float(symbol_credit[column]) / total_combinations / bet * 100
+            for column, symbol_id in enumerate(self.ways_symbol_ids)
+        }
+        symbol_rtp[self.model.symbol_name(self.model.scatter_id)] = scatter_credit / total_combinations / bet * 100
+
+        return ExactBaseGameResult(
+            total_combinations=total_combinations,
+            bet=bet,
+            expected_win=expected_win,
+            rtp_percentage=expected_win / bet * 100,
+            hit_frequency=hit_combinations / total_combinations,
+            feature_trigger_probability=trigger_weight / total_combinations,
+            win_std_dev=max(0.0, second_moment - expected_win ** 2) ** 0.5,
+            max_win=max(win_counts),
+            symbol_rtp=symbol_rtp,
+            win_counts=dict(sorted(win_counts.items())),
+            calculation_time=time.time() - start_time
+        )
@@ -0,0 +1,237 @@
+"""
+重要性抽樣模擬 - 估計罕見尾部事件 (五連、五個散佈、高倍率免費回合) 的機率與 RTP 貢獻
+停止位置改由偏向高賠付視窗的提議分布抽取，每次結果以似然比 Π p(s) / q(s) 加權，
+尾部機率與期望贏分皆為不偏估計；贏分分布以 (贏分 -> 似然比總和) 累計，不保留逐次結果
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+import numpy as np
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.feature_round import FeatureRoundEvaluator
+from core.rng import RandomStream
+from core.samplers import StopProposal
+
+
+@dataclass
+class TailEstimate:
+    """尾部事件機率估計"""
+    probability: float
+    standard_error: float
+    hits: int                   # 提議分布下實際抽到的次數
+
+
+@dataclass
+class ImportanceSamplingResult:
+    """重要性抽樣結果"""
+    mode: str                                   # "base_game" 或 "feature_round"
+    samples: int
+    cost: int                                   # 每次樣本的押注或購買成本
+    expected_win: float
+    expected_win_standard_error: float
+    rtp_percentage: float
+    tail_probabilities: Dict[str, TailEstimate] = field(default_factory=dict)
+    top_fraction: float = 0.001
+    top_win_threshold: float = 0.0              # 贏分分布的 (1 - top_fraction) 分位數
+    top_win_rtp_share: float = 0.0              # 前 top_fraction 結果佔期望贏分的比例
+    effective_sample_size: float = 0.0
+    simulation_time: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """轉為可導出的字典"""
+        data = dict(vars(self))
+        data["tail_probabilities"] = {name: vars(estimate) for name, estimate in self.tail_probabilities.items()}
+        return data
+
+
+class _WeightedAccumulator:
+    """似然比加權累計：期望贏分、尾部事件與 (贏分 -> 似然比總和) 分布"""
+
+    def __init__(self):
+        self.samples = 0
+        self.sum_weight = 0.0
+        self.sum_weight_sq = 0.0
+        self.sum_weighted_win = 0.0
+        self.sum_weighted_win_sq = 0.0
+        self.win_weights: Dict[int, float] = {}
+        self.events: Dict[str, list] = {}
+
+    def add(self, wins: np.ndarray, likelihood: np.ndarray, events: Dict[str, np.ndarray]):
+        """加入一個區塊"""
+        weighted = likelihood * wins
+        self.samples += len(wins)
+        self.sum_weight += float(likelihood.sum())
+        self.sum_weight_sq += float(np.dot(likelihood, likelihood))
+        self.sum_weighted_win += float(weighted.sum())
+        self.sum_weighted_win_sq += float(np.dot(weighted, weighted))
+
+        values, inverse = np.unique(wins, return_inverse=True)
+        for value, weight in zip(values.tolist(), np.bincount(inverse, weights=likelihood).tolist()):
+            self.win_weights[value] = self.win_weights.get(value, 0.0) + weight
+
+        for name, indicator in events.items():
+            event_weights = likelihood[indicator]
+            totals = self.events.setdefault(name, [0.0, 0.0, 0])
+            totals[0] += float(event_weights.sum())
+            totals[1] += float(np.dot(event_weights, event_weights))
+            totals[2] += int(indicator.sum())
+
+    def _mean_and_error(self, total: float, total_sq: float):
+        """樣本平均與標準誤差"""
+        n = self.samples
+        mean = total / n
+        variance = max(0.0, total_sq / n - mean * mean) * n / (n - 1) if n > 1 else 0.0
+        return mean, (variance / n) ** 0.5
+
+    def result(self, mode: str, cost: int, top_fraction: float, simulation_time: float) -> ImportanceSamplingResult:
+        """彙總為結果"""
+        expected_win, expected_error = self._mean_and_error(self.sum_weighted_win, self.sum_weighted_win_sq)
+
+        tail_probabilities = {}
+        for name, (total, total_sq, hits) in self.events.items():
+            probability, error = self._mean_and_error(total, total_sq)
+            tail_probabilities[name] = TailEstimate(probability, error, hits)
+
+        # 前 top_fraction 結果的貢獻：E[W·1(W > q)] + q·(f - P(W > q))
+        threshold = 0.0
+        top_win = 0.0
+        tail_mass = 0.0
+        for value in sorted(self.win_weights, reverse=True):
+            mass = self.win_weights[value] / self.samples
+            if tail_mass + mass >= top_fraction:
+                threshold = value
+                top_win += value * (top_fraction - tail_mass)
+                break
+            tail_mass += mass
+            top_win += value * mass
+
+        return ImportanceSamplingResult(
+            mode=mode,
+            samples=self.samples,
+            cost=cost,
+            expected_win=expected_win,
+            expected_win_standard_error=expected_error,
+            rtp_percentage=expected_win / cost * 100 if cost > 0 else 0.0,
+            tail_probabilities=tail_probabilities,
+            top_fraction=top_fraction,
+            top_win_threshold=threshold,
+            top_win_rtp_share=top_win / expected_win if expected_win > 0 else 0.0,
+            effective_sample_size=self.sum_weight ** 2 / self.sum_weight_sq if self.sum_weight_sq > 0 else 0.0,
+            simulation_time=simulation_time
+        )
+
+
+class ImportanceSampler:
+    """
+    重要性抽樣器
+    每輪停止位置的提議權重為 (1 + boost) ^ (視窗內高賠付格數)，
+    高賠付符號預設為 BONUS、WILD 與五連賠付不低於最高五連賠付一半的符號。
+    免費旋轉回合的似然比為回合內各次旋轉的乘積，因此回合改用防禦性混合提議
+    (每次旋轉以 round_mixture 機率使用加權提議)，避免似然比隨旋轉次數爆增
+    """
+
+    def __init__(self, engine, boost: float = 2.0, round_mixture: float = 0.1,
+                 high_pay_symbols: Optional[Iterable[int]] = None, rng: Optional[RandomStream] = None):
+        """由 GameEngine 建立抽樣器 (rng 預設使用引擎的隨機數流)"""
+        self.model = engine.model
+        self.reel_tables = engine.reel_tables
+        self.win_calculator = engine.win_calculator
+        self.rng = rng if rng is not None else engine.rng
+        self.feature_evaluator = FeatureRoundEvaluator(
+            engine.model, engine.reel_tables, engine.win_calculator, engine.symbol_transformer, self.rng
+        )
+
+        if high_pay_symbols is None:
+            high_pay_symbols = self.default_high_pay_symbols()
+        self.high_pay_symbols = sorted(high_pay_symbols)
+        self.boost = boost
+        self.stop_proposal = self.build_stop_proposal(boost)
+        self.round_stop_proposal = self.build_stop_proposal(boost, round_mixture)
+
+    def default_high_pay_symbols(self):
+        """BONUS、WILD 與高賠付 Ways 符號"""
+        reel_count = self.model.reel_count
+        five_pays = {symbol_id: int(self.model.pay_matrix[symbol_id][reel_count])
+                     for symbol_id in self.model.ways_symbol_ids}
+        top_pay = max(five_pays.values())
+        symbols = {symbol_id for symbol_id, pay in five_pays.items() if pay * 2 >= top_pay}
+        symbols.update(symbol_id for symbol_id in (self.model.scatter_id, self.model.wild_id) if symbol_id >= 0)
+        return symbols
+
+    def build_stop_proposal(self, boost: float, mixture: float = 1.0) -> StopProposal:
+        """依各停止位置視窗內的高賠付格數建立提議分布 (mixture < 1 為防禦性混合)"""
+        high_pay = np.array(self.high_pay_symbols)
+        return StopProposal([
+            (1.0 + boost) ** np.isin(reel.window_array, high_pay).sum(axis=1)
+            for reel in self.reel_tables.reels
+        ], mixture)
+
+    def _base_game_events(self, credit: np.ndarray, symbol_counts: np.ndarray, bonus_counts: np.ndarray,
+                          bet: int, win_multiples: Sequence[int]) -> Dict[str, np.ndarray]:
+        """基礎遊戲尾部事件指示"""
+        reel_count = self.model.reel_count
+        events = {}
+        for symbol_id in self.model.ways_symbol_ids:
+            events[f"five_of_a_kind_{self.model.symbol_name(symbol_id)}"] = \
+                (symbol_counts[:, :, symbol_id] > 0).all(axis=1)
+        events[f"scatter_{reel_count}"] = bonus_counts.sum(axis=1) >= reel_count
+        events["feature_trigger"] = (bonus_counts[:, :3] > 0).all(axis=1)
+        for multiple in win_multiples:
+            events[f"win_{multiple}x"] = credit >= multiple * bet
+        return events
+
+    def run_base_game(self, spins: int, bet: int = 50, block_size: int = 100000,
+                      win_multiples: Sequence[int] = (20, 50, 100), top_fraction: float = 0.001) -> ImportanceSamplingResult:
+        """
+        基礎遊戲重要性抽樣
+        回報期望贏分、五連 / 五個散佈 / 觸發 / 高倍贏分機率與前 top_fraction 贏分的 RTP 貢獻
+        """
+        start_time = time.time()
+        accumulator = _WeightedAccumulator()
+
+        remaining = spins
+        while remaining > 0:
+            size = min(block_size, remaining)
+            remaining -= size
+
+            stops, likelihood = self.stop_proposal.sample(self.rng, size)
+            symbol_counts, bonus_counts = self.reel_tables.gather_counts(stops)
+            credit = self.win_calculator.calculate_243_ways_counts_batch(symbol_counts, bonus_counts)["total_credit"]
+            events = self._base_game_events(credit, symbol_counts, bonus_counts, bet, win_multiples)
+            accumulator.add(credit, likelihood, events)
+
+        return accumulator.result("base_game", bet, top_fraction, time.time() - start_time)
+
+    def run_feature_rounds(self, rounds: int, drums: int, cost: int, bet: int = 50,
+                           multiplier_tilt: float = 0.0, block_size: int = 20000,
+                           win_multiples: Sequence[int] = (100, 200, 400),
+                           top_fraction: float = 0.001) -> ImportanceSamplingResult:
+        """
+        免費旋轉回合重要性抽樣
+        停止位置使用防禦性混合提議；multiplier_tilt > 0 時單鼓倍率 v 的提議權重為 v ^ multiplier_tilt
+        """
+        start_time = time.time()
+        accumulator = _WeightedAccumulator()
+        multiplier_weights = None
+        if multiplier_tilt > 0:
+            low, high = FeatureRoundEvaluator.DRUM_MULTIPLIER_RANGE
+            multiplier_weights = [value ** multiplier_tilt for value in range(low, high + 1)]
+
+        remaining = rounds
+        while remaining > 0:
+            size = min(block_size, remaining)
+            remaining -= size
+
+            batch = self.feature_evaluator.play_rounds(size, drums, stop_proposal=self.round_stop_proposal,
+                                                       multiplier_weights=multiplier_weights)
+            events = {f"win_{multiple}x": batch.total_win >= multiple * bet for multiple in win_multiples}
+            events["retrigger"] = batch.retriggers > 0
+            accumulator.add(batch.total_win, batch.likelihood_ratio, events)
+
+        return accumulator.result("feature_round", cost, top_fraction, time.time() - start_time)
@@ -0,0 +1,145 @@
+"""
+記憶體量測與預算 - 進程 RSS、物件深層大小與模擬的記憶體上限
+MemoryBudget 對應 simulation_config.json 的 performance.max_memory_mb：
+進程 RSS (或緩衝估計) 達到上限的 spill_fraction 時，模擬將逐次紀錄溢出至磁碟
+"""
+
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MB = 1024 * 1024
+
+
+def current_rss_bytes() -> int:
+    """目前進程常駐記憶體 (Linux 讀取 /proc，其他平台為峰值 RSS，無法取得時為 0)"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes() -> int:
+    """進程峰值常駐記憶體 (無法取得時為 0)"""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 為單位，macOS 以 bytes 為單位
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def deep_sizeof(obj: Any) -> int:
+    """物件及其包含的容器、字串與數字的總大小 (共用的物件只計算一次)"""
+    seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif hasattr(item, "__dict__") and not isinstance(item, type):
+            stack.append(vars(item))
+    return total
+
+
+class MemoryBudget:
+    """
+    記憶體上限
+    max_mb: 進程記憶體上限 (MB)；spill_fraction: 達到上限的此比例時切換為溢出模式
+    """
+
+    def __init__(self, max_mb: float, spill_fraction: float = 0.8):
+        if max_mb <= 0:
+            raise ValueError("記憶體上限必須大於 0")
+        if not 0 < spill_fraction <= 1:
+            raise ValueError("spill_fraction 必須在 (0, 1] 範圍內")
+        self.max_mb = max_mb
+        self.spill_fraction = spill_fraction
+        self.max_bytes = int(max_mb * MB)
+        self.spill_bytes = int(self.max_bytes * spill_fraction)
+
+    def exceeded(self, buffered_bytes: int = 0) -> bool:
+        """進程 RSS 或緩衝估計是否已達溢出門檻"""
+        return buffered_bytes >= self.spill_bytes or current_rss_bytes() >= self.spill_bytes
+
+
+@dataclass
+class MemoryMeasurement:
+    """一段程式的記憶體用量 (bytes)，由 measure_memory 於區塊結束時填入"""
+    rss_before: int = 0
+    rss_after: int = 0
+    rss_peak: int = 0                       # 取樣期間的最大 RSS
+    traced_peak: Optional[int] = None       # tracemalloc 配置峰值 (未啟用時為 None)
+    elapsed: float = 0.0                    # 秒
+
+    @property
+    def rss_peak_delta(self) -> int:
+        """RSS 峰值相對開始時的增加量"""
+        return max(0, self.rss_peak - self.rss_before)
+
+
+class _RssSampler(threading.Thread):
+    """背景執行緒定期取樣 RSS 並記錄最大值"""
+
+    def __init__(self, interval: float):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = current_rss_bytes()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.peak = max(self.peak, current_rss_bytes())
+
+    def stop(self) -> int:
+        self._stop_event.set()
+        self.join()
+        self.peak = max(self.peak, current_rss_bytes())
+        return self.peak
+
+
+@contextmanager
+def measure_memory(trace: bool = True, interval: float = 0.01) -> Iterator[MemoryMeasurement]:
+    """
+    量測區塊內的記憶體用量 (背景執行緒每 interval 秒取樣 RSS)
+    trace: 同時以 tracemalloc 記錄 Python 配置峰值 (較慢；已啟用時沿用並重設峰值)
+    """
+    measurement = MemoryMeasurement()
+    started_tracing = trace and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    if trace:
+        tracemalloc.reset_peak()
+        traced_start = tracemalloc.get_traced_memory()[0]
+    measurement.rss_before = current_rss_bytes()
+    sampler = _RssSampler(interval)
+    sampler.start()
+    started = time.perf_counter()
+    try:
+        yield measurement
+    finally:
+        measurement.elapsed = time.perf_counter() - started
+        measurement.rss_peak = sampler.stop()
+        if trace:
+            measurement.traced_peak = max(0, tracemalloc.get_traced_memory()[1] - traced_start)
+            if started_tracing:
+                tracemalloc.stop()
+        measurement.rss_after = current_rss_bytes()
@@ -0,0 +1,98 @@
+"""
+分片平行模擬 - 將總旋轉數切分為固定分片，由多個工作進程執行後合併
+分片切分與每個分片的隨機數子流只由主種子與分片大小決定，
+因此相同主種子與分片計畫下，合併結果與工作進程數無關
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulation.simulator import GameSimulator, SimulationConfig, SimulationResult
+
+
+@dataclass(frozen=True)
+class ShardPlan:
+    """分片計畫"""
+    total_spins: int
+    shard_size: int = 50000
+
+    @property
+    def shard_spins(self) -> List[int]:
+        """各分片旋轉數 (最後一片可能較小)"""
+        full_shards, remainder = divmod(self.total_spins, self.shard_size)
+        return [self.shard_size] * full_shards + ([remainder] if remainder else [])
+
+    @property
+    def shard_count(self) -> int:
+        """分片數量"""
+        return len(self.shard_spins)
+
+    def shard_configs(self, config: SimulationConfig) -> List[SimulationConfig]:
+        """
+        為每個分片建立模擬配置
+        分片 i 的種子為主種子 SeedSequence 的第 i 個子序列；
+        cProfile 旋轉範圍只適用於單一進程，分片不使用
+        """
+        master = config.seed if isinstance(config.seed, np.random.SeedSequence) else np.random.SeedSequence(config.seed)
+        seeds = master.spawn(self.shard_count)
+        return [
+            replace(config, total_spins=spins, seed=seed, profile_spin_range=None)
+            for spins, seed in zip(self.shard_spins, seeds)
+        ]
+
+
+# 工作進程內重複使用的模擬器 (依配置路徑快取)
+_WORKER_SIMULATORS: Dict[Tuple[str, str], GameSimulator] = {}
+
+
+def _run_shard(config_path: str, paytable_path: str, shard_config: SimulationConfig,
+               batch: bool) -> SimulationResult:
+    """在工作進程中執行單一分片"""
+    key = (config_path, paytable_path)
+    simulator = _WORKER_SIMULATORS.get(key)
+    if simulator is None:
+        simulator = GameSimulator(config_path, paytable_path)
+        simulator.print_stage_profile = False  # 各分片的階段用時合併後由主進程輸出
+        _WORKER_SIMULATORS[key] = simulator
+
+    if batch:
+        result = simulator.run_batch_simulation(shard_config)
+    else:
+        result = simulator.run_basic_simulation(shard_config)
+
+    # 分片只需要彙總結果，釋放逐次旋轉紀錄
+    simulator.simulation_history.clear()
+    simulator.detailed_logs.clear()
+    return result
+
+
+def run_sharded_simulation(config: SimulationConfig, workers: int = 1, shard_size: int = 50000,
+                           batch: bool = False, config_path: str = "config/game_config.json",
+                           paytable_path: str = "config/paytable.json") -> SimulationResult:
+    """
+    執行分片模擬並合併結果
+    workers <= 1 時在目前進程依序執行 (結果與多進程相同)；
+    合併結果的 simulation_time 為實際經過時間
+    """
+    start_time = time.time()
+    plan = ShardPlan(config.total_spins, shard_size)
+    shard_configs = plan.shard_configs(config)
+
+    if workers <= 1 or plan.shard_count <= 1:
+        shard_results = [_run_shard(config_path, paytable_path, shard_config, batch)
+                         for shard_config in shard_configs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, plan.shard_count)) as executor:
+            futures = [executor.submit(_run_shard, config_path, paytable_path, shard_config, batch)
+                       for shard_config in shard_configs]
+            shard_results = [future.result() for future in futures]
+
+    return SimulationResult.merge(shard_results, simulation_time=time.time() - start_time)
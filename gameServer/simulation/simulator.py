@@ -2,22 +2,32 @@
 遊戲模擬器 - 執行大量遊戲模擬以分析遊戲數學模型
 """
 
-import random
 import time
+from array import array
 from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, field
 import json
 import statistics
 
+import numpy as np
+
 # 相對導入
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from core.game_engine import GameEngine, SpinType, SpinResult
+from core.rng import RandomStream, SeedLike
+from core.feature_round import FeatureRoundEvaluator
+from core.profiler import SpinRangeProfiler, StageProfiler
 from features.free_spins import FreeSpinsFeature
 from features.war_drums import WarDrumsFeature
 from features.feature_buy import FeatureBuyController, PurchaseOption
+from simulation.sinks import SpinRecordSink, BufferSink, SpillBuffer
+from simulation.memory import MB, MemoryBudget
+from simulation.estimators import ControlVariateEstimator, RatioEstimator, StreamingMoments
+from simulation.statistics import QuantileSketch, percentiles_from_sorted
+from simulation.exact_analysis import ExactBaseGameCalculator, ExactBaseGameResult
 from protocol.json_exporter import ProtoJSONExporter, export_simulation_results_to_json
 from protocol.event_log_exporter import export_simulation_to_event_log
 from protocol.simple_data_exporter import export_simulation_to_simple_data
@@ -30,7 +40,12 @@ class SimulationConfig:
     player_initial_credit: int = 1000000
     feature_buy_enabled: bool = True
     auto_buy_threshold: float = 0.1  # 10% 機率自動購買特色
-    seed: Optional[int] = None
+    seed: SeedLike = None  # 整數種子或 SeedSequence (分片模擬時由主種子衍生)
+    control_variate: bool = False  # 以精確基礎遊戲期望值作為控制變量估計 RTP
+    profile: bool = False  # 記錄各階段用時並於結束時輸出
+    profile_spin_range: Optional[Tuple[int, int]] = None  # 以 cProfile 分析的旋轉範圍 [start, end)
+    profile_output: str = "simulation_results/spin_profile.pstats"  # cProfile 輸出檔案
+    max_memory_mb: Optional[float] = None  # 記憶體上限 (None 為不限制，main.py 由 performance.max_memory_mb 讀取)
 
 @dataclass
 class SimulationResult:
@@ -46,20 +61,250 @@ class SimulationResult:
     feature_trigger_rate: float
     average_win_per_spin: float
     simulation_time: float
+    win_sketch: Optional[QuantileSketch] = field(default=None, repr=False)
+    win_moments: Optional[StreamingMoments] = field(default=None, repr=False)  # 每次旋轉贏分
+    net_moments: Optional[StreamingMoments] = field(default=None, repr=False)  # 每次旋轉淨輸贏
+    feature_moments: Optional[StreamingMoments] = field(default=None, repr=False)  # 每個免費旋轉回合贏分
+    ratio_estimator: Optional[RatioEstimator] = field(default=None, repr=False)  # 每次旋轉 (押注, 贏分) 的比率估計
+    control_estimator: Optional[ControlVariateEstimator] = field(default=None, repr=False)  # 控制變量 RTP 估計
+    stage_profile: Optional[StageProfiler] = field(default=None, repr=False)  # 各階段用時
+    record_buffer: Optional[Dict[str, Any]] = field(default=None, repr=False)  # JSON 輸出的詳細結果筆數與溢出狀態
+    
+    EXPORT_PERCENTILES = [50, 90, 95, 99, 99.9]
+    MOMENT_FIELDS = ("win_moments", "net_moments", "feature_moments")
+    
+    @property
+    def win_to_bet_std_dev(self) -> float:
+        """每次旋轉贏分標準差相對平均押注的倍數"""
+        if self.win_moments is None or self.total_bet == 0:
+            return 0.0
+        return self.win_moments.std_dev / (self.total_bet / self.total_spins)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """轉為可導出的字典 (贏分草圖以百分位數摘要取代分格，動差以摘要取代)"""
+        data = {name: value for name, value in vars(self).items()
+                if name not in ("win_sketch", "ratio_estimator", "control_estimator", "stage_profile",
+                                "record_buffer")
+                and name not in self.MOMENT_FIELDS}
+        if self.win_sketch is not None:
+            data["win_percentiles"] = {
+                str(p): value for p, value in self.win_sketch.percentiles(self.EXPORT_PERCENTILES).items()
+            }
+        for name in self.MOMENT_FIELDS:
+            moments = getattr(self, name)
+            if moments is not None:
+                data[name] = moments.summary()
+        if self.control_estimator is not None:
+            data["control_variate"] = self.control_estimator.summary()
+        if self.stage_profile is not None:
+            data["stage_profile"] = self.stage_profile.summary()
+        if self.record_buffer is not None:
+            data["record_buffer"] = self.record_buffer
+        return data
+    
+    @classmethod
+    def merge(cls, results: List["SimulationResult"],
+              simulation_time: Optional[float] = None) -> "SimulationResult":
+        """
+        合併多個分片結果
+        計數與總額相加、最大贏分取最大值，比率由合併後的總額重新計算；
+        所有分片皆有贏分草圖、動差、比率估計、控制變量估計或階段用時時一併合併；simulation_time 未提供時為各分片用時總和
+        """
+        total_spins = sum(result.total_spins for result in results)
+        win_sketch = None
+        if results and all(result.win_sketch is not None for result in results):
+            win_sketch = QuantileSketch(results[0].win_sketch.relative_accuracy,
+                                        results[0].win_sketch.exact_limit)
+            for result in results:
+                win_sketch.merge(result.win_sketch)
+        moments = {}
+        for name in cls.MOMENT_FIELDS:
+            if results and all(getattr(result, name) is not None for result in results):
+                moments[name] = StreamingMoments()
+                for result in results:
+                    moments[name].merge(getattr(result, name))
+        ratio_estimator = None
+        if results and all(result.ratio_estimator is not None for result in results):
+            ratio_estimator = RatioEstimator()
+            for result in results:
+                ratio_estimator.merge(result.ratio_estimator)
+        control_estimator = None
+        if results and all(result.control_estimator is not None for result in results):
+            control_estimator = ControlVariateEstimator(results[0].control_estimator.control_means)
+            for result in results:
+                control_estimator.merge(result.control_estimator)
+        stage_profile = None
+        if results and all(result.stage_profile is not None for result in results):
+            stage_profile = StageProfiler()
+            for result in results:
+                stage_profile.merge(result.stage_profile)
+        total_bet = sum(result.total_bet for result in results)
+        total_win = sum(result.total_win for result in results)
+        feature_triggers = sum(result.feature_triggers for result in results)
+        
+        return cls(
+            total_spins=total_spins,
+            total_bet=total_bet,
+            total_win=total_win,
+            net_result=total_win - total_bet,
+            feature_triggers=feature_triggers,
+            feature_buys=sum(result.feature_buys for result in results),
+            biggest_win=max((result.biggest_win for result in results), default=0),
+            rtp_percentage=(total_win / total_bet * 100) if total_bet > 0 else 0,
+            feature_trigger_rate=(feature_triggers / total_spins) if total_spins > 0 else 0,
+            average_win_per_spin=total_win / total_spins if total_spins > 0 else 0,
+            simulation_time=(simulation_time if simulation_time is not None
+                             else sum(result.simulation_time for result in results)),
+            win_sketch=win_sketch,
+            ratio_estimator=ratio_estimator,
+            control_estimator=control_estimator,
+            stage_profile=stage_profile,
+            **moments
+        )
+
+class _SpinAccumulator:
+    """逐次旋轉模擬的累計：贏分草圖、每次旋轉與每個免費旋轉回合贏分的動差、(押注, 贏分) 比率估計"""
+    
+    def __init__(self):
+        self.win_sketch = QuantileSketch()
+        self.win_moments = StreamingMoments()
+        self.net_moments = StreamingMoments()
+        self.feature_moments = StreamingMoments()
+        self.ratio_estimator = RatioEstimator()
+        self.round_win = 0
+        self.in_feature_round = False
+    
+    def add(self, bet_amount: int, win: int, is_free_game: bool, is_buy: bool, free_spins_remaining: int):
+        """
+        加入一次旋轉
+        免費旋轉回合於觸發或購買後開始、剩餘次數歸零時結束，與 _simulate_paid_block 相同，
+        購買旋轉本身即為回合的第一次免費旋轉，其贏分計入回合
+        """
+        self.win_sketch.add(win)
+        self.win_moments.add(win)
+        self.net_moments.add(win - bet_amount)
+        self.ratio_estimator.add(bet_amount, win)
+        
+        if is_free_game:
+            self.round_win += win
+        elif is_buy:
+            self.in_feature_round = True
+            self.round_win = win
+        if free_spins_remaining == 0:
+            if self.in_feature_round:
+                self.feature_moments.add(self.round_win)
+                self.in_feature_round = False
+        elif not self.in_feature_round:
+            self.in_feature_round = True
+            self.round_win = 0
+    
+    def result_fields(self) -> Dict[str, Any]:
+        """SimulationResult 的草圖、動差與比率估計欄位"""
+        return {
+            "win_sketch": self.win_sketch,
+            "win_moments": self.win_moments,
+            "net_moments": self.net_moments,
+            "feature_moments": self.feature_moments,
+            "ratio_estimator": self.ratio_estimator
+        }
 
 class GameSimulator:
     """遊戲模擬器類"""
     
+    # 進程記憶體達到 max_memory_mb 的此比例時，JSON 輸出的詳細結果改為溢出至磁碟
+    MEMORY_SPILL_FRACTION = 0.8
+    
     def __init__(self, config_path: str = "config/game_config.json", paytable_path: str = "config/paytable.json"):
         """初始化模擬器"""
-        self.game_engine = GameEngine(config_path, paytable_path)
+        self.config_path = config_path
+        self.paytable_path = paytable_path
+        self.profiler = StageProfiler()
+        self.print_stage_profile = True  # 模擬結束時輸出各階段用時 (config.profile 時)
+        self.game_engine = GameEngine(config_path, paytable_path, profiler=self.profiler)
         self.simulation_history = []
         self.detailed_logs = []
+        self._exact_base_game_cache: Optional[Tuple[Tuple, ExactBaseGameResult]] = None
+    
+    def _init_rng_streams(self, seed: SeedLike) -> RandomStream:
+        """
+        依種子建立本次模擬的隨機數流
+        引擎與購買決策使用互相獨立的子流，返回購買決策用的隨機數流
+        """
+        engine_rng, decision_rng = RandomStream(seed).spawn(2)
+        self.game_engine.set_rng(engine_rng)
+        return decision_rng
+    
+    def _start_profiling(self, config: SimulationConfig) -> Optional[SpinRangeProfiler]:
+        """
+        依配置開始記錄階段用時 (清除上次的累計)，
+        有 profile_spin_range 時返回 cProfile 旋轉範圍分析器
+        """
+        self.game_engine.set_profiler(self.profiler)
+        if config.profile:
+            self.profiler.reset()
+            self.profiler.enable()
+        if config.profile_spin_range is None:
+            return None
+        start, end = config.profile_spin_range
+        return SpinRangeProfiler(start, end, config.profile_output)
+    
+    def _finish_profiling(self, config: SimulationConfig, spin_profiler: Optional[SpinRangeProfiler],
+                          simulation_time: float) -> Optional[StageProfiler]:
+        """結束記錄並輸出各階段用時，返回本次模擬的階段用時快照"""
+        if spin_profiler is not None:
+            output_path = spin_profiler.finish()
+            if output_path is not None and self.print_stage_profile:
+                print(f"📄 cProfile 已保存: {output_path}")
+        if not config.profile:
+            return None
         
-    def run_basic_simulation(self, config: SimulationConfig) -> SimulationResult:
-        """運行基礎模擬"""
-        if config.seed:
-            random.seed(config.seed)
+        self.profiler.disable()
+        snapshot = StageProfiler()
+        snapshot.merge(self.profiler)
+        if self.print_stage_profile:
+            self._print_stage_profile(snapshot, simulation_time)
+        return snapshot
+    
+    def _print_stage_profile(self, profile: StageProfiler, simulation_time: Optional[float]):
+        """輸出各階段用時表 (simulation_time 為 None 時不計算佔比，例如多進程合併的結果)"""
+        if simulation_time is None:
+            print("⏱️ 各階段用時 (各分片合併，整次旋轉包含其內部階段):")
+        else:
+            print(f"⏱️ 各階段用時 (總用時 {simulation_time:.2f} 秒，整次旋轉包含其內部階段):")
+        print(profile.format_report(simulation_time))
+    
+    def _memory_budget(self, config: SimulationConfig) -> Optional[MemoryBudget]:
+        """模擬的記憶體上限 (config.max_memory_mb 為 None 時不限制)"""
+        if config.max_memory_mb is None:
+            return None
+        return MemoryBudget(config.max_memory_mb, self.MEMORY_SPILL_FRACTION)
+    
+    def _exact_base_game(self) -> ExactBaseGameResult:
+        """目前滾輪條帶的精確基礎遊戲結果 (依條帶內容快取)"""
+        key = tuple(tuple(strip) for strip in self.game_engine.reel_strips)
+        if self._exact_base_game_cache is None or self._exact_base_game_cache[0] != key:
+            self._exact_base_game_cache = (key, self.run_exact_base_game_analysis())
+        return self._exact_base_game_cache[1]
+    
+    def _new_control_estimator(self) -> ControlVariateEstimator:
+        """
+        建立控制變量估計量
+        控制變量為一般旋轉的基礎遊戲贏分與觸發指示，其他單位 (購買、免費旋轉) 取期望值
+        """
+        exact = self._exact_base_game()
+        return ControlVariateEstimator([exact.expected_win, exact.feature_trigger_probability])
+        
+    def run_basic_simulation(self, config: SimulationConfig,
+                             sink: Optional[SpinRecordSink] = None) -> SimulationResult:
+        """
+        運行基礎模擬
+        預設只累計固定大小的彙總 (含每次旋轉贏分的分位數草圖與動差)；
+        提供 sink 時才建立逐次旋轉紀錄並寫入 sink
+        (BufferSink 的紀錄同時加入 detailed_logs 供 export_simulation_data 使用)；
+        config.profile 時記錄各階段用時，profile_spin_range 指定以 cProfile 分析的旋轉範圍
+        """
+        decision_rng = self._init_rng_streams(config.seed)
+        spin_profiler = self._start_profiling(config)
         
         start_time = time.time()
         
@@ -74,44 +319,49 @@ class GameSimulator:
         feature_triggers = 0
         feature_buys = 0
         biggest_win = 0
-        spin_results = []
+        accumulator = _SpinAccumulator()
+        control_estimator = self._new_control_estimator() if config.control_variate else None
+        if control_estimator is not None:
+            base_control_means = control_estimator.control_means.tolist()
         
         # 執行模擬
         for spin_num in range(config.total_spins):
+            if spin_profiler is not None:
+                spin_profiler.update(spin_num)
             # 決定是否購買特色
             should_buy_feature = (
                 config.feature_buy_enabled and 
-                random.random() < config.auto_buy_threshold and
+                decision_rng.random() < config.auto_buy_threshold and
                 self.game_engine.free_spins_remaining == 0
             )
             
             if should_buy_feature:
                 # 隨機選擇購買選項
-                buy_options = [SpinType.FEATURE_BUY_60X, SpinType.FEATURE_BUY_80X, SpinType.FEATURE_BUY_100X]
-                spin_type = random.choice(buy_options)
+                spin_type = decision_rng.choice(self.BUY_OPTIONS)
                 feature_buys += 1
             else:
                 spin_type = SpinType.NORMAL
             
             # 執行旋轉
             try:
-                if self.game_engine.free_spins_remaining > 0:
+                is_free_game = self.game_engine.free_spins_remaining > 0
+                if is_free_game:
                     result = self.game_engine.spin_free_game()
                 else:
                     result = self.game_engine.spin(spin_type)
                 
                 # 記錄統計
-                bet_amount = config.base_bet
-                if spin_type != SpinType.NORMAL:
-                    multipliers = {
-                        SpinType.FEATURE_BUY_60X: 60,
-                        SpinType.FEATURE_BUY_80X: 80,
-                        SpinType.FEATURE_BUY_100X: 100
-                    }
-                    bet_amount *= multipliers[spin_type]
-                
+                bet_amount = self._bet_amount(config, spin_type)
                 total_bet += bet_amount
                 total_win += result.total_credit
+                accumulator.add(bet_amount, result.total_credit, is_free_game, spin_type != SpinType.NORMAL,
+                                self.game_engine.free_spins_remaining)
+                if control_estimator is not None:
+                    if not is_free_game and spin_type == SpinType.NORMAL:
+                        controls = (result.total_credit, float(result.is_feature_trigger))
+                    else:
+                        controls = base_control_means
+                    control_estimator.add(bet_amount, result.total_credit, controls)
                 
                 if result.total_credit > biggest_win:
                     biggest_win = result.total_credit
@@ -119,17 +369,17 @@ class GameSimulator:
                 if result.is_feature_trigger:
                     feature_triggers += 1
                 
-                # 記錄詳細結果
-                spin_data = {
-                    "spin_number": spin_num + 1,
-                    "spin_type": spin_type.name if hasattr(spin_type, 'name') else str(spin_type),
-                    "bet_amount": bet_amount,
-                    "win_amount": result.total_credit,
-                    "is_feature_trigger": result.is_feature_trigger,
-                    "free_spins_remaining": self.game_engine.free_spins_remaining,
-                    "player_credit": self.game_engine.player_credit
-                }
-                spin_results.append(spin_data)
+                # 記錄詳細結果 (僅在提供 sink 時)
+                if sink is not None:
+                    sink.write({
+                        "spin_number": spin_num + 1,
+                        "spin_type": spin_type.name if hasattr(spin_type, 'name') else str(spin_type),
+                        "bet_amount": bet_amount,
+                        "win_amount": result.total_credit,
+                        "is_feature_trigger": result.is_feature_trigger,
+                        "free_spins_remaining": self.game_engine.free_spins_remaining,
+                        "player_credit": self.game_engine.player_credit
+                    })
                 
             except Exception as e:
                 print(f"旋轉 {spin_num + 1} 發生錯誤: {e}")
@@ -137,6 +387,7 @@ class GameSimulator:
         
         # 計算最終統計
         simulation_time = time.time() - start_time
+        stage_profile = self._finish_profiling(config, spin_profiler, simulation_time)
         net_result = total_win - total_bet
         rtp_percentage = (total_win / total_bet * 100) if total_bet > 0 else 0
         feature_trigger_rate = (feature_triggers / config.total_spins) if config.total_spins > 0 else 0
@@ -153,174 +404,552 @@ class GameSimulator:
             rtp_percentage=rtp_percentage,
             feature_trigger_rate=feature_trigger_rate,
             average_win_per_spin=average_win_per_spin,
-            simulation_time=simulation_time
+            simulation_time=simulation_time,
+            control_estimator=control_estimator,
+            stage_profile=stage_profile,
+            **accumulator.result_fields()
         )
         
         # 保存結果
         self.simulation_history.append(result)
-        self.detailed_logs.append(spin_results)
+        if isinstance(sink, BufferSink):
+            self.detailed_logs.append(list(sink.records))
         
         return result
     
-    def run_feature_buy_analysis(self, spins_per_option: int = 1000) -> Dict[str, Any]:
-        """運行特色購買分析"""
-        analysis_results = {}
+    # 特色購買選項：成本倍數與戰鼓數量
+    BUY_OPTIONS = [SpinType.FEATURE_BUY_60X, SpinType.FEATURE_BUY_80X, SpinType.FEATURE_BUY_100X]
+    BUY_COST_MULTIPLIERS = {
+        SpinType.FEATURE_BUY_60X: 60,
+        SpinType.FEATURE_BUY_80X: 80,
+        SpinType.FEATURE_BUY_100X: 100
+    }
+    BUY_DRUMS = {
+        SpinType.FEATURE_BUY_60X: 1,
+        SpinType.FEATURE_BUY_80X: 2,
+        SpinType.FEATURE_BUY_100X: 3
+    }
+    
+    def _bet_amount(self, config: SimulationConfig, spin_type: SpinType) -> int:
+        """單次旋轉的押注金額 (購買特色時為基礎押注乘以成本倍數)"""
+        if spin_type == SpinType.NORMAL:
+            return config.base_bet
+        return config.base_bet * self.BUY_COST_MULTIPLIERS[spin_type]
+    
+    def run_batch_simulation(self, config: SimulationConfig, batch_size: int = 100000) -> SimulationResult:
+        """
+        使用批量旋轉 API 運行模擬
+        每次付費旋轉為一個單位：一般旋轉由 GameEngine.spin_batch 向量化計算，
+        觸發或購買的免費旋轉回合由引擎逐次執行，其贏分計入觸發該回合的付費旋轉。
+        與 run_basic_simulation 不同，免費旋轉不計入 total_spins 也不計押注，
+        贏分草圖與動差亦以付費旋轉單位累計。
+        profile_spin_range 以付費旋轉單位計算，cProfile 以區塊為單位開始與結束。
+        """
+        decision_rng = self._start_batch_simulation(config)
+        spin_profiler = self._start_profiling(config)
         
-        for option in [SpinType.FEATURE_BUY_60X, SpinType.FEATURE_BUY_80X, SpinType.FEATURE_BUY_100X]:
-            option_name = option.name
-            results = []
+        start_time = time.time()
+        
+        total_bet = 0
+        total_win = 0
+        feature_triggers = 0
+        feature_buys = 0
+        biggest_win = 0
+        win_sketch = QuantileSketch()
+        win_moments = StreamingMoments()
+        net_moments = StreamingMoments()
+        feature_moments = StreamingMoments()
+        ratio_estimator = RatioEstimator()
+        control_estimator = self._new_control_estimator() if config.control_variate else None
+        
+        remaining = config.total_spins
+        while remaining > 0:
+            block_size = min(batch_size, remaining)
+            if spin_profiler is not None:
+                spin_profiler.update(config.total_spins - remaining, block_size)
+            remaining -= block_size
             
-            for _ in range(spins_per_option):
-                # 重置遊戲狀態
-                self.game_engine.reset_game_state()
-                self.game_engine.player_credit = 1000000
-                
-                try:
-                    # 購買並執行特色
-                    result = self.game_engine.spin(option)
-                    
-                    # 執行免費旋轉
-                    free_spin_total = 0
-                    while self.game_engine.free_spins_remaining > 0:
-                        fs_result = self.game_engine.spin_free_game()
-                        free_spin_total += fs_result.total_credit
-                    
-                    results.append(free_spin_total)
-                    
-                except Exception as e:
-                    print(f"特色購買分析錯誤 ({option_name}): {e}")
-                    continue
+            block = self._simulate_paid_block(config, block_size, decision_rng)
+            total_bet += int(block["bets"].sum())
+            total_win += int(block["wins"].sum())
+            win_sketch.add_array(block["wins"])
+            win_moments.add_array(block["wins"])
+            net_moments.add_array(block["wins"] - block["bets"])
+            feature_moments.add_array(block["feature_wins"])
+            ratio_estimator.add_block(block["bets"], block["wins"])
+            feature_triggers += block["feature_triggers"]
+            feature_buys += block["feature_buys"]
+            biggest_win = max(biggest_win, block["biggest_win"])
+            if control_estimator is not None:
+                control_estimator.add_block(block["bets"], block["wins"], self._block_controls(block, control_estimator))
+        
+        simulation_time = time.time() - start_time
+        stage_profile = self._finish_profiling(config, spin_profiler, simulation_time)
+        net_result = total_win - total_bet
+        rtp_percentage = (total_win / total_bet * 100) if total_bet > 0 else 0
+        feature_trigger_rate = (feature_triggers / config.total_spins) if config.total_spins > 0 else 0
+        average_win_per_spin = total_win / config.total_spins if config.total_spins > 0 else 0
+        
+        result = SimulationResult(
+            total_spins=config.total_spins,
+            total_bet=total_bet,
+            total_win=total_win,
+            net_result=net_result,
+            feature_triggers=feature_triggers,
+            feature_buys=feature_buys,
+            biggest_win=biggest_win,
+            rtp_percentage=rtp_percentage,
+            feature_trigger_rate=feature_trigger_rate,
+            average_win_per_spin=average_win_per_spin,
+            simulation_time=simulation_time,
+            win_sketch=win_sketch,
+            win_moments=win_moments,
+            net_moments=net_moments,
+            feature_moments=feature_moments,
+            ratio_estimator=ratio_estimator,
+            control_estimator=control_estimator,
+            stage_profile=stage_profile
+        )
+        
+        self.simulation_history.append(result)
+        
+        return result
+    
+    def _start_batch_simulation(self, config: SimulationConfig) -> RandomStream:
+        """初始化批量模擬的隨機數流與引擎狀態，返回購買決策用的隨機數流"""
+        decision_rng = self._init_rng_streams(config.seed)
+        self.game_engine.reset_game_state()
+        self.game_engine.player_credit = config.player_initial_credit
+        self.game_engine.current_bet = config.base_bet
+        return decision_rng
+    
+    def _simulate_paid_block(self, config: SimulationConfig, block_size: int,
+                             decision_rng: RandomStream) -> Dict[str, Any]:
+        """
+        模擬一個區塊的付費旋轉
+        返回每個付費旋轉單位的 bets / wins 陣列 (免費旋轉回合贏分計入觸發或購買的單位)、
+        各免費旋轉回合贏分 feature_wins，以及觸發次數、購買次數與單次最大贏分；
+        前 base_count 個單位為一般旋轉，base_wins / base_triggers 為其基礎遊戲贏分與觸發指示
+        """
+        feature_triggers = 0
+        feature_wins = []
+        biggest_win = 0
+        
+        # 購買決策 (向量化)
+        buy_count = 0
+        if config.feature_buy_enabled:
+            buy_count = int((decision_rng.uniform(block_size) < config.auto_buy_threshold).sum())
+        
+        base_count = block_size - buy_count
+        bets = np.full(block_size, config.base_bet, dtype=np.int64)
+        wins = np.zeros(block_size, dtype=np.int64)
+        base_wins = np.zeros(base_count, dtype=np.int64)
+        base_triggers = np.zeros(base_count, dtype=bool)
+        
+        if base_count > 0:
+            batch = self.game_engine.spin_batch(base_count)
+            wins[:base_count] = batch.total_credit
+            base_wins = batch.total_credit.copy()
+            base_triggers = batch.is_feature_trigger
+            biggest_win = int(batch.total_credit.max())
+            
+            # 觸發的免費旋轉回合
+            for index in np.flatnonzero(batch.is_feature_trigger).tolist():
+                feature_triggers += 1
+                self.game_engine.free_spins_remaining = self.game_engine.model.initial_free_spins
+                self.game_engine.drums_count = 0
+                round_win, round_max, retriggers = self._play_free_spins_round()
+                wins[index] += round_win
+                feature_wins.append(round_win)
+                biggest_win = max(biggest_win, round_max)
+                feature_triggers += retriggers
+        
+        # 購買的免費旋轉回合 (分析用途，不檢查玩家積分)
+        for index in range(base_count, block_size):
+            spin_type = decision_rng.choice(self.BUY_OPTIONS)
+            cost = self._bet_amount(config, spin_type)
+            bets[index] = cost
             
-            if results:
+            self.game_engine.player_credit -= cost
+            self.game_engine.free_spins_remaining = self.game_engine.model.initial_free_spins
+            self.game_engine.drums_count = self.BUY_DRUMS[spin_type]
+            round_win, round_max, retriggers = self._play_free_spins_round()
+            wins[index] = round_win
+            feature_wins.append(round_win)
+            biggest_win = max(biggest_win, round_max)
+            feature_triggers += retriggers
+        
+        return {
+            "bets": bets,
+            "wins": wins,
+            "feature_wins": np.array(feature_wins, dtype=np.int64),
+            "base_count": base_count,
+            "base_wins": base_wins,
+            "base_triggers": base_triggers,
+            "feature_triggers": feature_triggers,
+            "feature_buys": buy_count,
+            "biggest_win": biggest_win
+        }
+    
+    def run_parallel_simulation(self, config: SimulationConfig, workers: int = 1, shard_size: int = 50000,
+                                batch: bool = False) -> SimulationResult:
+        """
+        多進程分片模擬
+        total_spins 依 shard_size 切分，每個分片使用主種子衍生的獨立子流，
+        相同種子與分片大小下結果與 workers 無關
+        """
+        from simulation.parallel import run_sharded_simulation
+        
+        result = run_sharded_simulation(config, workers, shard_size, batch,
+                                        self.config_path, self.paytable_path)
+        if result.stage_profile is not None and self.print_stage_profile:
+            self._print_stage_profile(result.stage_profile, None)
+        self.simulation_history.append(result)
+        return result
+    
+    def _play_free_spins_round(self) -> Tuple[int, int, int]:
+        """
+        執行引擎中剩餘的免費旋轉直到回合結束
+        返回 (回合總贏分, 單次最大贏分, 再觸發次數)
+        """
+        round_win = 0
+        round_max = 0
+        retriggers = 0
+        
+        while self.game_engine.free_spins_remaining > 0:
+            fs_result = self.game_engine.spin_free_game()
+            round_win += fs_result.total_credit
+            round_max = max(round_max, fs_result.total_credit)
+            retriggers += int(fs_result.is_feature_trigger)
+        
+        return round_win, round_max, retriggers
+    
+    def run_feature_buy_analysis(self, spins_per_option: int = 1000, seed: SeedLike = None,
+                                 base_bet: int = 50) -> Dict[str, Any]:
+        """
+        運行特色購買分析
+        以 FeatureRoundEvaluator 批量評估各購買選項的完整免費旋轉回合 (含第一次免費旋轉)，
+        不重置引擎也不經過逐次 SpinResult
+        """
+        self._init_rng_streams(seed)
+        evaluator = FeatureRoundEvaluator.from_engine(self.game_engine)
+        analysis_results = {}
+        
+        for option in self.BUY_OPTIONS:
+            rounds = evaluator.play_rounds(spins_per_option, drums=self.BUY_DRUMS[option])
+            results = rounds.total_win
+            
+            if len(results) > 0:
                 # 計算統計
-                cost_multipliers = {
-                    SpinType.FEATURE_BUY_60X: 60,
-                    SpinType.FEATURE_BUY_80X: 80,
-                    SpinType.FEATURE_BUY_100X: 100
-                }
-                
-                cost = 50 * cost_multipliers[option]  # 假設基礎押注為50
-                avg_win = statistics.mean(results)
+                cost = base_bet * self.BUY_COST_MULTIPLIERS[option]
+                avg_win = float(results.mean())
                 
-                analysis_results[option_name] = {
+                analysis_results[option.name] = {
                     "cost": cost,
                     "average_win": avg_win,
-                    "max_win": max(results),
-                    "min_win": min(results),
-                    "median_win": statistics.median(results),
-                    "win_rate": sum(1 for r in results if r > cost) / len(results),
+                    "max_win": int(results.max()),
+                    "min_win": int(results.min()),
+                    "median_win": float(np.median(results)),
+                    "win_rate": float((results > cost).mean()),
                     "rtp": (avg_win / cost) * 100,
                     "profit_margin": avg_win - cost,
+                    "average_spins": float(rounds.spins.mean()),
                     "samples": len(results)
                 }
         
         return analysis_results
     
+    def run_importance_sampling_analysis(self, spins: int = 200000, rounds_per_option: int = 20000,
+                                         boost: float = 2.0, seed: SeedLike = None,
+                                         base_bet: int = 50) -> Dict[str, Any]:
+        """
+        重要性抽樣尾部分析
+        基礎遊戲與各購買選項的免費旋轉回合以偏向高賠付視窗的提議分布抽樣並以似然比加權，
+        回報不偏的尾部事件機率與前 0.1% 結果佔 RTP 的比例
+        """
+        from simulation.importance import ImportanceSampler
+        
+        self._init_rng_streams(seed)
+        sampler = ImportanceSampler(self.game_engine, boost=boost)
+        
+        analysis = {"base_game": sampler.run_base_game(spins, bet=base_bet).to_dict()}
+        for option in self.BUY_OPTIONS:
+            result = sampler.run_feature_rounds(
+                rounds_per_option, self.BUY_DRUMS[option],
+                cost=base_bet * self.BUY_COST_MULTIPLIERS[option], bet=base_bet
+            )
+            analysis[option.name] = result.to_dict()
+        
+        return analysis
+    
+    def run_comparison(self, variants: List[Any], spins: int = 100000, seed: SeedLike = None,
+                       block_size: int = 50000, confidence: float = 0.95, base_bet: int = 50):
+        """
+        以共同隨機數比較多個變體 (ComparisonVariant)，第一個為基準
+        返回 ComparisonResult：各變體 RTP 與波動性，以及相對基準的配對差與信賴區間
+        """
+        from simulation.comparison import CommonRandomNumbersRunner
+        
+        runner = CommonRandomNumbersRunner(variants, base_bet)
+        return runner.run(spins, seed, block_size, confidence)
+    
     def run_volatility_analysis(self, num_sessions: int = 100, spins_per_session: int = 1000) -> Dict[str, Any]:
-        """運行波動性分析"""
-        session_results = []
+        """
+        運行波動性分析
+        場次淨結果以線上動差與分位數草圖累計，不保留逐場次列表；
+        每次旋轉贏分動差由各場次結果合併
+        """
+        session_moments = StreamingMoments()
+        session_sketch = QuantileSketch()
+        spin_moments = StreamingMoments()
+        positive_sessions = 0
+        break_even_sessions = 0
+        negative_sessions = 0
+        base_bet = 50
         
         for session in range(num_sessions):
             config = SimulationConfig(
                 total_spins=spins_per_session,
-                base_bet=50,
+                base_bet=base_bet,
                 player_initial_credit=1000000,
                 feature_buy_enabled=False,  # 純正常旋轉
                 seed=None
             )
             
             result = self.run_basic_simulation(config)
-            session_results.append(result.net_result)
+            session_moments.add(result.net_result)
+            session_sketch.add(result.net_result)
+            spin_moments.merge(result.win_moments)
+            
+            if result.net_result > 0:
+                positive_sessions += 1
+            elif result.net_result == 0:
+                break_even_sessions += 1
+            else:
+                negative_sessions += 1
         
         # 計算波動性指標
-        mean_result = statistics.mean(session_results)
-        std_dev = statistics.stdev(session_results) if len(session_results) > 1 else 0
-        
-        # 分析分布
-        positive_sessions = sum(1 for r in session_results if r > 0)
-        break_even_sessions = sum(1 for r in session_results if r == 0)
-        negative_sessions = sum(1 for r in session_results if r < 0)
-        
-        # 風險指標
-        max_loss = min(session_results)
-        max_win = max(session_results)
+        mean_result = session_moments.mean
+        std_dev = session_moments.std_dev
         
         return {
             "total_sessions": num_sessions,
             "spins_per_session": spins_per_session,
             "mean_result": mean_result,
             "standard_deviation": std_dev,
+            "skewness": session_moments.skewness,
+            "kurtosis": session_moments.kurtosis,
             "volatility_index": std_dev / abs(mean_result) if mean_result != 0 else float('inf'),
+            "spin_win_std_dev": spin_moments.std_dev,
+            "spin_win_to_bet_std_dev": spin_moments.std_dev / base_bet,
             "positive_sessions": positive_sessions,
             "break_even_sessions": break_even_sessions,
             "negative_sessions": negative_sessions,
             "win_rate": positive_sessions / num_sessions,
-            "max_loss": max_loss,
-            "max_win": max_win,
+            # 風險指標
+            "max_loss": session_sketch.min_value,
+            "max_win": session_sketch.max_value,
             "percentiles": {
-                "25th": self._percentile(session_results, 25),
-                "50th": self._percentile(session_results, 50),
-                "75th": self._percentile(session_results, 75),
-                "90th": self._percentile(session_results, 90),
-                "95th": self._percentile(session_results, 95)
+                f"{p}th": value for p, value in session_sketch.percentiles([25, 50, 75, 90, 95]).items()
             }
         }
     
     def _percentile(self, data: List[float], percentile: int) -> float:
         """計算百分位數"""
-        sorted_data = sorted(data)
-        index = int(len(sorted_data) * percentile / 100)
-        return sorted_data[min(index, len(sorted_data) - 1)]
+        return percentiles_from_sorted(sorted(data), [percentile])[percentile]
     
     def run_rtp_verification(self, target_rtp: float = 96.0, tolerance: float = 1.0, 
-                           max_spins: int = 1000000) -> Dict[str, Any]:
-        """運行 RTP 驗證"""
+                           max_spins: int = 1000000, workers: int = 1, sequential: bool = False,
+                           time_budget: Optional[float] = None, confidence: float = 0.95,
+                           seed: Optional[int] = None, control_variate: bool = False) -> Dict[str, Any]:
+        """
+        運行 RTP 驗證 (workers > 1 時以多進程分片模擬)
+        sequential=True 時改用 run_sequential_rtp_verification：
+        信賴區間半寬小於 tolerance 或超過 time_budget 秒即提前停止；
+        control_variate=True 時以精確基礎遊戲期望值作為控制變量估計 RTP
+        """
+        if sequential:
+            return self.run_sequential_rtp_verification(
+                target_rtp, tolerance, max_spins, confidence=confidence,
+                time_budget=time_budget, seed=seed, control_variate=control_variate
+            )
+        
         config = SimulationConfig(
             total_spins=max_spins,
             base_bet=50,
             player_initial_credit=10000000,  # 增加初始積分
             feature_buy_enabled=True,
-            auto_buy_threshold=0.05  # 降低購買頻率
+            auto_buy_threshold=0.05,  # 降低購買頻率
+            control_variate=control_variate
         )
         
-        result = self.run_basic_simulation(config)
+        if workers > 1:
+            result = self.run_parallel_simulation(config, workers)
+        else:
+            result = self.run_basic_simulation(config)
         
-        rtp_difference = abs(result.rtp_percentage - target_rtp)
+        rtp_percentage = result.rtp_percentage
+        confidence_interval = self._calculate_rtp_confidence_interval(result, confidence)
+        if result.control_estimator is not None:
+            rtp_percentage = result.control_estimator.ratio * 100
+            lower, upper = result.control_estimator.confidence_interval(confidence)
+            confidence_interval = {
+                "lower": lower * 100,
+                "upper": upper * 100,
+                "margin_of_error": result.control_estimator.half_width(confidence) * 100
+            }
+        
+        rtp_difference = abs(rtp_percentage - target_rtp)
         within_tolerance = rtp_difference <= tolerance
         
-        return {
+        report = {
             "target_rtp": target_rtp,
-            "actual_rtp": result.rtp_percentage,
+            "actual_rtp": rtp_percentage,
             "difference": rtp_difference,
             "within_tolerance": within_tolerance,
             "tolerance": tolerance,
             "total_spins": result.total_spins,
             "total_bet": result.total_bet,
             "total_win": result.total_win,
-            "confidence_interval": self._calculate_rtp_confidence_interval(result),
-            "recommendation": self._get_rtp_recommendation(result.rtp_percentage, target_rtp, tolerance)
+            "confidence_interval": confidence_interval,
+            "recommendation": self._get_rtp_recommendation(rtp_percentage, target_rtp, tolerance)
         }
+        if result.control_estimator is not None:
+            report["plain_rtp"] = result.rtp_percentage
+            report["control_variate"] = result.control_estimator.summary(confidence)
+        return report
     
-    def _calculate_rtp_confidence_interval(self, result: SimulationResult, confidence: float = 0.95) -> Dict[str, float]:
-        """計算 RTP 信賴區間"""
-        # 簡化的信賴區間計算
-        import math
+    def run_sequential_rtp_verification(self, target_rtp: float = 96.0, tolerance: float = 1.0,
+                                        max_spins: int = 1000000, block_size: int = 50000,
+                                        confidence: float = 0.95, time_budget: Optional[float] = None,
+                                        min_spins: int = 100000, seed: Optional[int] = None,
+                                        auto_buy_threshold: float = 0.05,
+                                        control_variate: bool = False) -> Dict[str, Any]:
+        """
+        序貫 RTP 驗證
+        以批量模擬逐區塊累計每次付費旋轉的 (押注, 贏分)，以比率估計量的變異數計算信賴區間，
+        至少 min_spins 次後，半寬 (百分比) 不超過 tolerance、達到 max_spins 或超過 time_budget 秒即停止；
+        control_variate 為 True 時以精確基礎遊戲期望值作為控制變量，RTP 與半寬改用控制變量估計
+        """
+        config = SimulationConfig(
+            total_spins=max_spins,
+            base_bet=50,
+            player_initial_credit=10000000,
+            feature_buy_enabled=True,
+            auto_buy_threshold=auto_buy_threshold,
+            seed=seed
+        )
+        control_estimator = self._new_control_estimator() if control_variate else None
+        decision_rng = self._start_batch_simulation(config)
+        estimator = RatioEstimator()
         
-        if result.total_spins == 0:
-            return {"lower": 0, "upper": 0}
+        start_time = time.time()
+        feature_triggers = 0
+        feature_buys = 0
+        biggest_win = 0
+        stop_reason = "max_spins"
         
-        # 假設正態分布
-        z_score = 1.96 if confidence == 0.95 else 2.58  # 95% 或 99% 信賴區間
+        while estimator.count < max_spins:
+            block = self._simulate_paid_block(config, min(block_size, max_spins - estimator.count), decision_rng)
+            estimator.add_block(block["bets"], block["wins"])
+            feature_triggers += block["feature_triggers"]
+            feature_buys += block["feature_buys"]
+            biggest_win = max(biggest_win, block["biggest_win"])
+            if control_estimator is not None:
+                control_estimator.add_block(block["bets"], block["wins"], self._block_controls(block, control_estimator))
+            precision_estimator = control_estimator if control_estimator is not None else estimator
+            
+            if estimator.count >= min_spins and precision_estimator.half_width(confidence) * 100 <= tolerance:
+                stop_reason = "converged"
+                break
+            if time_budget is not None and time.time() - start_time >= time_budget:
+                stop_reason = "time_budget"
+                break
         
-        # 估計標準誤差
-        p = result.rtp_percentage / 100
-        se = math.sqrt(p * (1 - p) / result.total_spins) * 100
+        simulation_time = time.time() - start_time
+        total_spins = estimator.count
+        plain_rtp = estimator.ratio * 100
+        precision_estimator = control_estimator if control_estimator is not None else estimator
+        rtp_percentage = precision_estimator.ratio * 100
+        half_width = precision_estimator.half_width(confidence) * 100
+        
+        result = SimulationResult(
+            total_spins=total_spins,
+            total_bet=estimator.sum_bet,
+            total_win=estimator.sum_win,
+            net_result=estimator.sum_win - estimator.sum_bet,
+            feature_triggers=feature_triggers,
+            feature_buys=feature_buys,
+            biggest_win=biggest_win,
+            rtp_percentage=plain_rtp,
+            feature_trigger_rate=feature_triggers / total_spins if total_spins > 0 else 0,
+            average_win_per_spin=estimator.sum_win / total_spins if total_spins > 0 else 0,
+            simulation_time=simulation_time,
+            ratio_estimator=estimator,
+            control_estimator=control_estimator
+        )
+        self.simulation_history.append(result)
         
-        margin_of_error = z_score * se
+        rtp_difference = abs(rtp_percentage - target_rtp)
+        
+        report = {
+            "target_rtp": target_rtp,
+            "actual_rtp": rtp_percentage,
+            "difference": rtp_difference,
+            "within_tolerance": rtp_difference <= tolerance,
+            "tolerance": tolerance,
+            "total_spins": total_spins,
+            "total_bet": estimator.sum_bet,
+            "total_win": estimator.sum_win,
+            "confidence_interval": {
+                "lower": rtp_percentage - half_width,
+                "upper": rtp_percentage + half_width,
+                "margin_of_error": half_width
+            },
+            "recommendation": self._get_rtp_recommendation(rtp_percentage, target_rtp, tolerance),
+            "spins_used": total_spins,
+            "achieved_precision": half_width,
+            "standard_error": precision_estimator.standard_error * 100,
+            "stop_reason": stop_reason,
+            "simulation_time": simulation_time
+        }
+        if control_estimator is not None:
+            report["plain_rtp"] = plain_rtp
+            report["control_variate"] = control_estimator.summary(confidence)
+        return report
+    
+    def _block_controls(self, block: Dict[str, Any], control_estimator: ControlVariateEstimator) -> np.ndarray:
+        """區塊的控制變量矩陣：一般旋轉為 (基礎遊戲贏分, 觸發指示)，購買單位為期望值"""
+        controls = np.tile(control_estimator.control_means, (len(block["bets"]), 1))
+        base_count = block["base_count"]
+        controls[:base_count, 0] = block["base_wins"]
+        controls[:base_count, 1] = block["base_triggers"]
+        return controls
+    
+    def run_exact_base_game_analysis(self, bet: Optional[int] = None) -> ExactBaseGameResult:
+        """
+        以完整停止位置列舉計算基礎遊戲的精確 RTP、命中率、觸發機率與贏分分布
+        不需要隨機模擬，滾輪條帶或賠付表變更後可直接重新計算
+        """
+        calculator = ExactBaseGameCalculator.from_engine(self.game_engine)
+        return calculator.calculate(bet if bet is not None else self.game_engine.config.get("base_bet", 50))
+    
+    def _calculate_rtp_confidence_interval(self, result: SimulationResult, confidence: float = 0.95) -> Dict[str, float]:
+        """
+        計算 RTP 信賴區間 (百分比)
+        以比率估計量 (總贏分 / 總押注) 的 delta method 變異數計算，
+        包含押注變異 (特色購買為 60-100 倍押注) 與贏分押注共變異；RTP 可超過 100%，上限不截斷
+        """
+        if result.total_spins == 0:
+            return {"lower": 0, "upper": 0}
+        
+        estimator = result.ratio_estimator
+        rtp_percentage = estimator.ratio * 100
+        margin_of_error = estimator.half_width(confidence) * 100
         
         return {
-            "lower": max(0, result.rtp_percentage - margin_of_error),
-            "upper": min(100, result.rtp_percentage + margin_of_error),
+            "lower": max(0, rtp_percentage - margin_of_error),
+            "upper": rtp_percentage + margin_of_error,
             "margin_of_error": margin_of_error
         }
     
@@ -339,7 +968,7 @@ class GameSimulator:
         """導出模擬數據"""
         try:
             data = {
-                "simulation_history": [asdict(result) for result in self.simulation_history],
+                "simulation_history": [result.to_dict() for result in self.simulation_history],
                 "detailed_logs": self.detailed_logs,
                 "export_timestamp": time.time()
             }
@@ -380,6 +1009,55 @@ class GameSimulator:
             "total_simulation_time": sum(r.simulation_time for r in results)
         }
     
+    def _detailed_spin_record(self, spin_num: int, result: SpinResult, spin_type: SpinType,
+                              bet_amount: int) -> Dict[str, Any]:
+        """單次旋轉的詳細結果 (JSON 輸出器的輸入格式，符合 proto 結構)"""
+        detailed_result = {
+            "spin_number": spin_num + 1,
+            "reels": result.reel_result if hasattr(result, 'reel_result') else getattr(result, 'reels', []),
+            "total_win": result.total_credit,
+            "wins": [],
+            "free_spins_awarded": result.free_spins_awarded if result.is_feature_trigger else 0,
+            "scatter_count": getattr(result, 'scatter_count', 0),
+            "scatter_pay": getattr(result, 'scatter_pay', result.scatter_win if hasattr(result, 'scatter_win') else 0),
+            "war_drums_result": {},
+            "is_feature_buy": spin_type != SpinType.NORMAL,
+            "remaining_credit": self.game_engine.player_credit,
+            "bet_amount": bet_amount,
+            "spin_type": spin_type.name if hasattr(spin_type, 'name') else str(spin_type)
+        }
+        
+        # 添加贏線信息
+        if hasattr(result, 'win_lines') and result.win_lines:
+            for win_line in result.win_lines:
+                win_info = {
+                    "symbol": win_line.symbol_id,
+                    "pay": win_line.credit,
+                    "positions": win_line.positions,
+                    "multiplier": win_line.multiplier,
+                    "way_id": win_line.line_no
+                }
+                detailed_result["wins"].append(win_info)
+        elif hasattr(result, 'win_details') and result.win_details:
+            for win in result.win_details:
+                win_info = {
+                    "symbol": win.get('symbol', 0),
+                    "pay": win.get('pay', 0),
+                    "positions": win.get('positions', []),
+                    "multiplier": win.get('multiplier', 1),
+                    "way_id": win.get('way_id', -1)
+                }
+                detailed_result["wins"].append(win_info)
+        
+        # 添加戰鼓結果
+        if hasattr(result, 'war_drums_multiplier') and result.war_drums_multiplier > 1:
+            detailed_result["war_drums_result"] = {
+                "total_multiplier": result.war_drums_multiplier,
+                "drums": getattr(result, 'war_drums_details', [])
+            }
+        
+        return detailed_result
+    
     def run_simulation_with_json_export(self, config: SimulationConfig = None, 
                                       export_json: bool = True,
                                       output_dir: str = "json_output") -> Tuple[SimulationResult, Optional[Dict[str, str]]]:
@@ -403,183 +1081,156 @@ class GameSimulator:
         
         # 重設遊戲引擎
         self.game_engine = GameEngine()
+        decision_rng = self._init_rng_streams(config.seed)
+        spin_profiler = self._start_profiling(config)
         
         start_time = time.time()
-        detailed_results = []  # 存儲詳細的每次旋轉結果
-        bet_amounts = []       # 存儲每次下注金額
-        
-        total_bet = 0
-        total_win = 0
-        feature_triggers = 0
-        feature_buys = 0
-        biggest_win = 0
-        
-        # 執行模擬
-        for spin_num in range(config.total_spins):
-            # 決定是否購買特色
-            should_buy_feature = (
-                config.feature_buy_enabled and 
-                random.random() < config.auto_buy_threshold and
-                self.game_engine.free_spins_remaining == 0
-            )
+        # 存儲詳細的每次旋轉結果 (接近記憶體上限時溢出至輸出目錄下的暫存檔，離開區塊時刪除，包含中斷或例外)
+        with SpillBuffer(self._memory_budget(config), spill_dir=output_dir) as detailed_results:
+            bet_amounts = array('q')  # 存儲每次下注金額
             
-            if should_buy_feature:
-                buy_options = [SpinType.FEATURE_BUY_60X, SpinType.FEATURE_BUY_80X, SpinType.FEATURE_BUY_100X]
-                spin_type = random.choice(buy_options)
-                feature_buys += 1
-            else:
-                spin_type = SpinType.NORMAL
+            total_bet = 0
+            total_win = 0
+            feature_triggers = 0
+            feature_buys = 0
+            biggest_win = 0
+            accumulator = _SpinAccumulator()
             
-            # 執行旋轉
-            try:
-                if self.game_engine.free_spins_remaining > 0:
-                    result = self.game_engine.spin_free_game()
-                else:
-                    result = self.game_engine.spin(spin_type)
-                
-                # 計算下注金額
-                bet_amount = config.base_bet
-                if spin_type != SpinType.NORMAL:
-                    multipliers = {
-                        SpinType.FEATURE_BUY_60X: 60,
-                        SpinType.FEATURE_BUY_80X: 80,
-                        SpinType.FEATURE_BUY_100X: 100
-                    }
-                    bet_amount *= multipliers[spin_type]
-                
-                total_bet += bet_amount
-                total_win += result.total_credit
-                bet_amounts.append(bet_amount)
-                
-                if result.total_credit > biggest_win:
-                    biggest_win = result.total_credit
-                
-                if result.is_feature_trigger:
-                    feature_triggers += 1
-                
-                # 構建詳細結果（符合 proto 結構）
-                detailed_result = {
-                    "spin_number": spin_num + 1,
-                    "reels": result.reel_result if hasattr(result, 'reel_result') else getattr(result, 'reels', []),
-                    "total_win": result.total_credit,
-                    "wins": [],
-                    "free_spins_awarded": result.free_spins_awarded if result.is_feature_trigger else 0,
-                    "scatter_count": getattr(result, 'scatter_count', 0),
-                    "scatter_pay": getattr(result, 'scatter_pay', result.scatter_win if hasattr(result, 'scatter_win') else 0),
-                    "war_drums_result": {},
-                    "is_feature_buy": spin_type != SpinType.NORMAL,
-                    "remaining_credit": self.game_engine.player_credit,
-                    "bet_amount": bet_amount,
-                    "spin_type": spin_type.name if hasattr(spin_type, 'name') else str(spin_type)
-                }
-                
-                # 添加贏線信息
-                if hasattr(result, 'win_lines') and result.win_lines:
-                    for win_line in result.win_lines:
-                        win_info = {
-                            "symbol": win_line.symbol_id,
-                            "pay": win_line.credit,
-                            "positions": win_line.positions,
-                            "multiplier": win_line.multiplier,
-                            "way_id": win_line.line_no
-                        }
-                        detailed_result["wins"].append(win_info)
-                elif hasattr(result, 'win_details') and result.win_details:
-                    for win in result.win_details:
-                        win_info = {
-                            "symbol": win.get('symbol', 0),
-                            "pay": win.get('pay', 0),
-                            "positions": win.get('positions', []),
-                            "multiplier": win.get('multiplier', 1),
-                            "way_id": win.get('way_id', -1)
-                        }
-                        detailed_result["wins"].append(win_info)
-                
-                # 添加戰鼓結果
-                if hasattr(result, 'war_drums_multiplier') and result.war_drums_multiplier > 1:
-                    detailed_result["war_drums_result"] = {
-                        "total_multiplier": result.war_drums_multiplier,
-                        "drums": getattr(result, 'war_drums_details', [])
-                    }
+            # 執行模擬
+            for spin_num in range(config.total_spins):
+                if spin_profiler is not None:
+                    spin_profiler.update(spin_num)
+                # 決定是否購買特色
+                should_buy_feature = (
+                    config.feature_buy_enabled and 
+                    decision_rng.random() < config.auto_buy_threshold and
+                    self.game_engine.free_spins_remaining == 0
+                )
                 
-                detailed_results.append(detailed_result)
+                if should_buy_feature:
+                    spin_type = decision_rng.choice(self.BUY_OPTIONS)
+                    feature_buys += 1
+                else:
+                    spin_type = SpinType.NORMAL
                 
-                # 進度報告
-                if (spin_num + 1) % 1000 == 0:
-                    progress = (spin_num + 1) / config.total_spins * 100
-                    print(f"📊 進度: {progress:.1f}% ({spin_num + 1:,}/{config.total_spins:,})")
+                # 執行旋轉
+                try:
+                    is_free_game = self.game_engine.free_spins_remaining > 0
+                    if is_free_game:
+                        result = self.game_engine.spin_free_game()
+                    else:
+                        result = self.game_engine.spin(spin_type)
                     
-            except Exception as e:
-                print(f"旋轉 {spin_num + 1} 發生錯誤: {e}")
-                bet_amounts.append(config.base_bet)  # 添加預設下注額
-                continue
-        
-        # 計算最終統計
-        simulation_time = time.time() - start_time
-        net_result = total_win - total_bet
-        rtp_percentage = (total_win / total_bet * 100) if total_bet > 0 else 0
-        feature_trigger_rate = (feature_triggers / config.total_spins) if config.total_spins > 0 else 0
-        average_win_per_spin = total_win / config.total_spins if config.total_spins > 0 else 0
-        
-        simulation_result = SimulationResult(
-            total_spins=config.total_spins,
-            total_bet=total_bet,
-            total_win=total_win,
-            net_result=net_result,
-            feature_triggers=feature_triggers,
-            feature_buys=feature_buys,
-            biggest_win=biggest_win,
-            rtp_percentage=rtp_percentage,
-            feature_trigger_rate=feature_trigger_rate,
-            average_win_per_spin=average_win_per_spin,
-            simulation_time=simulation_time
-        )
-        
-        # 保存到歷史
-        self.simulation_history.append(simulation_result)
+                    # 計算下注金額
+                    bet_amount = self._bet_amount(config, spin_type)
+                    total_bet += bet_amount
+                    total_win += result.total_credit
+                    accumulator.add(bet_amount, result.total_credit, is_free_game, spin_type != SpinType.NORMAL,
+                                    self.game_engine.free_spins_remaining)
+                    bet_amounts.append(bet_amount)
+                    
+                    if result.total_credit > biggest_win:
+                        biggest_win = result.total_credit
+                    
+                    if result.is_feature_trigger:
+                        feature_triggers += 1
+                    
+                    # 構建詳細結果（符合 proto 結構，僅在輸出 JSON 時保留）
+                    if export_json:
+                        detailed_results.write(self._detailed_spin_record(spin_num, result, spin_type, bet_amount))
+                    
+                    # 進度報告
+                    if (spin_num + 1) % 1000 == 0:
+                        progress = (spin_num + 1) / config.total_spins * 100
+                        print(f"📊 進度: {progress:.1f}% ({spin_num + 1:,}/{config.total_spins:,})")
+                        
+                except Exception as e:
+                    print(f"旋轉 {spin_num + 1} 發生錯誤: {e}")
+                    bet_amounts.append(config.base_bet)  # 添加預設下注額
+                    continue
+            
+            # 計算最終統計
+            simulation_time = time.time() - start_time
+            net_result = total_win - total_bet
+            rtp_percentage = (total_win / total_bet * 100) if total_bet > 0 else 0
+            feature_trigger_rate = (feature_triggers / config.total_spins) if config.total_spins > 0 else 0
+            average_win_per_spin = total_win / config.total_spins if config.total_spins > 0 else 0
+            
+            simulation_result = SimulationResult(
+                total_spins=config.total_spins,
+                total_bet=total_bet,
+                total_win=total_win,
+                net_result=net_result,
+                feature_triggers=feature_triggers,
+                feature_buys=feature_buys,
+                biggest_win=biggest_win,
+                rtp_percentage=rtp_percentage,
+                feature_trigger_rate=feature_trigger_rate,
+                average_win_per_spin=average_win_per_spin,
+                simulation_time=simulation_time,
+                **accumulator.result_fields()
+            )
+            
+            # 保存到歷史
+            self.simulation_history.append(simulation_result)
+            simulation_result.record_buffer = {
+                "records": len(detailed_results),
+                "spilled": detailed_results.spilled,
+                "memory_bytes": detailed_results.memory_bytes,
+                "spill_bytes": detailed_results.spill_bytes
+            }
+            if detailed_results.spilled:
+                print(f"💾 已達記憶體上限 {config.max_memory_mb} MB 的 {self.MEMORY_SPILL_FRACTION:.0%}，"
+                      f"詳細結果已溢出至磁碟 ({detailed_results.spill_bytes / MB:.1f} MB)")
+            
+            # 輸出 JSON 檔案 (各輸出器逐筆串流寫入)
+            json_files = None
+            if export_json and detailed_results:
+                try:
+                    # 1. 簡化數據格式輸出（主要格式）✨
+                    simple_data_path = os.path.join(output_dir, "game_results.json")
+                    simple_data_file = export_simulation_to_simple_data(
+                        results=detailed_results,
+                        output_path=simple_data_path,
+                        profiler=self.profiler
+                    )
+                    json_files = {"game_results": simple_data_file}
+                    print(f"✅ 遊戲結果已保存 (簡化格式):")
+                    print(f"   game_results: {simple_data_file}")
+                    
+                    # 2. 原有格式輸出（備用）
+                    original_files = export_simulation_results_to_json(
+                        results=detailed_results,
+                        bet_amounts=bet_amounts,
+                        output_dir=output_dir,
+                        include_summary=True,
+                        profiler=self.profiler
+                    )
+                    json_files.update(original_files)
+                    print(f"✅ 原格式檔案已保存:")
+                    for file_type, file_path in original_files.items():
+                        print(f"   {file_type}: {file_path}")
+                    
+                    # 3. 事件日誌格式輸出（可選）
+                    event_log_path = os.path.join(output_dir, "event_log_results.json")
+                    event_log_file = export_simulation_to_event_log(
+                        results=detailed_results,
+                        output_path=event_log_path,
+                        game_id="PSS-ON-00152",
+                        add_connection_events=True,
+                        reconnect_interval=50,  # 每50個spin模擬一次斷線重連
+                        profiler=self.profiler
+                    )
+                    json_files["event_log"] = event_log_file
+                    print(f"✅ 事件日誌格式已保存:")
+                    print(f"   event_log: {event_log_file}")
+                    
+                except Exception as e:
+                    print(f"❌ JSON 輸出失敗: {e}")
+                    import traceback
+                    traceback.print_exc()
         
-        # 輸出 JSON 檔案
-        json_files = None
-        if export_json and detailed_results:
-            try:
-                # 1. 簡化數據格式輸出（主要格式）✨
-                simple_data_path = os.path.join(output_dir, "game_results.json")
-                simple_data_file = export_simulation_to_simple_data(
-                    results=detailed_results,
-                    output_path=simple_data_path
-                )
-                json_files = {"game_results": simple_data_file}
-                print(f"✅ 遊戲結果已保存 (簡化格式):")
-                print(f"   game_results: {simple_data_file}")
-                
-                # 2. 原有格式輸出（備用）
-                original_files = export_simulation_results_to_json(
-                    results=detailed_results,
-                    bet_amounts=bet_amounts,
-                    output_dir=output_dir,
-                    include_summary=True
-                )
-                json_files.update(original_files)
-                print(f"✅ 原格式檔案已保存:")
-                for file_type, file_path in original_files.items():
-                    print(f"   {file_type}: {file_path}")
-                
-                # 3. 事件日誌格式輸出（可選）
-                event_log_path = os.path.join(output_dir, "event_log_results.json")
-                event_log_file = export_simulation_to_event_log(
-                    results=detailed_results,
-                    output_path=event_log_path,
-                    game_id="PSS-ON-00152",
-                    add_connection_events=True,
-                    reconnect_interval=50  # 每50個spin模擬一次斷線重連
-                )
-                json_files["event_log"] = event_log_file
-                print(f"✅ 事件日誌格式已保存:")
-                print(f"   event_log: {event_log_file}")
-                
-            except Exception as e:
-                print(f"❌ JSON 輸出失敗: {e}")
-                import traceback
-                traceback.print_exc()
+        # 階段用時包含 JSON 輸出 (serialization)
+        simulation_result.stage_profile = self._finish_profiling(config, spin_profiler, time.time() - start_time)
         
         return simulation_result, json_files
\ No newline at end of file
@@ -0,0 +1,164 @@
+"""
+逐次旋轉紀錄輸出 - 模擬預設只保留固定大小的彙總，
+需要逐次紀錄時由呼叫端提供輸出目標 (有界緩衝、回呼、JSON Lines 檔案或超過記憶體上限時溢出的緩衝)
+"""
+
+import json
+import os
+import tempfile
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+from simulation.memory import MemoryBudget, deep_sizeof
+
+
+class SpinRecordSink:
+    """逐次旋轉紀錄輸出基底類別"""
+
+    def write(self, record: Dict[str, Any]):
+        """寫入一筆紀錄"""
+        raise NotImplementedError
+
+    def close(self):
+        """結束輸出"""
+
+    def __enter__(self) -> "SpinRecordSink":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class BufferSink(SpinRecordSink):
+    """有界緩衝：只保留最近 max_records 筆 (None 為不限)"""
+
+    def __init__(self, max_records: Optional[int] = 10000):
+        self.records: Deque[Dict[str, Any]] = deque(maxlen=max_records)
+        self.total_records = 0
+
+    def write(self, record: Dict[str, Any]):
+        self.records.append(record)
+        self.total_records += 1
+
+
+class CallbackSink(SpinRecordSink):
+    """將每筆紀錄交給回呼函數處理"""
+
+    def __init__(self, callback: Callable[[Dict[str, Any]], None]):
+        self.callback = callback
+
+    def write(self, record: Dict[str, Any]):
+        self.callback(record)
+
+
+class JsonLinesSink(SpinRecordSink):
+    """逐行寫入 JSON Lines 檔案 (第一次寫入時開啟檔案)"""
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self._file = None
+
+    def write(self, record: Dict[str, Any]):
+        if self._file is None:
+            directory = os.path.dirname(self.filename)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.filename, 'w', encoding='utf-8')
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class SpillBuffer(SpinRecordSink):
+    """
+    可重複讀取的完整紀錄緩衝
+    紀錄先保留於記憶體，每 check_interval 筆檢查一次記憶體預算，
+    進程 RSS 或紀錄估計大小達到溢出門檻時將全部紀錄移至 spill_dir 下的暫存 JSON Lines 檔案，
+    之後的紀錄直接寫入檔案 (溢出後讀回的紀錄為 JSON 型別，tuple 變為 list)。
+    budget 為 None 時不溢出；close() 刪除暫存檔案 (之後不可再讀取)
+    """
+
+    SIZE_SAMPLE_INTERVAL = 64  # 每隔多少筆取樣一次紀錄大小
+
+    def __init__(self, budget: Optional[MemoryBudget] = None, spill_dir: Optional[str] = None,
+                 check_interval: int = 1024):
+        self.budget = budget
+        self.spill_dir = spill_dir
+        self.check_interval = check_interval
+        self.records: List[Dict[str, Any]] = []
+        self.spill_path: Optional[str] = None
+        self._file = None
+        self._count = 0
+        self._sampled_bytes = 0
+        self._samples = 0
+
+    @property
+    def spilled(self) -> bool:
+        """是否已切換為溢出模式"""
+        return self.spill_path is not None
+
+    @property
+    def memory_bytes(self) -> int:
+        """記憶體中紀錄的估計大小 (取樣紀錄的平均深層大小 x 筆數)"""
+        if self._samples == 0:
+            return 0
+        return self._sampled_bytes * len(self.records) // self._samples
+
+    @property
+    def spill_bytes(self) -> int:
+        """已寫入暫存檔案的大小"""
+        if self._file is not None:
+            self._file.flush()
+        if not self.spilled or not os.path.exists(self.spill_path):
+            return 0
+        return os.path.getsize(self.spill_path)
+
+    def write(self, record: Dict[str, Any]):
+        if self._file is not None:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._count += 1
+            return
+
+        if self._count % self.SIZE_SAMPLE_INTERVAL == 0:
+            self._sampled_bytes += deep_sizeof(record)
+            self._samples += 1
+        self.records.append(record)
+        self._count += 1
+        if (self.budget is not None and self._count % self.check_interval == 0
+                and self.budget.exceeded(self.memory_bytes)):
+            self.spill()
+
+    def spill(self):
+        """將記憶體中的紀錄移至暫存檔案，之後的紀錄直接寫入檔案"""
+        if self.spilled:
+            return
+        if self.spill_dir:
+            os.makedirs(self.spill_dir, exist_ok=True)
+        descriptor, self.spill_path = tempfile.mkstemp(prefix=".spin_records_", suffix=".jsonl",
+                                                       dir=self.spill_dir)
+        self._file = os.fdopen(descriptor, 'w', encoding='utf-8')
+        for record in self.records:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.records = []
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        if not self.spilled:
+            yield from self.records
+            return
+        self._file.flush()
+        with open(self.spill_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                yield json.loads(line)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.spill_path is not None and os.path.exists(self.spill_path):
+            os.remove(self.spill_path)
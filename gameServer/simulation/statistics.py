@@ -2,9 +2,147 @@
 統計分析器 - 分析遊戲模擬數據並生成統計報告
 """
 
+import math
 import statistics
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
+from typing import Dict, List, Any, Iterable, Optional, Sequence
+from dataclasses import dataclass, field
+
+import numpy as np
+
+
+def percentiles_from_sorted(sorted_data: Sequence[float], percentiles: Iterable[float]) -> Dict[Any, float]:
+    """由已排序數據計算多個百分位數 (與 _percentile 相同的索引規則)"""
+    size = len(sorted_data)
+    return {p: sorted_data[min(int(size * p / 100), size - 1)] for p in percentiles}
+
+
+@dataclass
+class QuantileSketch:
+    """
+    可合併的串流分位數草圖 (HDR 式對數直方圖)
+    絕對值小於 exact_limit 的整數各自一格 (精確)，其餘以相對誤差 relative_accuracy 的對數分格；
+    每次加入 O(1)，查詢任意數量的分位數只需掃描一次分格
+    """
+    relative_accuracy: float = 0.01
+    exact_limit: int = 1024
+    count: int = 0
+    total: float = 0
+    min_value: Optional[float] = None
+    max_value: Optional[float] = None
+    positive_bins: Dict[int, int] = field(default_factory=dict)
+    negative_bins: Dict[int, int] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if not 0 < self.relative_accuracy < 1:
+            raise ValueError("relative_accuracy 必須介於 0 與 1 之間")
+        self._gamma = (1 + self.relative_accuracy) / (1 - self.relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+
+    def _key(self, magnitude: float) -> int:
+        """絕對值對應的分格索引 (單調遞增)"""
+        if magnitude < self.exact_limit:
+            return int(magnitude)
+        return self.exact_limit + math.ceil(math.log(magnitude / self.exact_limit) / self._log_gamma - 1e-12)
+
+    def _bin_value(self, key: int) -> float:
+        """分格代表值 (對數分格取相對誤差最小的中點)"""
+        if key <= self.exact_limit:
+            return float(key)
+        upper = self.exact_limit * self._gamma ** (key - self.exact_limit)
+        return 2 * upper / (1 + self._gamma)
+
+    def add(self, value: float, count: int = 1):
+        """加入一個值 (可指定重複次數)"""
+        self.count += count
+        self.total += value * count
+        if self.min_value is None or value < self.min_value:
+            self.min_value = value
+        if self.max_value is None or value > self.max_value:
+            self.max_value = value
+
+        bins = self.positive_bins if value >= 0 else self.negative_bins
+        key = self._key(abs(value))
+        bins[key] = bins.get(key, 0) + count
+
+    def add_array(self, values: Sequence[float]):
+        """批量加入 (numpy 向量化分格)"""
+        values = np.asarray(values)
+        if values.size == 0:
+            return
+        self.count += int(values.size)
+        self.total += values.sum().item()
+        low, high = values.min().item(), values.max().item()
+        self.min_value = low if self.min_value is None else min(self.min_value, low)
+        self.max_value = high if self.max_value is None else max(self.max_value, high)
+
+        for bins, magnitudes in ((self.positive_bins, values[values >= 0]),
+                                 (self.negative_bins, -values[values < 0])):
+            if magnitudes.size == 0:
+                continue
+            magnitudes = magnitudes.astype(np.float64)
+            keys = np.floor(magnitudes).astype(np.int64)
+            large = magnitudes >= self.exact_limit
+            if large.any():
+                keys[large] = self.exact_limit + np.ceil(
+                    np.log(magnitudes[large] / self.exact_limit) / self._log_gamma - 1e-12
+                ).astype(np.int64)
+            unique_keys, counts = np.unique(keys, return_counts=True)
+            for key, count in zip(unique_keys.tolist(), counts.tolist()):
+                bins[key] = bins.get(key, 0) + count
+
+    def merge(self, other: "QuantileSketch"):
+        """合併另一個參數相同的草圖"""
+        if (other.relative_accuracy, other.exact_limit) != (self.relative_accuracy, self.exact_limit):
+            raise ValueError("只能合併參數相同的分位數草圖")
+        if other.count == 0:
+            return
+        self.count += other.count
+        self.total += other.total
+        self.min_value = other.min_value if self.min_value is None else min(self.min_value, other.min_value)
+        self.max_value = other.max_value if self.max_value is None else max(self.max_value, other.max_value)
+        for bins, other_bins in ((self.positive_bins, other.positive_bins),
+                                 (self.negative_bins, other.negative_bins)):
+            for key, count in other_bins.items():
+                bins[key] = bins.get(key, 0) + count
+
+    @property
+    def mean(self) -> float:
+        """平均值"""
+        return self.total / self.count if self.count > 0 else 0.0
+
+    def sorted_bins(self) -> List[tuple]:
+        """由小到大的 (代表值, 數量)"""
+        negative = [(-self._bin_value(key), self.negative_bins[key])
+                    for key in sorted(self.negative_bins, reverse=True)]
+        positive = [(self._bin_value(key), self.positive_bins[key])
+                    for key in sorted(self.positive_bins)]
+        return negative + positive
+
+    def percentiles(self, percentiles: Iterable[float]) -> Dict[Any, float]:
+        """
+        一次計算多個百分位數 (排名規則與 _percentile 相同)
+        結果限制在實際最小值與最大值之間
+        """
+        percentiles = list(percentiles)
+        if self.count == 0:
+            return {p: 0.0 for p in percentiles}
+
+        ranks = sorted((min(int(self.count * p / 100), self.count - 1), p) for p in percentiles)
+        result = {}
+        cumulative = 0
+        rank_index = 0
+        for value, count in self.sorted_bins():
+            cumulative += count
+            while rank_index < len(ranks) and ranks[rank_index][0] < cumulative:
+                result[ranks[rank_index][1]] = min(max(value, self.min_value), self.max_value)
+                rank_index += 1
+            if rank_index == len(ranks):
+                break
+        return {p: result[p] for p in percentiles}
+
+    def quantile(self, q: float) -> float:
+        """單一分位數 (q 介於 0 與 1)"""
+        return self.percentiles([q * 100])[q * 100]
 
 @dataclass
 class WinDistribution:
@@ -23,33 +161,55 @@ class StatisticsAnalyzer:
         """初始化統計分析器"""
         self.analysis_cache = {}
     
+    DISTRIBUTION_PERCENTILES = [10, 25, 50, 75, 90, 95, 99]
+    
     def _percentile(self, data: List[float], percentile: int) -> float:
         """計算百分位數 (簡化實現)"""
-        sorted_data = sorted(data)
-        index = int(len(sorted_data) * percentile / 100)
-        return sorted_data[min(index, len(sorted_data) - 1)]
+        return percentiles_from_sorted(sorted(data), [percentile])[percentile]
     
     def analyze_win_distribution(self, win_data: List[int]) -> WinDistribution:
         """分析贏分分布"""
         if not win_data:
             return WinDistribution(0, 0, 0, 0, 0, {})
         
+        # 只排序一次，中位數與百分位數皆由排序結果取得
+        sorted_data = sorted(win_data)
         mean_win = statistics.mean(win_data)
-        median_win = statistics.median(win_data)
+        median_win = statistics.median(sorted_data)
         std_dev = statistics.stdev(win_data) if len(win_data) > 1 else 0
         
-        # 計算百分位數
-        percentiles = {}
-        for p in [10, 25, 50, 75, 90, 95, 99]:
-            percentiles[p] = self._percentile(win_data, p)
-        
         return WinDistribution(
             mean=mean_win,
             median=median_win,
             std_dev=std_dev,
-            min_win=min(win_data),
-            max_win=max(win_data),
-            percentiles=percentiles
+            min_win=sorted_data[0],
+            max_win=sorted_data[-1],
+            percentiles=percentiles_from_sorted(sorted_data, self.DISTRIBUTION_PERCENTILES)
+        )
+    
+    def analyze_sketch(self, sketch: QuantileSketch) -> WinDistribution:
+        """
+        由分位數草圖分析贏分分布 (不需保留逐次數據)
+        中位數與百分位數為草圖近似值；標準差由分格代表值估算
+        """
+        if sketch.count == 0:
+            return WinDistribution(0, 0, 0, 0, 0, {})
+        
+        percentiles = sketch.percentiles(self.DISTRIBUTION_PERCENTILES + [50])
+        mean_win = sketch.mean
+        if sketch.count > 1:
+            squared = sum(count * (value - mean_win) ** 2 for value, count in sketch.sorted_bins())
+            std_dev = math.sqrt(squared / (sketch.count - 1))
+        else:
+            std_dev = 0
+        
+        return WinDistribution(
+            mean=mean_win,
+            median=percentiles[50],
+            std_dev=std_dev,
+            min_win=sketch.min_value,
+            max_win=sketch.max_value,
+            percentiles={p: percentiles[p] for p in self.DISTRIBUTION_PERCENTILES}
         )
     
     def calculate_basic_stats(self, data: List[float]) -> Dict[str, float]:
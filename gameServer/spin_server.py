@@ -89,6 +89,7 @@ class StatusResponse(BaseModel):
     total_wins: int
     uptime_seconds: float
     engine_ready: bool
+    engine_statistics: Optional[Dict[str, Any]] = None
 
 
 # ==================== 全域變數 ====================
@@ -230,7 +231,8 @@ async def get_status():
         total_spins=server_stats['total_spins'],
         total_wins=server_stats['total_wins'],
         uptime_seconds=uptime,
-        engine_ready=game_engine is not None
+        engine_ready=game_engine is not None,
+        engine_statistics=game_engine.get_statistics() if game_engine is not None else None
     )
 
 
@@ -301,6 +303,8 @@ async def spin(request: SpinRequest):
         
         # 使用 SimpleDataExporter 轉換格式
         output_data = simple_exporter._convert_game_result(game_result)
+        output_data["stop_positions"] = spin_result.stop_positions
+        output_data["symbols_transformed"] = spin_result.symbols_transformed  # 停止位置為變換前
         
         # 更新統計
         server_stats['total_spins'] += 1
@@ -447,7 +451,8 @@ async def websocket_endpoint(websocket: WebSocket):
                     logger.info("🎰 處理滾輪條帶請求")
                     strips_recall = StripsRecall(
                         msgid=EMSGID.eStripsRecall,
-                        status_code=StatusCode.kSuccess
+                        status_code=StatusCode.kSuccess,
+                        strips=game_engine.reel_strips if game_engine is not None else None
                     )
                     response_data = strips_recall.SerializeToString()
                     await websocket.send_bytes(response_data)
@@ -477,45 +482,21 @@ async def websocket_endpoint(websocket: WebSocket):
                         
                         # 執行旋轉
                         try:
-                            spin_type_enum = SpinType.NORMAL
-                            if spin_type == "feature_60x":
-                                spin_type_enum = SpinType.FEATURE_60X
-                            elif spin_type == "feature_80x":
-                                spin_type_enum = SpinType.FEATURE_80X
-                            elif spin_type == "feature_100x":
-                                spin_type_enum = SpinType.FEATURE_100X
+                            spin_type_map = {
+                                "feature_60x": SpinType.FEATURE_BUY_60X,
+                                "feature_80x": SpinType.FEATURE_BUY_80X,
+                                "feature_100x": SpinType.FEATURE_BUY_100X
+                            }
+                            spin_type_enum = spin_type_map.get(spin_type, SpinType.NORMAL)
                             
                             # 使用 GameEngine 執行 Spin，計算連線中獎
                             result = game_engine.spin(spin_type_enum)
                             
-                            # 將 GameEngine 的 5x3 符號結果轉換為停止位置
-                            # result.reel_result 是 [[sym, sym, sym], ...] 5 個滾輪
-                            reel_stop_positions = []
-                            
-                            # 獲取滾輪條帶（與前端的 strips 相同）
-                            strips_recall = StripsRecall()
-                            strips = strips_recall.strips
-                            
-                            for reel_idx, reel_symbols in enumerate(result.reel_result):
-                                # reel_symbols 是 [sym1, sym2, sym3] (從上到下)
-                                # 我們需要找到 strips[reel_idx] 中哪個位置可以顯示這 3 個符號
-                                
-                                # 前端會從 stop_position 開始，取 3 個符號（考慮循環）
-                                # 所以我們需要找到 strips 中的起始位置
-                                
-                                target_symbol = reel_symbols[0]  # 使用第一個符號來定位
-                                strip = strips[reel_idx]
-                                
-                                # 在 strip 中找到這個符號的位置（簡化版：找第一個匹配）
-                                # 注意：真實遊戲中應該從 paytable 計算正確的位置
-                                try:
-                                    stop_pos = strip.index(target_symbol)
-                                except ValueError:
-                                    # 如果找不到，使用隨機位置
-                                    import random
-                                    stop_pos = random.randint(0, len(strip) - 1)
-                                
-                                reel_stop_positions.append(stop_pos)
+                            # 停止位置直接取自引擎實際抽取的結果 (與 StripsRecall 發送的條帶相同)
+                            # 免費旋轉的符號經過變換，停止位置後附上變換後的 15 個符號供客戶端顯示
+                            reel_stop_positions = list(result.stop_positions)
+                            if result.symbols_transformed:
+                                reel_stop_positions += _convert_reels_to_rng(result.reel_result)
                             
                             logger.info(f"🎲 計算停止位置: {reel_stop_positions}")
                             logger.info(f"🎰 對應符號 (5x3): {result.reel_result}")
@@ -546,7 +527,7 @@ async def websocket_endpoint(websocket: WebSocket):
                             
                             # 存儲結果供 ResultCall 使用
                             last_spin_result = {
-                                'reel_results': reel_stop_positions,  # 5 個停止位置
+                                'reel_results': reel_stop_positions,  # 5 個停止位置 (+ 變換後符號)
                                 'symbols': result.reel_result,        # 5x3 符號
                                 'total_win': result.total_credit,     # GameEngine 計算的贏分
                                 'win_lines': proto_win_lines,         # 中獎線數據
@@ -0,0 +1,79 @@
+"""
+批量旋轉測試 - 驗證 GameEngine.spin_batch 與逐次計算結果一致
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.game_engine import GameEngine, SpinType
+from core.rng import RandomStream
+from simulation.simulator import GameSimulator, SimulationConfig
+
+
+def test_spin_batch_matches_scalar_evaluation():
+    """測試批量贏分、觸發與 Ways 數與 WinCalculator 逐盤計算一致"""
+    engine = GameEngine(rng=RandomStream(7))
+    batch = engine.spin_batch(5000)
+
+    assert batch.size == 5000
+    assert batch.stops.shape == (5000, 5)
+    assert batch.reel_results.shape == (5000, 5, 3)
+
+    for i in range(batch.size):
+        reel_result = batch.reel_results[i].tolist()
+        win_lines = engine.win_calculator.calculate_243_ways(reel_result)
+
+        assert sum(line.credit for line in win_lines) == batch.total_credit[i]
+        assert engine._check_feature_trigger(reel_result)[0] == batch.is_feature_trigger[i]
+        for line in win_lines:
+            if line.win_type == "normal":
+                assert batch.ways[i, line.symbol_id] == line.ways
+
+    print(f"✓ 批量結果一致，平均贏分 {batch.total_credit.mean():.2f}")
+
+
+def test_spin_batch_windows_come_from_strips():
+    """測試停止位置與滾輪條帶對應"""
+    engine = GameEngine()
+    batch = engine.spin_batch(1000)
+
+    for i in range(100):
+        for reel_idx, stop in enumerate(batch.stops[i]):
+            strip = engine.reel_strips[reel_idx]
+            assert 0 <= stop <= len(strip) - 3
+            assert batch.reel_results[i, reel_idx].tolist() == strip[stop:stop + 3]
+    print("✓ 停止位置對應滾輪條帶")
+
+
+def test_spin_batch_rejects_feature_buy():
+    """測試批量旋轉不接受特色購買"""
+    engine = GameEngine()
+    try:
+        engine.spin_batch(10, SpinType.FEATURE_BUY_60X)
+    except ValueError:
+        print("✓ 特色購買被拒絕")
+        return
+    assert False, "spin_batch 應拒絕特色購買"
+
+
+def test_batch_simulation_reproducible():
+    """測試批量模擬在相同種子下可重現"""
+    simulator = GameSimulator()
+    config = SimulationConfig(total_spins=20000, seed=42, auto_buy_threshold=0.01)
+
+    first = simulator.run_batch_simulation(config, batch_size=5000)
+    second = simulator.run_batch_simulation(config, batch_size=5000)
+
+    assert first.total_win == second.total_win
+    assert first.total_bet == second.total_bet
+    assert first.total_spins == 20000
+    print(f"✓ 批量模擬 RTP: {first.rtp_percentage:.2f}%")
+
+
+if __name__ == "__main__":
+    test_spin_batch_matches_scalar_evaluation()
+    test_spin_batch_windows_come_from_strips()
+    test_spin_batch_rejects_feature_buy()
+    test_batch_simulation_reproducible()
+    print("\n🎉 批量旋轉測試通過！")
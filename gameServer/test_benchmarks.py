@@ -0,0 +1,120 @@
+"""
+基準測試套件測試 - 驗證量測、JSON 結果、基準比較與退步時的返回值
+"""
+
+import sys
+import os
+import json
+import tempfile
+from contextlib import contextmanager
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from benchmarks.cases import core_cases
+from benchmarks.runner import (
+    BenchmarkCase, BenchmarkResult, compare_results, load_results, main, run_benchmarks, save_results
+)
+from benchmarks.server_cases import server_cases
+
+
+def test_compare_results():
+    """測試兩種方向的指標以門檻判斷退步，缺少基準的案例不比較"""
+    baseline = {
+        "spin": BenchmarkResult("spin", 1000.0, "spins/s", True, 1),
+        "latency": BenchmarkResult("latency", 2.0, "ms/requests", False, 1),
+    }
+    current = [
+        BenchmarkResult("spin", 850.0, "spins/s", True, 1),
+        BenchmarkResult("latency", 2.1, "ms/requests", False, 1),
+        BenchmarkResult("new", 1.0, "ops/s", True, 1),
+    ]
+    comparisons = {comparison.name: comparison for comparison in compare_results(current, baseline, 0.1)}
+
+    assert set(comparisons) == {"spin", "latency"}
+    assert comparisons["spin"].regressed
+    assert abs(comparisons["spin"].change + 0.15) < 1e-12
+    assert not comparisons["latency"].regressed
+    assert abs(comparisons["latency"].change + 0.05) < 1e-12
+
+    current[1].value = 2.5
+    assert compare_results(current, baseline, 0.1)[1].regressed
+    assert not compare_results(current, baseline, 0.3)[0].regressed
+    print("✓ 基準比較正確判斷退步")
+
+
+def test_measurement_and_json_round_trip():
+    """測試吞吐量與延遲量測，結果寫入 JSON 後可讀回"""
+    calls = []
+
+    @contextmanager
+    def counting():
+        yield lambda count: calls.append(count)
+
+    cases = [
+        BenchmarkCase("counting", counting, "items", scale=8),
+        BenchmarkCase("counting_latency", counting, "items", kind="latency"),
+        BenchmarkCase("other", counting),
+    ]
+    results = run_benchmarks(cases, ["counting*"], min_time=0.001, repeats=2, latency_samples=5,
+                             verbose=False)
+
+    assert [result.name for result in results] == ["counting", "counting_latency"]
+    throughput, latency = results
+    assert throughput.higher_is_better and throughput.unit == "items/s"
+    assert throughput.samples % 8 == 0 and throughput.value > 0
+    assert not latency.higher_is_better and latency.unit == "ms/items"
+    assert latency.statistics["p95"] >= latency.statistics["p50"]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "results", "latest.json")
+        save_results(results, path)
+        with open(path, 'r', encoding='utf-8') as f:
+            assert "numpy" in json.load(f)["environment"]
+        loaded = load_results(path)
+    assert loaded["counting"] == throughput
+    print("✓ 量測結果可寫入並讀回 JSON")
+
+
+def test_main_fails_on_regression():
+    """測試實際案例與基準比較：無基準返回 2，無退步返回 0，基準被調高後返回 1"""
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, "latest.json")
+        baseline = os.path.join(directory, "baseline.json")
+        arguments = ["--quick", "--filter", "proto.parse_message", "--output", output, "--baseline", baseline]
+
+        assert main(arguments) == 2  # 尚無基準
+        assert main(arguments + ["--update-baseline"]) == 0
+        assert main(arguments + ["--threshold", "100"]) == 0
+
+        with open(baseline, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        data["results"]["proto.parse_message"]["value"] *= 1000
+        with open(baseline, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        assert main(arguments) == 1
+    print("✓ 指標退步時返回 1")
+
+
+def test_case_names_and_server_skip():
+    """測試案例涵蓋各熱路徑，缺少 fastapi / httpx 時略過伺服器案例"""
+    names = {case.name for case in core_cases()}
+    for expected in ("engine.spin", "engine.spin_free_game", "engine.spin_batch",
+                     "win_calculator.calculate_243_ways", "symbol_transformer.transform_symbols",
+                     "proto.result_recall.serialize", "proto.strips_recall.serialize", "proto.parse_message",
+                     "exporter.simple_data"):
+        assert expected in names
+
+    cases, skipped_reason = server_cases()
+    if skipped_reason is None:
+        assert {case.name for case in cases} == {"server.api_spin", "server.ws_spin"}
+        assert all(case.kind == "latency" for case in cases)
+    else:
+        assert cases == []
+    print("✓ 案例涵蓋各熱路徑" + (f" ({skipped_reason})" if skipped_reason else ""))
+
+
+if __name__ == "__main__":
+    test_compare_results()
+    test_measurement_and_json_round_trip()
+    test_main_fails_on_regression()
+    test_case_names_and_server_skip()
+    print("\n🎉 基準測試套件測試通過！")
@@ -0,0 +1,56 @@
+"""
+盤面位元表示測試 - 驗證遮罩、逐輪位元數與位元贏分計算
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.bitboard import GridBitboard, mask_positions
+from core.game_engine import GameEngine
+
+
+def test_masks_and_reel_counts():
+    """測試符號遮罩、逐輪位元數與位置展開"""
+    engine = GameEngine()
+    model = engine.model
+    reel_result = [[4, 10, 5], [4, 4, 9], [6, 9, 10], [4, 7, 8], [9, 0, 1]]
+    board = GridBitboard.from_reel_result(reel_result, model)
+
+    p1_mask = board.mask(4)
+    assert mask_positions(p1_mask) == [0, 3, 4, 9]
+    assert board.reel_counts(p1_mask | board.mask(model.wild_id)) == [2, 2, 1, 1, 0]
+    assert mask_positions(board.mask(model.scatter_id)) == [5, 7, 12]
+    print("✓ 遮罩與逐輪位元數正確")
+
+
+def test_board_is_hashable():
+    """測試相同盤面位元表示相等且可作為字典鍵"""
+    engine = GameEngine()
+    reel_result = engine._generate_reel_result()
+    first = GridBitboard.from_reel_result(reel_result, engine.model)
+    second = GridBitboard.from_reel_result([list(reel) for reel in reel_result], engine.model)
+
+    assert first == second
+    assert len({first: 1, second: 2}) == 1
+    print("✓ 盤面位元表示可雜湊")
+
+
+def test_bitboard_ways_win():
+    """測試位元計算的 Ways 贏分與位置"""
+    engine = GameEngine()
+    reel_result = [[4, 10, 5], [4, 4, 9], [6, 9, 10], [4, 7, 8], [9, 0, 1]]
+    win_lines = engine.win_calculator.calculate_243_ways(reel_result)
+    p1_line = next(line for line in win_lines if line.symbol_id == 4)
+
+    assert p1_line.ways == 2 * 2 * 1 * 1
+    assert p1_line.positions == [0, 1, 3, 4, 8, 9]
+    assert p1_line.credit == engine.model.get_payout(4, 4) * 4
+    print("✓ 位元 Ways 贏分正確")
+
+
+if __name__ == "__main__":
+    test_masks_and_reel_counts()
+    test_board_is_hashable()
+    test_bitboard_ways_win()
+    print("\n🎉 盤面位元表示測試通過！")
@@ -0,0 +1,106 @@
+"""
+共同隨機數比較測試 - 驗證配對估計量與變體共用隨機數
+"""
+
+import sys
+import os
+import json
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from core.game_engine import SpinType
+from simulation.comparison import ComparisonVariant, CommonRandomNumbersRunner
+from simulation.estimators import PairedRatioEstimator
+from simulation.simulator import GameSimulator
+
+
+def write_paytable(k_three: int) -> str:
+    """建立修改 K 三連賠付的暫存賠付表"""
+    with open("config/paytable.json", encoding="utf-8") as f:
+        paytable = json.load(f)
+    paytable["base_game"]["K"]["3"] = k_three
+    handle = tempfile.NamedTemporaryFile("w", suffix=".json", delete=False, encoding="utf-8")
+    json.dump(paytable, handle)
+    handle.close()
+    return handle.name
+
+
+def test_paired_estimator_variance():
+    """測試配對變異數與直接由樣本計算的配對殘差一致"""
+    generator = np.random.default_rng(0)
+    size = 8000
+    first_bets = np.full(size, 50)
+    second_bets = generator.choice([50, 5000], size=size, p=[0.95, 0.05])
+    first_wins = (generator.pareto(2, size) * 30).astype(np.int64)
+    second_wins = first_wins * 2 + (generator.pareto(2, size) * 10).astype(np.int64)
+
+    estimator = PairedRatioEstimator()
+    estimator.add_block(first_bets[:3000], first_wins[:3000], second_bets[:3000], second_wins[:3000])
+    estimator.add_block(first_bets[3000:], first_wins[3000:], second_bets[3000:], second_wins[3000:])
+
+    ratio_a = first_wins.sum() / first_bets.sum()
+    ratio_b = second_wins.sum() / second_bets.sum()
+    residual = (first_wins - ratio_a * first_bets) / first_bets.mean() \
+        - (second_wins - ratio_b * second_bets) / second_bets.mean()
+    expected = residual.var(ddof=1) / size
+
+    assert abs(estimator.difference - (ratio_a - ratio_b)) < 1e-12
+    assert abs(estimator.variance - expected) / expected < 1e-9
+    print("✓ 配對變異數正確")
+
+
+def test_identical_variants_have_zero_difference():
+    """測試相同變體使用共同隨機數時結果完全相同"""
+    result = CommonRandomNumbersRunner([
+        ComparisonVariant("a", buy_probability=0.05), ComparisonVariant("b", buy_probability=0.05)
+    ]).run(20000, seed=1, block_size=5000)
+
+    comparison = result.comparisons[0]
+    assert result.variants["a"].total_win == result.variants["b"].total_win
+    assert comparison.rtp_difference == 0 and comparison.standard_error == 0
+    print("✓ 相同變體差異為 0")
+
+
+def test_paytable_comparison_is_paired():
+    """測試賠付表比較的配對標準誤差遠小於獨立模擬，且差值方向正確"""
+    paytable_path = write_paytable(12)
+    try:
+        result = GameSimulator().run_comparison([
+            ComparisonVariant("base"),
+            ComparisonVariant("rich_k", paytable_path=paytable_path)
+        ], spins=100000, seed=2)
+    finally:
+        os.remove(paytable_path)
+
+    comparison = result.comparisons[0]
+    assert comparison.rtp_difference > 0
+    assert comparison.confidence_interval[0] > 0
+    assert comparison.variance_reduction > 10
+    print(f"✓ 賠付表比較 RTP 差 {comparison.rtp_difference:.3f}% ± {comparison.standard_error:.3f}% "
+          f"(變異數降低 {comparison.variance_reduction:.0f} 倍)")
+
+
+def test_buy_policy_comparison():
+    """測試購買策略比較：每次購買 100X 的押注與波動性計算"""
+    result = CommonRandomNumbersRunner([
+        ComparisonVariant("never_buy"),
+        ComparisonVariant("always_buy_100x", buy_probability=1.0, buy_options=(SpinType.FEATURE_BUY_100X,))
+    ]).run(10000, seed=3, block_size=2500)
+
+    assert result.variants["never_buy"].total_bet == 10000 * 50
+    assert result.variants["always_buy_100x"].total_bet == 10000 * 5000
+    comparison = result.comparisons[0]
+    lower, upper = comparison.volatility_confidence_interval
+    assert lower <= comparison.volatility_difference <= upper
+    assert "comparisons" in result.to_dict()
+    print(f"✓ 購買策略比較 RTP 差 {comparison.rtp_difference:.2f}%")
+
+
+if __name__ == "__main__":
+    test_paired_estimator_variance()
+    test_identical_variants_have_zero_difference()
+    test_paytable_comparison_is_paired()
+    test_buy_policy_comparison()
+    print("\n🎉 共同隨機數比較測試通過！")
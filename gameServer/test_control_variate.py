@@ -0,0 +1,100 @@
+"""
+控制變量 RTP 估計測試 - 驗證最佳係數、合併、無偏性與序貫驗證的變異數降低
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from simulation.estimators import ControlVariateEstimator
+from simulation.simulator import GameSimulator, SimulationConfig, SimulationResult
+
+
+def test_control_variate_matches_regression():
+    """測試 β 與修正後 RTP 與直接以最小平方法計算的結果一致"""
+    generator = np.random.default_rng(4)
+    size = 20000
+    controls = np.column_stack([
+        generator.exponential(10.0, size=size),
+        generator.random(size) < 0.02
+    ]).astype(np.float64)
+    bets = np.full(size, 50, dtype=np.int64)
+    wins = (3 * controls[:, 0] + 400 * controls[:, 1] + generator.exponential(5.0, size=size)).astype(np.int64)
+    means = [10.0, 0.02]
+
+    estimator = ControlVariateEstimator(means)
+    estimator.add_block(bets[:5000], wins[:5000], controls[:5000])
+    other = ControlVariateEstimator(means)
+    for bet, win, control in zip(bets[5000:], wins[5000:], controls[5000:]):
+        other.add(int(bet), int(win), control.tolist())
+    estimator.merge(other)
+
+    ratio = wins.sum() / bets.sum()
+    residuals = wins - ratio * bets
+    centered = controls - controls.mean(axis=0)
+    beta = np.linalg.lstsq(centered, residuals - residuals.mean(), rcond=None)[0]
+    expected = (wins.mean() - beta @ (controls.mean(axis=0) - means)) / bets.mean()
+
+    fitted_beta, _, _ = estimator._fit()
+    assert np.allclose(fitted_beta, beta, rtol=1e-6)
+    assert abs(estimator.ratio - expected) < 1e-9
+    assert estimator.variance_reduction > 5
+    assert estimator.standard_error < estimator.ratio_estimator.standard_error
+    print(f"✓ 控制變量係數正確 (變異數降低 {estimator.variance_reduction:.1f} 倍)")
+
+
+def test_merge_rejects_different_controls():
+    """測試控制變量期望值不同時拒絕合併"""
+    try:
+        ControlVariateEstimator([1.0, 0.1]).merge(ControlVariateEstimator([2.0, 0.1]))
+        assert False, "應拋出 ValueError"
+    except ValueError:
+        pass
+    print("✓ 控制變量不同時拒絕合併")
+
+
+def test_sequential_control_variate_converges_faster():
+    """測試基礎遊戲驗證以控制變量估計時以較少旋轉達到相同精度，且與一般估計一致"""
+    simulator = GameSimulator()
+    settings = dict(tolerance=0.1, max_spins=1000000, block_size=50000, min_spins=50000,
+                    seed=21, auto_buy_threshold=0.0)
+    plain = simulator.run_sequential_rtp_verification(**settings)
+    controlled = simulator.run_sequential_rtp_verification(control_variate=True, **settings)
+
+    summary = controlled["control_variate"]
+    assert controlled["stop_reason"] == "converged"
+    assert controlled["spins_used"] < plain["spins_used"]
+    assert summary["variance_reduction"] > 10
+    assert summary["effective_sample_size"] > controlled["spins_used"]
+    assert abs(controlled["actual_rtp"] - plain["actual_rtp"]) < 4 * plain["standard_error"]
+    print(f"✓ 控制變量提前收斂 ({controlled['spins_used']} 對 {plain['spins_used']} 次，"
+          f"變異數降低 {summary['variance_reduction']:.1f} 倍)")
+
+
+def test_basic_simulation_control_variate():
+    """測試逐次模擬的控制變量估計可導出與合併"""
+    simulator = GameSimulator()
+    config = SimulationConfig(total_spins=5000, seed=8, auto_buy_threshold=0.0, control_variate=True)
+    first = simulator.run_basic_simulation(config)
+    config.seed = 9
+    second = simulator.run_basic_simulation(config)
+
+    assert first.control_estimator.count == 5000
+    data = first.to_dict()
+    assert "control_estimator" not in data
+    assert data["control_variate"]["variance_reduction"] > 1
+
+    merged = SimulationResult.merge([first, second])
+    assert merged.control_estimator.count == 10000
+    assert merged.control_estimator.ratio_estimator.sum_win == first.total_win + second.total_win
+    print("✓ 逐次模擬控制變量估計可導出與合併")
+
+
+if __name__ == "__main__":
+    test_control_variate_matches_regression()
+    test_merge_rejects_different_controls()
+    test_sequential_control_variate_converges_faster()
+    test_basic_simulation_control_variate()
+    print("\n🎉 控制變量 RTP 估計測試通過！")
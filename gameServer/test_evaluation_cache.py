@@ -0,0 +1,117 @@
+"""
+贏分評估快取測試 - 驗證 LRU 上限、命中計數與完整預先計算
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.evaluation_cache import EvaluationCache
+from core.game_engine import GameEngine
+from core.rng import RandomStream
+
+
+def test_cache_hits_and_bound():
+    """測試重複停止位置命中快取，且大小不超過上限"""
+    engine = GameEngine(rng=RandomStream(31))
+    cache = EvaluationCache(engine.win_calculator, engine.reel_tables, max_size=100)
+
+    stops_list = [engine._generate_stops() for _ in range(300)]
+    for stops in stops_list + stops_list[-50:]:
+        expected = engine.win_calculator.calculate_243_ways(engine.reel_tables.reel_result(stops))
+        assert cache.evaluate(stops) == expected
+
+    assert len(cache) == 100
+    assert cache.hits >= 50
+    assert cache.hits + cache.misses == 350
+    print(f"✓ 快取命中 {cache.hits} 次，大小 {len(cache)}")
+
+
+def test_returned_lines_not_shared():
+    """測試修改返回的贏分線不影響之後的命中結果"""
+    engine = GameEngine(rng=RandomStream(35))
+    cache = EvaluationCache(engine.win_calculator, engine.reel_tables, max_size=None)
+    stops = next(stops for stops in iter(engine._generate_stops, None) if cache.evaluate(stops))
+    expected = engine.win_calculator.calculate_243_ways(engine.reel_tables.reel_result(stops))
+
+    for _ in range(2):
+        lines = cache.evaluate(stops)
+        assert lines == expected
+        for line in lines:
+            line.credit *= 10
+            line.multiplier = 5
+            line.positions.append(99)
+    assert cache.hits == 2
+    print("✓ 命中返回新的贏分線")
+
+
+def test_materialize_small_strips():
+    """測試小型條帶組可完整預先計算，之後全部命中"""
+    engine = GameEngine(rng=RandomStream(32))
+    engine.set_reel_strips([strip[16:22] for strip in engine.reel_strips])
+    cache = EvaluationCache(engine.win_calculator, engine.reel_tables, max_size=None, materialize=True)
+
+    assert len(cache) == cache.total_combinations == 4 ** 5
+    for _ in range(200):
+        cache.evaluate(engine._generate_stops())
+    assert cache.misses == 0
+    print("✓ 小型條帶完整預先計算")
+
+
+def test_materialize_rejects_large_strips():
+    """測試組合數超過上限時拒絕預先計算"""
+    engine = GameEngine()
+    try:
+        EvaluationCache(engine.win_calculator, engine.reel_tables, max_size=1000, materialize=True)
+    except ValueError:
+        print("✓ 大型條帶拒絕預先計算")
+        return
+    assert False, "應拒絕超過快取大小的預先計算"
+
+
+def test_engine_uses_cache():
+    """測試引擎一般旋轉經由快取計算贏分"""
+    engine = GameEngine(rng=RandomStream(33), evaluation_cache_size=10)
+    for _ in range(50):
+        engine.spin()
+
+    cache_stats = engine.get_statistics()["evaluation_cache"]
+    assert cache_stats["hits"] + cache_stats["misses"] == 50
+    assert cache_stats["size"] == 10
+    print("✓ 引擎使用贏分快取")
+
+
+def test_engine_default_cache_policy():
+    """測試預設只在小型條帶組時快取，條帶未改變時重置不重建快取"""
+    engine = GameEngine(rng=RandomStream(34))
+    assert engine.config["evaluation_cache_size"] == 0  # 選用功能，由配置啟用
+    assert engine.evaluation_cache.max_size == 0  # 預設條帶組合數過多，不快取
+    for _ in range(20):
+        engine.spin()
+    assert len(engine.evaluation_cache) == 0
+
+    engine.set_reel_strips([strip[16:22] for strip in engine.reel_strips])
+    cache = engine.evaluation_cache
+    assert cache.max_size is None
+    for _ in range(200):
+        engine.spin()
+    assert 0 < len(cache) <= cache.total_combinations
+
+    tables = engine.reel_tables
+    engine.set_reel_strips([list(strip) for strip in engine.reel_strips])
+    assert engine.evaluation_cache is cache and engine.reel_tables is tables
+
+    engine.evaluation_cache_size = 10
+    engine.set_reel_strips(engine.reel_strips)
+    assert engine.evaluation_cache.max_size == 10 and engine.reel_tables is tables
+    print("✓ 預設快取策略與沿用快取")
+
+
+if __name__ == "__main__":
+    test_cache_hits_and_bound()
+    test_returned_lines_not_shared()
+    test_materialize_small_strips()
+    test_materialize_rejects_large_strips()
+    test_engine_uses_cache()
+    test_engine_default_cache_policy()
+    print("\n🎉 贏分評估快取測試通過！")
@@ -0,0 +1,52 @@
+"""
+精確分析測試 - 驗證完整列舉結果與逐盤計算一致
+"""
+
+import sys
+import os
+import itertools
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.game_engine import GameEngine
+from simulation.exact_analysis import ExactBaseGameCalculator
+
+
+def test_exact_matches_brute_force_on_short_strips():
+    """測試縮短條帶時，分組列舉與逐一列舉所有停止位置的結果相同"""
+    engine = GameEngine()
+    strips = [strip[16:26] for strip in engine.reel_strips]
+    calculator = ExactBaseGameCalculator(engine.model, strips)
+    result = calculator.calculate(bet=50)
+
+    stop_ranges = [range(len(strip) - 2) for strip in strips]
+    win_counts = {}
+    triggers = 0
+    for stops in itertools.product(*stop_ranges):
+        reel_result = [strips[reel_idx][stop:stop + 3] for reel_idx, stop in enumerate(stops)]
+        win = sum(line.credit for line in engine.win_calculator.calculate_243_ways(reel_result))
+        win_counts[win] = win_counts.get(win, 0) + 1
+        triggers += engine._check_feature_trigger(reel_result)[0]
+
+    total = sum(win_counts.values())
+    assert result.total_combinations == total
+    assert result.win_counts == dict(sorted(win_counts.items()))
+    assert abs(result.feature_trigger_probability - triggers / total) < 1e-12
+    assert abs(sum(result.symbol_rtp.values()) - result.rtp_percentage) < 1e-9
+    print(f"✓ 列舉結果一致: RTP {result.rtp_percentage:.4f}%, 觸發機率 {result.feature_trigger_probability:.6f}")
+
+
+def test_exact_full_strips():
+    """測試完整條帶的精確分析"""
+    engine = GameEngine()
+    result = ExactBaseGameCalculator.from_engine(engine).calculate(bet=engine.current_bet)
+
+    assert result.total_combinations == 38 ** 5
+    assert abs(sum(result.win_pmf().values()) - 1.0) < 1e-12
+    assert 0 < result.hit_frequency < 1
+    print(f"✓ 基礎遊戲精確 RTP: {result.rtp_percentage:.4f}% (用時 {result.calculation_time:.2f} 秒)")
+
+
+if __name__ == "__main__":
+    test_exact_matches_brute_force_on_short_strips()
+    test_exact_full_strips()
+    print("\n🎉 精確分析測試通過！")
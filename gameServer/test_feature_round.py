@@ -0,0 +1,76 @@
+"""
+免費旋轉回合評估器測試 - 驗證批量回合與引擎逐次免費旋轉一致
+"""
+
+import sys
+import os
+import time
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from core.feature_round import FeatureRoundEvaluator
+from core.game_engine import GameEngine
+from core.rng import RandomStream
+from simulation.simulator import GameSimulator
+
+
+def test_round_structure():
+    """測試回合旋轉次數等於初始次數加再觸發次數"""
+    engine = GameEngine(rng=RandomStream(1))
+    evaluator = FeatureRoundEvaluator.from_engine(engine)
+    rounds = evaluator.play_rounds(20000, drums=1)
+
+    initial_spins = engine.model.initial_free_spins
+    assert len(rounds) == 20000
+    assert np.array_equal(rounds.spins, initial_spins + initial_spins * rounds.retriggers)
+    assert (rounds.max_win <= rounds.total_win).all()
+
+    total_win, spins = evaluator.play_round(drums=0, initial_spins=3)
+    assert spins >= 3 and total_win >= 0
+    print(f"✓ 回合結構正確 (再觸發 {int(rounds.retriggers.sum())} 次)")
+
+
+def test_matches_engine_free_games():
+    """測試批量回合平均贏分與引擎逐次免費旋轉一致 (4 倍標準誤差內)"""
+    evaluator = FeatureRoundEvaluator.from_engine(GameEngine(rng=RandomStream(2)))
+    fast = evaluator.play_rounds(40000, drums=2).total_win
+
+    engine = GameEngine(rng=RandomStream(3))
+    engine.player_credit = 10 ** 12
+    reference = []
+    for _ in range(4000):
+        engine.free_spins_remaining = engine.model.initial_free_spins
+        engine.drums_count = 2
+        round_win = 0
+        while engine.free_spins_remaining > 0:
+            round_win += engine.spin_free_game().total_credit
+        reference.append(round_win)
+    reference = np.array(reference)
+
+    difference = abs(fast.mean() - reference.mean())
+    standard_error = np.sqrt(fast.var() / len(fast) + reference.var() / len(reference))
+    assert difference < 4 * standard_error, (fast.mean(), reference.mean(), standard_error)
+    print(f"✓ 與引擎免費旋轉一致 ({fast.mean():.1f} vs {reference.mean():.1f})")
+
+
+def test_feature_buy_analysis_fast_and_reproducible():
+    """測試特色購買分析使用批量回合且相同種子結果相同"""
+    simulator = GameSimulator()
+    start = time.time()
+    first = simulator.run_feature_buy_analysis(spins_per_option=10000, seed=4)
+    elapsed = time.time() - start
+    second = simulator.run_feature_buy_analysis(spins_per_option=10000, seed=4)
+
+    assert set(first) == {"FEATURE_BUY_60X", "FEATURE_BUY_80X", "FEATURE_BUY_100X"}
+    assert first == second
+    assert all(option["samples"] == 10000 for option in first.values())
+    assert first["FEATURE_BUY_100X"]["average_win"] > first["FEATURE_BUY_60X"]["average_win"]
+    print(f"✓ 特色購買分析 3 x 10000 回合用時 {elapsed:.2f} 秒")
+
+
+if __name__ == "__main__":
+    test_round_structure()
+    test_matches_engine_free_games()
+    test_feature_buy_analysis_fast_and_reproducible()
+    print("\n🎉 免費旋轉回合評估器測試通過！")
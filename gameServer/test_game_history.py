@@ -0,0 +1,58 @@
+"""
+遊戲歷史測試 - 驗證有界歷史紀錄與累計統計
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.game_engine import GameEngine
+from core.rng import RandomStream
+
+
+def test_history_is_bounded():
+    """測試歷史紀錄只保留最近 history_size 筆"""
+    engine = GameEngine(rng=RandomStream(11), history_size=50)
+    results = [engine.spin() for _ in range(500)]
+
+    assert len(engine.game_history) == 50
+    assert list(engine.game_history) == results[-50:]
+    assert engine.get_game_state()["total_spins"] == 500
+    print("✓ 歷史紀錄有界")
+
+
+def test_running_statistics_match_full_history():
+    """測試累計統計與完整結果列表計算一致"""
+    engine = GameEngine(rng=RandomStream(12), history_size=10)
+    results = [engine.spin() for _ in range(3000)]
+    stats = engine.get_statistics()
+
+    total_win = sum(result.total_credit for result in results)
+    mean = total_win / len(results)
+    variance = sum((result.total_credit - mean) ** 2 for result in results) / len(results)
+
+    assert stats["total_spins"] == 3000
+    assert stats["total_win"] == total_win
+    assert stats["feature_triggers"] == sum(1 for result in results if result.is_feature_trigger)
+    assert stats["max_win"] == max(result.total_credit for result in results)
+    assert abs(stats["win_std_dev"] - variance ** 0.5) < 1e-6
+    print(f"✓ 累計統計一致 (RTP {stats['rtp_estimate']:.2f}%)")
+
+
+def test_reset_clears_statistics():
+    """測試重置遊戲狀態會清空統計"""
+    engine = GameEngine(rng=RandomStream(13))
+    for _ in range(10):
+        engine.spin()
+    engine.reset_game_state()
+
+    assert len(engine.game_history) == 0
+    assert engine.get_statistics() == {"message": "沒有遊戲歷史"}
+    print("✓ 重置清空統計")
+
+
+if __name__ == "__main__":
+    test_history_is_bounded()
+    test_running_statistics_match_full_history()
+    test_reset_clears_statistics()
+    print("\n🎉 遊戲歷史測試通過！")
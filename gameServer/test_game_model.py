@@ -0,0 +1,86 @@
+"""
+編譯後遊戲模型測試 - 驗證 CompiledGameModel 與共用實例
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.game_engine import GameEngine
+from core import game_model
+from core.game_model import CompiledGameModel, clear_model_cache
+
+
+def test_model_tables_match_paytable():
+    """測試密集賠付表與 paytable.json 一致"""
+    engine = GameEngine()
+    model = engine.model
+
+    for name, symbol_pays in engine.paytable["base_game"].items():
+        symbol_id = model.symbol_id(name)
+        for count, payout in symbol_pays.items():
+            assert model.pays[symbol_id][int(count)] == payout
+
+    for count, payout in engine.paytable["scatter_pays"]["BONUS"].items():
+        assert model.get_scatter_payout(int(count)) == payout
+
+    assert model.symbol_name(model.wild_id) == "WILD"
+    assert model.symbol_name(model.scatter_id) == "BONUS"
+    assert model.is_wild[model.wild_id] and not model.is_wild[model.scatter_id]
+    assert model.scatter_id not in model.ways_symbol_ids
+    print(f"✓ 賠付表一致，Ways 符號: {model.ways_symbol_ids}")
+
+
+def test_model_shared_across_engines():
+    """測試相同配置的引擎共用同一模型，計算器不再每次旋轉重建"""
+    engine_a = GameEngine()
+    engine_b = GameEngine()
+
+    assert engine_a.model is engine_b.model
+    assert engine_a.win_calculator.model is engine_a.model
+    assert engine_a.symbol_transformer.model is engine_a.model
+
+    calculator = engine_a.win_calculator
+    engine_a.spin()
+    assert engine_a.win_calculator is calculator
+    print("✓ 模型與計算器共用")
+
+
+def test_custom_config_compiles_separately():
+    """測試不同配置產生不同模型"""
+    engine = GameEngine()
+    paytable = dict(engine.paytable)
+    paytable["base_game"] = dict(paytable["base_game"])
+    paytable["base_game"]["P5"] = {"5": 1000, "4": 200, "3": 50}
+
+    model = CompiledGameModel.from_config(engine.config, paytable)
+    assert model is not engine.model
+    assert model.get_payout(model.symbol_id("P5"), 5) == 1000
+    print("✓ 自訂賠付表獨立編譯")
+
+
+def test_model_cache_bounded():
+    """測試模型快取只保留最近使用的模型，可手動清空"""
+    engine = GameEngine()
+    base_model = CompiledGameModel.from_config(engine.config, engine.paytable)
+    for pay in range(game_model.MODEL_CACHE_SIZE + 5):
+        paytable = dict(engine.paytable)
+        paytable["base_game"] = dict(paytable["base_game"], P5={"5": 1000 + pay})
+        CompiledGameModel.from_config(engine.config, paytable)
+        CompiledGameModel.from_config(engine.config, engine.paytable)  # 保持最近使用
+
+    assert len(game_model._MODEL_CACHE) == game_model.MODEL_CACHE_SIZE
+    assert CompiledGameModel.from_config(engine.config, engine.paytable) is base_model
+
+    clear_model_cache()
+    assert len(game_model._MODEL_CACHE) == 0
+    assert CompiledGameModel.from_config(engine.config, engine.paytable) is not base_model
+    print("✓ 模型快取有界且可清空")
+
+
+if __name__ == "__main__":
+    test_model_tables_match_paytable()
+    test_model_shared_across_engines()
+    test_custom_config_compiles_separately()
+    test_model_cache_bounded()
+    print("\n🎉 編譯後遊戲模型測試通過！")
@@ -0,0 +1,89 @@
+"""
+重要性抽樣測試 - 以精確列舉驗證尾部機率不偏，並確認變異數低於一般蒙地卡羅
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from core.game_engine import GameEngine
+from core.rng import RandomStream
+from core.samplers import StopProposal
+from simulation.exact_analysis import ExactBaseGameCalculator
+from simulation.importance import ImportanceSampler
+from simulation.simulator import GameSimulator
+
+
+def exact_five_of_a_kind(engine: GameEngine, symbol_id: int) -> float:
+    """精確五連機率：每輪視窗含該符號或 WILD 的機率乘積"""
+    return float(np.prod([(reel.count_array[:, symbol_id] > 0).mean() for reel in engine.reel_tables.reels]))
+
+
+def test_stop_proposal_likelihood_ratio():
+    """測試提議分布的似然比期望為 1 (混合與非混合)"""
+    rng = RandomStream(1)
+    weights = [[1.0, 2.0, 5.0, 1.0], [3.0, 1.0, 1.0]]
+    for mixture in (1.0, 0.3):
+        proposal = StopProposal(weights, mixture)
+        _, likelihood = proposal.sample(rng, 200000)
+        assert abs(likelihood.mean() - 1) < 0.01
+        if mixture < 1:
+            assert likelihood.max() <= 1 / (1 - mixture) + 1e-9
+    print("✓ 似然比期望為 1")
+
+
+def test_base_game_tail_unbiased_and_efficient():
+    """測試五連 P5 機率與期望贏分不偏，且標準誤差低於一般蒙地卡羅"""
+    engine = GameEngine(rng=RandomStream(2))
+    exact = ExactBaseGameCalculator.from_engine(engine).calculate(50)
+    p5 = engine.model.symbol_id("P5")
+    exact_p5 = exact_five_of_a_kind(engine, p5)
+
+    result = ImportanceSampler(engine).run_base_game(200000)
+    estimate = result.tail_probabilities["five_of_a_kind_P5"]
+    trigger = result.tail_probabilities["feature_trigger"]
+
+    assert abs(estimate.probability - exact_p5) < 4 * estimate.standard_error
+    assert abs(trigger.probability - exact.feature_trigger_probability) < 4 * trigger.standard_error
+    assert abs(result.expected_win - exact.expected_win) < 4 * result.expected_win_standard_error
+
+    # 一般蒙地卡羅同樣樣本數的標準誤差
+    plain_error = np.sqrt(exact_p5 * (1 - exact_p5) / 200000)
+    assert estimate.standard_error < plain_error / 4
+    assert estimate.hits > 100
+    assert 0 < result.top_win_rtp_share < 1
+    print(f"✓ 五連 P5 {estimate.probability:.2e} (精確 {exact_p5:.2e})，標準誤差為一般 MC 的 "
+          f"{estimate.standard_error / plain_error:.2f} 倍")
+
+
+def test_feature_round_likelihood_bounded():
+    """測試免費回合估計與一般抽樣一致且似然比有界"""
+    engine = GameEngine(rng=RandomStream(3))
+    sampler = ImportanceSampler(engine)
+    weighted = sampler.run_feature_rounds(20000, drums=3, cost=5000)
+    plain = sampler.feature_evaluator.play_rounds(20000, drums=3).total_win
+
+    standard_error = np.sqrt(weighted.expected_win_standard_error ** 2 + plain.var() / len(plain))
+    assert abs(weighted.expected_win - plain.mean()) < 4 * standard_error
+    assert weighted.effective_sample_size > 5000
+    print(f"✓ 免費回合期望贏分 {weighted.expected_win:.1f} (一般抽樣 {plain.mean():.1f})")
+
+
+def test_simulator_analysis():
+    """測試模擬器尾部分析輸出"""
+    analysis = GameSimulator().run_importance_sampling_analysis(spins=20000, rounds_per_option=2000, seed=4)
+
+    assert set(analysis) == {"base_game", "FEATURE_BUY_60X", "FEATURE_BUY_80X", "FEATURE_BUY_100X"}
+    assert analysis["base_game"]["tail_probabilities"]["scatter_5"]["probability"] >= 0
+    assert analysis["FEATURE_BUY_100X"]["cost"] == 5000
+    print("✓ 模擬器尾部分析輸出完整")
+
+
+if __name__ == "__main__":
+    test_stop_proposal_likelihood_ratio()
+    test_base_game_tail_unbiased_and_efficient()
+    test_feature_round_likelihood_bounded()
+    test_simulator_analysis()
+    print("\n🎉 重要性抽樣測試通過！")
@@ -0,0 +1,188 @@
+"""
+記憶體預算測試 - 驗證溢出緩衝、串流輸出與整體輸出相同、JSON 輸出的記憶體上限與記憶體基準測試
+"""
+
+import sys
+import os
+import contextlib
+import io
+import json
+import tempfile
+from datetime import datetime
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from benchmarks.memory import RUNS, main as memory_main, measure_run, run_memory_benchmarks
+from protocol.event_log_exporter import EventLogExporter
+from protocol.simple_data_exporter import SimpleDataExporter
+from simulation.memory import MemoryBudget, current_rss_bytes, deep_sizeof, measure_memory
+from simulation import simulator as simulator_module
+from simulation.simulator import GameSimulator, SimulationConfig
+from simulation.sinks import SpillBuffer
+
+
+def _records(count):
+    return [{"spin_number": index + 1, "reels": [[1, 2, 3]] * 5, "total_win": index % 7 * 10,
+             "wins": [{"symbol": 3, "pay": 10, "positions": (0, 1, 2), "multiplier": 1, "way_id": 1}],
+             "free_spins_awarded": 0, "war_drums_result": {}, "remaining_credit": 1000, "bet_amount": 50}
+            for index in range(count)]
+
+
+def test_budget_and_measurement():
+    """測試記憶體上限參數、門檻判斷與量測"""
+    budget = MemoryBudget(512, 0.8)
+    assert budget.spill_bytes == int(512 * 1024 * 1024 * 0.8)
+    assert budget.exceeded(budget.spill_bytes)
+    assert current_rss_bytes() > 0
+    assert MemoryBudget(1).exceeded()  # 進程 RSS 必定超過 1 MB
+    for arguments in ((0,), (512, 0), (512, 1.5)):
+        try:
+            MemoryBudget(*arguments)
+            assert False, "應拋出 ValueError"
+        except ValueError:
+            pass
+
+    assert deep_sizeof([[1, 2], [1, 2]]) > deep_sizeof([[1, 2]])
+    with measure_memory() as measurement:
+        data = [list(range(20)) for _ in range(20000)]
+    assert measurement.traced_peak >= deep_sizeof(data) * 0.8
+    assert measurement.rss_peak >= measurement.rss_before
+    print("✓ 記憶體上限與量測")
+
+
+def test_spill_buffer():
+    """測試超過上限時溢出至暫存檔，讀回的紀錄順序與內容不變，關閉後刪除檔案"""
+    records = _records(3000)
+    with tempfile.TemporaryDirectory() as directory:
+        unlimited = SpillBuffer()
+        spilled = SpillBuffer(MemoryBudget(1), spill_dir=directory, check_interval=1000)
+        for record in records:
+            unlimited.write(record)
+            spilled.write(record)
+
+        assert not unlimited.spilled and unlimited.memory_bytes > 0
+        assert spilled.spilled and spilled.records == [] and spilled.spill_bytes > 0
+        assert len(spilled) == len(unlimited) == 3000
+        expected = json.loads(json.dumps(records))  # 溢出後的紀錄為 JSON 型別
+        assert list(spilled) == expected and list(spilled) == expected  # 可重複讀取
+        assert list(unlimited) == records
+
+        spill_path = spilled.spill_path
+        assert os.path.dirname(spill_path) == directory
+        spilled.close()
+        assert not os.path.exists(spill_path)
+    print("✓ 溢出緩衝正確讀回紀錄")
+
+
+def test_streaming_exporters_match_full_dump():
+    """測試串流輸出與整體輸出的檔案內容相同"""
+    records = _records(600)
+    with tempfile.TemporaryDirectory() as directory:
+        full = SimpleDataExporter()
+        for record in records:
+            full.add_result(record)
+        streamed = SimpleDataExporter()
+        path = streamed.stream_to_json(iter(records), os.path.join(directory, "simple.json"), chunk_size=64)
+        with open(path, 'r', encoding='utf-8') as f:
+            assert f.read() == full.get_json_string()
+        assert streamed.results == []
+
+        start_time = datetime(2025, 10, 14, 10, 0, 0)
+        full = EventLogExporter(start_time=start_time)
+        full.add_signin_event()
+        full.add_connection_event()
+        for index, record in enumerate(records):
+            if index > 0 and index % 50 == 0:
+                full.add_disconnection_event()
+                full.add_signin_event()
+                full.add_connection_event()
+            full.add_result_event(record, is_reconnected=index > 0 and index % 50 == 0)
+        full.add_disconnection_event()
+        streamed = EventLogExporter(start_time=start_time)
+        path = streamed.stream_results_to_json(iter(records), os.path.join(directory, "events.json"),
+                                               chunk_size=64)
+        with open(path, 'r', encoding='utf-8') as f:
+            assert f.read() == full.get_json_string()
+    print("✓ 串流輸出與整體輸出相同")
+
+
+def test_json_export_spills_under_budget():
+    """測試記憶體上限過低時 JSON 輸出改為溢出模式，輸出內容與不限制時相同"""
+    simulator = GameSimulator()
+    outputs = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, max_memory_mb in (("memory", None), ("spill", 1)):
+            output_dir = os.path.join(directory, name)
+            config = SimulationConfig(total_spins=3000, seed=12, max_memory_mb=max_memory_mb)
+            with contextlib.redirect_stdout(io.StringIO()):
+                result, files = simulator.run_simulation_with_json_export(config, output_dir=output_dir)
+            with open(files["game_results"], 'r', encoding='utf-8') as f:
+                outputs[name] = (result, f.read())
+            assert not any(filename.startswith(".spin_records_") for filename in os.listdir(output_dir))
+
+    memory_result, memory_output = outputs["memory"]
+    spill_result, spill_output = outputs["spill"]
+    assert not memory_result.record_buffer["spilled"] and memory_result.record_buffer["memory_bytes"] > 0
+    assert spill_result.record_buffer["spilled"] and spill_result.record_buffer["spill_bytes"] > 0
+    assert spill_result.to_dict()["record_buffer"]["records"] == memory_result.record_buffer["records"]
+    assert spill_output == memory_output
+    assert "record_buffer" not in simulator.run_basic_simulation(SimulationConfig(total_spins=10)).to_dict()
+    print("✓ JSON 輸出在記憶體上限下溢出且內容不變")
+
+
+def test_spill_file_removed_on_interrupt():
+    """測試輸出中斷 (KeyboardInterrupt) 時仍刪除溢出暫存檔，記憶體上限預設不限制"""
+    assert SimulationConfig().max_memory_mb is None
+
+    def interrupt(**kwargs):
+        raise KeyboardInterrupt
+
+    original = simulator_module.export_simulation_to_simple_data
+    simulator_module.export_simulation_to_simple_data = interrupt
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            config = SimulationConfig(total_spins=2000, seed=13, max_memory_mb=1)
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    GameSimulator().run_simulation_with_json_export(config, output_dir=directory)
+                assert False, "應拋出 KeyboardInterrupt"
+            except KeyboardInterrupt:
+                pass
+            assert not any(filename.startswith(".spin_records_") for filename in os.listdir(directory))
+    finally:
+        simulator_module.export_simulation_to_simple_data = original
+    print("✓ 中斷時刪除溢出暫存檔")
+
+
+def test_memory_benchmarks():
+    """測試各模擬的記憶體量測、子進程量測與超過上限時返回 1"""
+    for name in RUNS:
+        result = measure_run(name, 2000, max_memory_mb=1, trace=name != "json_export")
+        assert result.spins == 2000 and result.structures
+        assert all(size >= 0 for size in result.structures.values())
+        assert "rss_peak_delta" in result.bytes_per_spin()
+    assert result.spilled and result.structures["spill_file"] > 0 and result.structures["output_files"] > 0
+
+    isolated = run_memory_benchmarks(["basic_simulation"], [1000], trace=False, verbose=False)
+    assert isolated[0].rss_peak > 0 and isolated[0].traced_peak is None
+
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, "memory.json")
+        arguments = ["--runs", "basic_simulation", "--spins", "1000", "--no-trace", "--output", output]
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert memory_main(arguments + ["--max-memory-mb", "4096"]) == 0
+            assert memory_main(arguments + ["--max-memory-mb", "1"]) == 1
+        with open(output, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    assert data["max_memory_mb"] == 1
+    assert "evaluation_cache" in data["results"][0]["bytes_per_spin"]
+    print("✓ 記憶體基準測試量測各結構並檢查上限")
+
+
+if __name__ == "__main__":
+    test_budget_and_measurement()
+    test_spill_buffer()
+    test_streaming_exporters_match_full_dump()
+    test_json_export_spills_under_budget()
+    test_spill_file_removed_on_interrupt()
+    test_memory_benchmarks()
+    print("\n🎉 記憶體預算測試通過！")
@@ -0,0 +1,59 @@
+"""
+分片平行模擬測試 - 驗證分片計畫、合併結果與工作進程數無關
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from simulation.parallel import ShardPlan
+from simulation.simulator import GameSimulator, SimulationConfig, SimulationResult
+
+
+def test_shard_plan():
+    """測試分片切分與分片種子固定"""
+    plan = ShardPlan(total_spins=25000, shard_size=10000)
+    assert plan.shard_spins == [10000, 10000, 5000]
+
+    config = SimulationConfig(total_spins=25000, seed=7)
+    first = plan.shard_configs(config)
+    second = plan.shard_configs(config)
+    assert [shard.total_spins for shard in first] == plan.shard_spins
+    assert [shard.seed.generate_state(2).tolist() for shard in first] == \
+        [shard.seed.generate_state(2).tolist() for shard in second]
+    print("✓ 分片計畫固定")
+
+
+def test_merged_result_independent_of_workers():
+    """測試相同主種子與分片計畫下，單進程與多進程合併結果相同"""
+    simulator = GameSimulator()
+    config = SimulationConfig(total_spins=12000, seed=2024, auto_buy_threshold=0.02)
+
+    serial = simulator.run_parallel_simulation(config, workers=1, shard_size=3000)
+    parallel = simulator.run_parallel_simulation(config, workers=3, shard_size=3000)
+
+    for field in ("total_spins", "total_bet", "total_win", "feature_triggers", "feature_buys", "biggest_win"):
+        assert getattr(serial, field) == getattr(parallel, field)
+    assert serial.total_spins == 12000
+    print(f"✓ 合併結果與工作進程數無關 (RTP {parallel.rtp_percentage:.2f}%)")
+
+
+def test_merge_recomputes_rates():
+    """測試合併時比率由總額重新計算"""
+    shards = [
+        SimulationResult(100, 5000, 4000, -1000, 1, 0, 900, 80.0, 0.01, 40.0, 1.0),
+        SimulationResult(300, 15000, 18000, 3000, 2, 1, 2500, 120.0, 0.0067, 60.0, 2.0)
+    ]
+    merged = SimulationResult.merge(shards)
+
+    assert merged.total_spins == 400 and merged.total_win == 22000
+    assert merged.rtp_percentage == 22000 / 20000 * 100
+    assert merged.biggest_win == 2500 and merged.simulation_time == 3.0
+    print("✓ 合併比率正確")
+
+
+if __name__ == "__main__":
+    test_shard_plan()
+    test_merged_result_independent_of_workers()
+    test_merge_recomputes_rates()
+    print("\n🎉 分片平行模擬測試通過！")
@@ -0,0 +1,105 @@
+"""
+分位數草圖測試 - 驗證精確區間、相對誤差、批量加入與合併
+"""
+
+import sys
+import os
+import contextlib
+import io
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from simulation.statistics import QuantileSketch, StatisticsAnalyzer, percentiles_from_sorted
+from simulation.simulator import GameSimulator, SimulationConfig, SimulationResult
+
+PERCENTILES = [1, 10, 25, 50, 75, 90, 95, 99, 99.9]
+
+
+def test_exact_for_small_integers():
+    """測試小於 exact_limit 的整數 (含負值) 百分位數與排序結果相同"""
+    generator = np.random.default_rng(1)
+    data = generator.integers(-500, 1000, size=20000).tolist()
+
+    sketch = QuantileSketch()
+    for value in data:
+        sketch.add(value)
+
+    assert sketch.percentiles(PERCENTILES) == percentiles_from_sorted(sorted(data), PERCENTILES)
+    assert sketch.min_value == min(data) and sketch.max_value == max(data)
+    print("✓ 小整數百分位數精確")
+
+
+def test_relative_error_for_large_values():
+    """測試長尾數據的百分位數相對誤差不超過 relative_accuracy"""
+    generator = np.random.default_rng(2)
+    data = (generator.pareto(1.2, size=50000) * 2000).astype(np.int64)
+
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    sketch.add_array(data)
+    expected = percentiles_from_sorted(np.sort(data).tolist(), PERCENTILES)
+
+    for p, value in sketch.percentiles(PERCENTILES).items():
+        assert abs(value - expected[p]) <= 0.01 * abs(expected[p]) + 1e-9, (p, value, expected[p])
+    print("✓ 長尾數據相對誤差在容許範圍內")
+
+
+def test_add_array_and_merge_match_single_sketch():
+    """測試批量加入與分片合併結果與逐一加入相同"""
+    generator = np.random.default_rng(3)
+    data = (generator.standard_cauchy(size=30000) * 3000).astype(np.int64)
+
+    single = QuantileSketch()
+    for value in data.tolist():
+        single.add(value)
+
+    merged = QuantileSketch()
+    for chunk in np.array_split(data, 4):
+        shard = QuantileSketch()
+        shard.add_array(chunk)
+        merged.merge(shard)
+
+    assert merged.positive_bins == single.positive_bins
+    assert merged.negative_bins == single.negative_bins
+    assert merged.count == single.count and merged.total == single.total
+
+    try:
+        merged.merge(QuantileSketch(relative_accuracy=0.02))
+        assert False, "參數不同應拋出 ValueError"
+    except ValueError:
+        pass
+    print("✓ 批量加入與合併結果一致")
+
+
+def test_simulation_results_carry_sketch():
+    """測試模擬結果帶有贏分草圖且合併後可分析分布"""
+    simulator = GameSimulator()
+    config = SimulationConfig(total_spins=2000, seed=4, feature_buy_enabled=False)
+    first = simulator.run_basic_simulation(config)
+    second = simulator.run_batch_simulation(SimulationConfig(total_spins=5000, seed=5))
+
+    assert first.win_sketch.count == 2000 and first.win_sketch.total == first.total_win
+    assert second.win_sketch.count == 5000 and second.win_sketch.max_value >= second.biggest_win
+
+    merged = SimulationResult.merge([first, second])
+    assert merged.win_sketch.count == 7000
+
+    distribution = StatisticsAnalyzer().analyze_sketch(merged.win_sketch)
+    assert distribution.max_win == max(first.win_sketch.max_value, second.win_sketch.max_value)
+    assert distribution.percentiles[10] <= distribution.median <= distribution.percentiles[99]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        exported, _ = simulator.run_simulation_with_json_export(SimulationConfig(total_spins=1000, seed=6),
+                                                                export_json=False)
+    assert exported.win_sketch.total == exported.total_win
+    assert exported.win_sketch.max_value == exported.biggest_win
+    assert "win_percentiles" in exported.to_dict()
+    print(f"✓ 模擬結果草圖可合併 (P99 {distribution.percentiles[99]:.0f})")
+
+
+if __name__ == "__main__":
+    test_exact_for_small_integers()
+    test_relative_error_for_large_values()
+    test_add_array_and_merge_match_single_sketch()
+    test_simulation_results_carry_sketch()
+    print("\n🎉 分位數草圖測試通過！")
@@ -0,0 +1,123 @@
+"""
+滾輪控制器測試 - 驗證視窗索引查詢、均勻選擇與結果驗證
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.game_engine import GameEngine
+from core.reel_controller import ReelController, ReelState
+from core.rng import RandomStream
+
+
+def test_stop_index_matches_linear_search():
+    """測試索引與逐一比對起始位置的結果相同 (含首尾相接的視窗)"""
+    engine = GameEngine()
+    controller = ReelController(engine.config, engine.model, RandomStream(61))
+
+    for reel_idx, strip in enumerate(controller.reel_strips):
+        for start_pos in range(len(strip)):
+            window = [strip[(start_pos + i) % len(strip)] for i in range(3)]
+            expected = [pos for pos in range(len(strip))
+                        if [strip[(pos + i) % len(strip)] for i in range(3)] == window]
+            assert controller.find_stop_positions(reel_idx, window) == expected
+    print("✓ 視窗索引與線性搜尋一致")
+
+
+def test_set_reel_strips_rebuilds_index():
+    """測試設定條帶後索引重建，並可驗證引擎結果"""
+    engine = GameEngine(rng=RandomStream(62))
+    controller = ReelController.from_engine(engine, RandomStream(63))
+
+    for _ in range(200):
+        reel_result = engine._generate_reel_result()
+        assert controller.validate_target_result(reel_result)
+        controller.start_spin(reel_result)
+        assert controller.get_current_symbols() == reel_result
+
+    assert not controller.validate_target_result([[10, 10, 10]] * 5)
+    print("✓ 條帶更新後索引重建")
+
+
+def test_default_strips_match_engine():
+    """測試未設定條帶時使用引擎的滾輪條帶，BONUS 機率與引擎的視窗表一致"""
+    engine = GameEngine()
+    controller = ReelController(engine.config, engine.model, RandomStream(66))
+    assert controller.reel_strips == engine.reel_strips
+
+    reel_probabilities = [sum(1 for count in reel.bonus_counts if count > 0) / reel.stop_count
+                          for reel in engine.reel_tables.reels]
+    assert controller.bonus_probabilities == reel_probabilities
+    assert ReelController.from_engine(engine).reel_strips is engine.reel_strips
+    print("✓ 預設條帶與引擎一致")
+
+
+def test_uniform_stop_choice():
+    """測試多個符合位置時可均勻選擇"""
+    engine = GameEngine()
+    controller = ReelController(engine.config, engine.model, RandomStream(64))
+    controller.set_reel_strips([[1, 2, 3, 1, 2, 3]] * 5)
+
+    positions = controller.find_stop_positions(0, [1, 2, 3])
+    assert positions == [0, 3]
+    assert controller.choose_stop_position(0, [1, 2, 3]) == 0
+    chosen = {controller.choose_stop_position(0, [1, 2, 3], uniform=True) for _ in range(100)}
+    assert chosen == {0, 3}
+    print("✓ 均勻選擇停止位置")
+
+
+def test_exact_trigger_probability():
+    """測試觸發機率等於各輪 BONUS 機率的乘積，並依已停止的滾輪調整"""
+    engine = GameEngine()
+    controller = ReelController.from_engine(engine, RandomStream(65))
+
+    reel_probabilities = [sum(1 for count in reel.bonus_counts if count > 0) / reel.stop_count
+                          for reel in engine.reel_tables.reels[:3]]
+    assert controller.bonus_probabilities[:3] == reel_probabilities
+
+    symbols = [[9, 1, 2], [3, 9, 4], [5, 6, 7], [1, 2, 3], [4, 5, 6]]
+    prediction = controller.predict_feature_trigger(symbols)
+    expected = reel_probabilities[0] * reel_probabilities[1] * reel_probabilities[2]
+    assert abs(prediction["trigger_probability"] - expected) < 1e-15
+
+    controller.reel_states = [ReelState.STOPPED, ReelState.STOPPED] + [ReelState.SPINNING] * 3
+    assert controller.predict_feature_trigger(symbols)["trigger_probability"] == reel_probabilities[2]
+    assert controller.check_slow_motion_trigger(symbols)[2]
+
+    symbols[1] = [3, 4, 5]
+    assert controller.predict_feature_trigger(symbols)["trigger_probability"] == 0.0
+    assert not controller.check_slow_motion_trigger(symbols)[2]
+    print(f"✓ 精確觸發機率 {expected:.6f}")
+
+
+def test_slow_motion_uses_conditional_probability():
+    """測試慢動作依已停止滾輪下的條件觸發機率判斷，而非僅檢查前兩輪是否有 BONUS"""
+    engine = GameEngine()
+    controller = ReelController.from_engine(engine, RandomStream(67))
+    assert controller.check_slow_motion_trigger([[9, 1, 2], [3, 4, 5]] + [[1, 2, 3]] * 3) == [False] * 5
+
+    # 第2、3輪 BONUS 機率高：第一輪出現 BONUS 後第二輪即慢動作
+    rich = [9, 1, 2, 3, 9, 1, 2, 3]
+    controller.set_reel_strips([[9, 1, 2, 3, 4, 5], rich, rich, [1, 2, 3], [1, 2, 3]])
+    assert controller.bonus_probabilities[1:3] == [4 / 6, 4 / 6]
+    flags = controller.check_slow_motion_trigger([[9, 1, 2], [1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3]])
+    assert flags == [False, True, False, False, False]
+    assert controller.check_slow_motion_trigger([[9, 1, 2], [9, 1, 2], [1, 2, 3], [1, 2, 3], [1, 2, 3]])[2]
+
+    # 第三輪 BONUS 機率低於門檻：前兩輪皆有 BONUS 也不觸發
+    sparse = [9] + [1, 2, 3, 4] * 9 + [5, 6, 7]
+    controller.set_reel_strips([rich, rich, sparse, [1, 2, 3], [1, 2, 3]])
+    assert 0 < controller.bonus_probabilities[2] < ReelController.SLOW_MOTION_MIN_PROBABILITY
+    assert not any(controller.check_slow_motion_trigger([[9, 1, 2], [9, 1, 2], [1, 2, 3], [1, 2, 3], [1, 2, 3]]))
+    print("✓ 慢動作依條件觸發機率判斷")
+
+
+if __name__ == "__main__":
+    test_stop_index_matches_linear_search()
+    test_set_reel_strips_rebuilds_index()
+    test_default_strips_match_engine()
+    test_uniform_stop_choice()
+    test_exact_trigger_probability()
+    test_slow_motion_uses_conditional_probability()
+    print("\n🎉 滾輪控制器測試通過！")
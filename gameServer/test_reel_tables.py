@@ -0,0 +1,69 @@
+"""
+滾輪視窗表測試 - 驗證查表結果與逐格掃描一致
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.game_engine import GameEngine
+from core.rng import RandomStream
+
+
+def test_windows_match_strips():
+    """測試每個停止位置的視窗、數量與 BONUS 旗標與條帶一致"""
+    engine = GameEngine()
+    model = engine.model
+
+    for reel_idx, reel in enumerate(engine.reel_tables.reels):
+        strip = engine.reel_strips[reel_idx]
+        assert reel.stop_count == len(strip) - model.reel_height + 1
+        for stop in range(reel.stop_count):
+            window = strip[stop:stop + model.reel_height]
+            assert list(reel.windows[stop]) == window
+            assert reel.bonus_counts[stop] == window.count(model.scatter_id)
+            for symbol_id in model.ways_symbol_ids:
+                expected = sum(1 for symbol in window if symbol in (symbol_id, model.wild_id))
+                assert reel.symbol_counts[stop][symbol_id] == expected
+    print("✓ 視窗表與條帶一致")
+
+
+def test_table_evaluation_matches_cell_scan():
+    """測試查表贏分 (含位置) 與逐格計算完全相同"""
+    engine = GameEngine(rng=RandomStream(21))
+    calculator = engine.win_calculator
+
+    for _ in range(5000):
+        stops = engine._generate_stops()
+        reel_result = engine.reel_tables.reel_result(stops)
+        assert calculator.calculate_243_ways_at(engine.reel_tables, stops) == calculator.calculate_243_ways(reel_result)
+        assert engine.reel_tables.is_feature_trigger(stops) == engine._check_feature_trigger(reel_result)[0]
+    print("✓ 查表贏分與逐格計算一致")
+
+
+def test_spin_result_carries_stop_positions():
+    """測試旋轉結果帶有實際停止位置，且與條帶視窗對應 (免費旋轉標記為變換前的位置)"""
+    engine = GameEngine(rng=RandomStream(22))
+    p_ids = engine.symbol_transformer.p_symbol_id_set
+
+    for _ in range(500):
+        result = engine.spin()
+        assert [engine.reel_strips[reel_idx][stop:stop + 3]
+                for reel_idx, stop in enumerate(result.stop_positions)] == result.reel_result
+        assert not result.symbols_transformed
+
+    engine.free_spins_remaining = 3
+    for _ in range(3):
+        result = engine.spin_free_game()
+        assert result.symbols_transformed
+        for reel_idx, stop in enumerate(result.stop_positions):
+            for original, shown in zip(engine.reel_strips[reel_idx][stop:stop + 3], result.reel_result[reel_idx]):
+                assert original == shown or (original in p_ids and shown in p_ids)
+    print("✓ 旋轉結果帶有停止位置")
+
+
+if __name__ == "__main__":
+    test_windows_match_strips()
+    test_table_evaluation_matches_cell_scan()
+    test_spin_result_carries_stop_positions()
+    print("\n🎉 滾輪視窗表測試通過！")
@@ -0,0 +1,78 @@
+"""
+隨機數流測試 - 驗證可重現性、子流獨立性與引擎注入
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.rng import RandomStream
+from core.game_engine import GameEngine
+from features.war_drums import WarDrumsFeature
+from simulation.simulator import GameSimulator, SimulationConfig
+
+
+def test_stream_reproducible():
+    """測試相同種子產生相同序列，純量與區塊抽取皆可重現"""
+    first = RandomStream(123)
+    second = RandomStream(123)
+
+    assert [first.randint(1, 10) for _ in range(10000)] == [second.randint(1, 10) for _ in range(10000)]
+    assert first.integers(0, 38, size=100).tolist() == second.integers(0, 38, size=100).tolist()
+
+    values = [first.randint(1, 10) for _ in range(10000)]
+    assert min(values) == 1 and max(values) == 10
+    print("✓ 隨機數流可重現")
+
+
+def test_spawned_streams_independent():
+    """測試子流彼此不同且可由主種子重現"""
+    children = RandomStream(99).spawn(3)
+    again = RandomStream(99).spawn(3)
+
+    draws = [child.uniform(5).tolist() for child in children]
+    assert draws[0] != draws[1] != draws[2]
+    assert draws == [child.uniform(5).tolist() for child in again]
+    print("✓ 子流獨立且可重現")
+
+
+def test_philox_generator():
+    """測試計數器型生成器"""
+    stream = RandomStream(5, bit_generator="Philox")
+    assert stream.spawn(1)[0].bit_generator_name == "Philox"
+    assert 0.0 <= stream.random() < 1.0
+    print("✓ Philox 生成器可用")
+
+
+def test_engine_and_features_use_injected_stream():
+    """測試引擎與戰鼓使用注入的隨機數流"""
+    engine_a = GameEngine(rng=RandomStream(2024))
+    engine_b = GameEngine(rng=RandomStream(2024))
+    results_a = [engine_a.spin().reel_result for _ in range(200)]
+    results_b = [engine_b.spin().reel_result for _ in range(200)]
+    assert results_a == results_b
+
+    drums_a = WarDrumsFeature({}, RandomStream(1))
+    drums_b = WarDrumsFeature({}, RandomStream(1))
+    assert [drums_a._roll_single_drum() for _ in range(100)] == [drums_b._roll_single_drum() for _ in range(100)]
+    print("✓ 引擎與戰鼓使用注入的隨機數流")
+
+
+def test_simulation_seed_reproducible():
+    """測試模擬器種子可重現完整模擬"""
+    config = SimulationConfig(total_spins=2000, seed=42)
+    first = GameSimulator().run_basic_simulation(config)
+    second = GameSimulator().run_basic_simulation(config)
+
+    assert first.total_win == second.total_win
+    assert first.feature_buys == second.feature_buys
+    print(f"✓ 模擬可重現 (RTP {first.rtp_percentage:.2f}%)")
+
+
+if __name__ == "__main__":
+    test_stream_reproducible()
+    test_spawned_streams_independent()
+    test_philox_generator()
+    test_engine_and_features_use_injected_stream()
+    test_simulation_seed_reproducible()
+    print("\n🎉 隨機數流測試通過！")
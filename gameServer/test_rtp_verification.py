@@ -0,0 +1,116 @@
+"""
+序貫 RTP 驗證測試 - 驗證比率估計量變異數、提前停止與時間預算
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from simulation.estimators import RatioEstimator
+from simulation.simulator import GameSimulator, SimulationConfig, SimulationResult
+from simulation.sinks import BufferSink
+
+
+def test_ratio_estimator_variance():
+    """測試累計變異數與直接由樣本計算的 delta method 結果一致"""
+    generator = np.random.default_rng(3)
+    bets = generator.choice([50, 3000, 5000], size=5000, p=[0.98, 0.01, 0.01])
+    wins = (generator.pareto(1.5, size=5000) * 20).astype(np.int64)
+
+    estimator = RatioEstimator()
+    estimator.add_block(bets[:2000], wins[:2000])
+    other = RatioEstimator()
+    for bet, win in zip(bets[2000:], wins[2000:]):
+        other.add(int(bet), int(win))
+    estimator.merge(other)
+
+    ratio = wins.sum() / bets.sum()
+    residuals = wins - ratio * bets
+    expected = residuals.var(ddof=1) / (len(bets) * bets.mean() ** 2)
+
+    assert estimator.count == 5000
+    assert abs(estimator.ratio - ratio) < 1e-12
+    assert abs(estimator.variance - expected) / expected < 1e-9
+    lower, upper = estimator.confidence_interval(0.95)
+    assert abs((upper - lower) / 2 - 1.959964 * expected ** 0.5) < 1e-6
+    print("✓ 比率估計量變異數正確")
+
+
+def test_fixed_spin_interval_uses_ratio_estimator():
+    """測試固定次數驗證的信賴區間以比率估計量計算 (含押注變異)，分片合併一致，上限不截斷於 100%"""
+    simulator = GameSimulator()
+    sink = BufferSink()
+    result = simulator.run_basic_simulation(SimulationConfig(total_spins=5000, seed=21, auto_buy_threshold=0.05),
+                                            sink)
+    bets = np.array([record["bet_amount"] for record in sink.records], dtype=np.int64)
+    wins = np.array([record["win_amount"] for record in sink.records], dtype=np.int64)
+    ratio = wins.sum() / bets.sum()
+    expected_se = ((wins - ratio * bets).var(ddof=1) / (len(bets) * bets.mean() ** 2)) ** 0.5
+
+    interval = simulator._calculate_rtp_confidence_interval(result)
+    assert result.ratio_estimator.count == len(bets) == result.total_spins
+    assert abs(interval["margin_of_error"] - 1.959964 * expected_se * 100) < 1e-4
+    assert abs((interval["lower"] + interval["upper"]) / 2 - result.rtp_percentage) < 1e-9
+
+    config = SimulationConfig(total_spins=4000, seed=22)
+    merged = simulator.run_parallel_simulation(config, shard_size=1000)
+    assert merged.ratio_estimator.count == 4000
+    assert merged.ratio_estimator.sum_win == merged.total_win
+    assert merged.ratio_estimator.sum_bet == merged.total_bet
+
+    estimator = RatioEstimator()
+    for win in (0, 0, 400, 0, 60):
+        estimator.add(50, win)
+    lucky = SimulationResult(5, 250, 460, 210, 0, 0, 400, 184.0, 0.0, 92.0, 0.0, ratio_estimator=estimator)
+    interval = simulator._calculate_rtp_confidence_interval(lucky)
+    assert interval["upper"] > 184.0 > 100
+    print(f"✓ 固定次數信賴區間 ±{simulator._calculate_rtp_confidence_interval(result)['margin_of_error']:.2f}%")
+
+
+def test_sequential_stops_on_precision():
+    """測試信賴區間半寬達到容差時提前停止"""
+    simulator = GameSimulator()
+    result = simulator.run_rtp_verification(
+        sequential=True, tolerance=3.0, max_spins=2000000, seed=11
+    )
+
+    assert result["stop_reason"] == "converged"
+    assert result["spins_used"] < 2000000
+    assert result["achieved_precision"] <= 3.0
+    interval = result["confidence_interval"]
+    assert interval["lower"] < result["actual_rtp"] < interval["upper"]
+    print(f"✓ 提前停止 ({result['spins_used']} 次，±{result['achieved_precision']:.2f}%)")
+
+
+def test_sequential_time_budget():
+    """測試超過時間預算即停止"""
+    simulator = GameSimulator()
+    result = simulator.run_sequential_rtp_verification(
+        tolerance=0.001, max_spins=10000000, block_size=20000, time_budget=0.0, seed=5
+    )
+
+    assert result["stop_reason"] == "time_budget"
+    assert result["spins_used"] == 20000
+    print("✓ 時間預算停止")
+
+
+def test_sequential_reproducible():
+    """測試相同種子結果相同"""
+    first = GameSimulator().run_sequential_rtp_verification(max_spins=60000, block_size=20000, seed=9)
+    second = GameSimulator().run_sequential_rtp_verification(max_spins=60000, block_size=20000, seed=9)
+
+    assert first["stop_reason"] == "max_spins"
+    assert first["total_win"] == second["total_win"]
+    assert first["total_bet"] == second["total_bet"]
+    print("✓ 相同種子結果相同")
+
+
+if __name__ == "__main__":
+    test_ratio_estimator_variance()
+    test_fixed_spin_interval_uses_ratio_estimator()
+    test_sequential_stops_on_precision()
+    test_sequential_time_budget()
+    test_sequential_reproducible()
+    print("\n🎉 序貫 RTP 驗證測試通過！")
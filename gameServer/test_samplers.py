@@ -0,0 +1,83 @@
+"""
+別名法抽樣器測試 - 驗證抽樣分布與符號變換、戰鼓的使用
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.game_engine import GameEngine
+from core.rng import RandomStream
+from core.samplers import AliasSampler
+from features.war_drums import WarDrumsFeature
+
+
+def test_alias_table_reproduces_weights():
+    """測試別名表還原的機率與權重一致"""
+    weights = [25, 20, 20, 15, 10, 0, 7]
+    sampler = AliasSampler(list(range(len(weights))), weights)
+    total = sum(weights)
+
+    for probability, weight in zip(sampler.probabilities(), weights):
+        assert abs(probability - weight / total) < 1e-12
+    print("✓ 別名表機率與權重一致")
+
+
+def test_sample_frequencies():
+    """測試單次與批量抽樣的頻率接近權重"""
+    sampler = AliasSampler(["a", "b", "c"], [1, 2, 7])
+    rng = RandomStream(41)
+
+    batch = sampler.sample(rng, 200000).tolist()
+    single = [sampler.sample(rng) for _ in range(200000)]
+    for samples in (batch, single):
+        assert abs(samples.count("c") / len(samples) - 0.7) < 0.01
+        assert abs(samples.count("a") / len(samples) - 0.1) < 0.01
+    print("✓ 抽樣頻率接近權重")
+
+
+def test_sample_list_paths():
+    """測試少量樣本沿用純量路徑，大量樣本使用向量化路徑"""
+    sampler = AliasSampler([1, 2, 10], [5, 3, 2])
+    small = sampler.sample_list(RandomStream(44), 5)
+    rng = RandomStream(44)
+    assert small == [sampler.sample(rng) for _ in range(5)]
+
+    k = AliasSampler.VECTORIZE_THRESHOLD * 1000
+    large = sampler.sample_list(RandomStream(45), k)
+    assert large == sampler.sample(RandomStream(45), k).tolist()
+    assert isinstance(large, list) and type(large[0]) is int
+    assert abs(large.count(1) / k - 0.5) < 0.01
+    print("✓ sample_list 依樣本數選擇抽樣路徑")
+
+
+def test_transformer_and_drums_use_sampler():
+    """測試符號變換只改變 P 系列符號，戰鼓倍率在設定範圍內"""
+    engine = GameEngine(rng=RandomStream(42))
+    transformer = engine.symbol_transformer
+    p_ids = transformer.p_symbol_id_set
+
+    for _ in range(500):
+        reel_result = engine._generate_reel_result()
+        transformed = transformer.transform_symbols(reel_result)
+        for original_reel, transformed_reel in zip(reel_result, transformed):
+            for original, new in zip(original_reel, transformed_reel):
+                assert (new in p_ids) if original in p_ids else (new == original)
+
+    drums = WarDrumsFeature(engine.config, RandomStream(43))
+    drums.set_active_drums(3)
+    results = drums.roll_drums()
+    assert len(results) == 3 and all(1 <= drum.multiplier <= 10 for drum in results)
+
+    distribution = drums.simulate_drums_distribution(20000)["multiplier_distribution"]
+    for multiplier, weight in drums.multiplier_weights.items():
+        assert abs(distribution[multiplier] - weight) < 0.01
+    print("✓ 符號變換與戰鼓使用別名抽樣")
+
+
+if __name__ == "__main__":
+    test_alias_table_reproduces_weights()
+    test_sample_frequencies()
+    test_sample_list_paths()
+    test_transformer_and_drums_use_sampler()
+    print("\n🎉 別名法抽樣器測試通過！")
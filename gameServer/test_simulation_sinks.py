@@ -0,0 +1,70 @@
+"""
+模擬紀錄輸出測試 - 驗證預設串流彙總與可選的逐次紀錄輸出
+"""
+
+import sys
+import os
+import json
+import tempfile
+import tracemalloc
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from simulation.simulator import GameSimulator, SimulationConfig
+from simulation.sinks import BufferSink, CallbackSink, JsonLinesSink
+
+
+def test_default_keeps_no_spin_records():
+    """測試預設不保留逐次紀錄，記憶體不隨旋轉數成長"""
+    simulator = GameSimulator()
+    simulator.game_engine.evaluation_cache_size = 500  # 快取與歷史紀錄皆為固定上限
+    simulator.run_basic_simulation(SimulationConfig(total_spins=2000, seed=1, feature_buy_enabled=False))
+
+    tracemalloc.start()
+    simulator.run_basic_simulation(SimulationConfig(total_spins=5000, seed=2, feature_buy_enabled=False))
+    _, small_peak = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    simulator.run_basic_simulation(SimulationConfig(total_spins=20000, seed=3, feature_buy_enabled=False))
+    _, large_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert simulator.detailed_logs == []
+    assert large_peak < small_peak * 2
+    print(f"✓ 串流模式峰值記憶體 {small_peak / 1024:.0f} KB / {large_peak / 1024:.0f} KB")
+
+
+def test_buffer_and_callback_sinks():
+    """測試有界緩衝與回呼輸出"""
+    simulator = GameSimulator()
+    config = SimulationConfig(total_spins=3000, seed=4)
+
+    buffer = BufferSink(max_records=100)
+    result = simulator.run_basic_simulation(config, sink=buffer)
+    assert len(buffer.records) == 100 and buffer.total_records == 3000
+    assert buffer.records[-1]["spin_number"] == 3000
+    assert len(simulator.detailed_logs) == 1
+
+    wins = []
+    again = simulator.run_basic_simulation(config, sink=CallbackSink(lambda record: wins.append(record["win_amount"])))
+    assert len(wins) == 3000 and sum(wins) == again.total_win == result.total_win
+    print("✓ 有界緩衝與回呼輸出正確")
+
+
+def test_json_lines_sink():
+    """測試 JSON Lines 檔案輸出"""
+    simulator = GameSimulator()
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "spins", "records.jsonl")
+        with JsonLinesSink(filename) as sink:
+            simulator.run_basic_simulation(SimulationConfig(total_spins=500, seed=5), sink=sink)
+
+        with open(filename, encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+    assert len(records) == 500 and records[0]["spin_number"] == 1
+    print("✓ JSON Lines 輸出正確")
+
+
+if __name__ == "__main__":
+    test_default_keeps_no_spin_records()
+    test_buffer_and_callback_sinks()
+    test_json_lines_sink()
+    print("\n🎉 模擬紀錄輸出測試通過！")
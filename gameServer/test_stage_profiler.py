@@ -0,0 +1,140 @@
+"""
+階段計時器測試 - 驗證執行期間切換、引擎各階段記錄、模擬輸出與 cProfile 旋轉範圍
+"""
+
+import sys
+import os
+import pstats
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.game_engine import GameEngine, SpinType
+from core.profiler import SpinRangeProfiler, StageProfiler
+from protocol.simple_data_exporter import SimpleDataExporter
+from simulation.simulator import GameSimulator, SimulationConfig, SimulationResult
+
+
+def test_profiler_runtime_switch():
+    """測試停用時不記錄、啟用後記錄，且可合併"""
+    profiler = StageProfiler()
+    profiler.stop("rng", profiler.start())
+    assert profiler.stages == {}
+
+    profiler.enable()
+    for _ in range(3):
+        profiler.stop("rng", profiler.start())
+    with profiler.measure("serialization"):
+        pass
+    started = profiler.start()
+    profiler.disable()
+    profiler.stop("rng", profiler.start())
+    profiler.stop("evaluation", started)
+
+    assert profiler.stages["rng"].calls == 3
+    assert profiler.stages["serialization"].calls == 1
+    assert profiler.stages["evaluation"].calls == 1  # 開始時為啟用狀態
+
+    other = StageProfiler(enabled=True)
+    other.stop("rng", other.start())
+    profiler.merge(other)
+    assert profiler.stages["rng"].calls == 4
+    assert "rng" in profiler.format_report(1.0)
+    print("✓ 計時器可於執行期間切換與合併")
+
+
+def test_engine_stages():
+    """測試引擎、贏分計算器與符號變換器共用計時器並記錄各階段"""
+    engine = GameEngine()
+    engine.player_credit = 10000000
+    engine.profiler.enable()
+    assert engine.win_calculator.profiler is engine.profiler
+    assert engine.symbol_transformer.profiler is engine.profiler
+
+    for _ in range(50):
+        engine.spin()
+    engine.spin(SpinType.FEATURE_BUY_100X)
+    engine.spin_batch(100)
+
+    stages = engine.profiler.stages
+    assert stages["spin"].calls == 50
+    assert stages["free_spin"].calls == 1
+    assert stages["spin_batch"].calls == 1
+    assert stages["transformation"].calls == 1
+    assert stages["rng"].calls >= 52
+    assert stages["lookup"].calls == 52
+    assert stages["evaluation"].calls >= 2
+
+    profiler = StageProfiler(enabled=True)
+    engine.set_profiler(profiler)
+    engine.spin()
+    assert profiler.stages["spin"].calls == 1
+    assert stages["spin"].calls == 50
+    print("✓ 引擎各階段記錄正確")
+
+
+def test_exporter_serialization_stage():
+    """測試輸出器記錄 serialization 階段"""
+    profiler = StageProfiler(enabled=True)
+    exporter = SimpleDataExporter(profiler)
+    exporter.add_result({"module_id": "BS", "player_balance": 1000, "rng": [1, 2, 3, 4, 5],
+                         "total_win": 0, "win_lines": []})
+    with tempfile.TemporaryDirectory() as directory:
+        exporter.export_to_json(os.path.join(directory, "results.json"))
+
+    assert profiler.stages["serialization"].calls == 2
+    print("✓ 輸出器記錄序列化階段")
+
+
+def test_simulation_profile_and_spin_range():
+    """測試模擬輸出階段用時並以 cProfile 分析指定旋轉範圍"""
+    simulator = GameSimulator()
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, "profiles", "spins.pstats")
+        config = SimulationConfig(total_spins=2000, seed=3, auto_buy_threshold=0.0, profile=True,
+                                  profile_spin_range=(100, 300), profile_output=output)
+        result = simulator.run_basic_simulation(config)
+
+        assert os.path.exists(output)
+        stats = pstats.Stats(output)
+        spin_calls = [calls for (filename, _, name), (calls, *_rest) in stats.stats.items()
+                      if name == "spin" and filename.endswith("game_engine.py")]
+        assert spin_calls == [200]
+
+    stages = result.stage_profile.stages
+    free_spins = stages["free_spin"].calls if "free_spin" in stages else 0
+    assert stages["spin"].calls + free_spins == 2000
+    assert not simulator.profiler.enabled
+    data = result.to_dict()
+    assert data["stage_profile"]["evaluation"]["calls"] > 0
+
+    second = simulator.run_batch_simulation(SimulationConfig(total_spins=20000, seed=4, profile=True))
+    merged = SimulationResult.merge([second, second])
+    assert merged.stage_profile.stages["spin_batch"].calls == 2 * second.stage_profile.stages["spin_batch"].calls
+
+    plain = simulator.run_basic_simulation(SimulationConfig(total_spins=100, seed=5))
+    assert plain.stage_profile is None
+    print("✓ 模擬輸出階段用時與 cProfile 旋轉範圍")
+
+
+def test_spin_range_validation():
+    """測試無效的旋轉範圍"""
+    try:
+        SpinRangeProfiler(10, 10, "unused.pstats")
+        assert False, "應拋出 ValueError"
+    except ValueError:
+        pass
+
+    profiler = SpinRangeProfiler(500, 600, "unused.pstats")
+    for index in range(100):
+        profiler.update(index)
+    assert profiler.finish() is None
+    print("✓ 旋轉範圍檢查")
+
+
+if __name__ == "__main__":
+    test_profiler_runtime_switch()
+    test_engine_stages()
+    test_exporter_serialization_stage()
+    test_simulation_profile_and_spin_range()
+    test_spin_range_validation()
+    print("\n🎉 階段計時器測試通過！")
@@ -0,0 +1,114 @@
+"""
+線上動差測試 - 驗證 Welford 更新、成對合併與模擬結果動差
+"""
+
+import sys
+import os
+import contextlib
+import io
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from simulation.estimators import StreamingMoments
+from simulation.simulator import GameSimulator, SimulationConfig, SimulationResult
+from simulation.sinks import BufferSink
+
+
+def reference_moments(data: np.ndarray):
+    """直接由完整數據計算平均、變異數、偏態與峰態"""
+    centered = data - data.mean()
+    m2 = (centered ** 2).sum()
+    return (data.mean(), m2 / (len(data) - 1),
+            np.sqrt(len(data)) * (centered ** 3).sum() / m2 ** 1.5,
+            len(data) * (centered ** 4).sum() / m2 ** 2 - 3)
+
+
+def test_online_and_merged_moments():
+    """測試逐一加入、批量加入與合併結果與完整數據計算一致"""
+    generator = np.random.default_rng(8)
+    data = generator.pareto(2.5, size=9000) * 100
+
+    online = StreamingMoments()
+    for value in data.tolist():
+        online.add(value)
+
+    merged = StreamingMoments()
+    for chunk in np.array_split(data, 7):
+        shard = StreamingMoments()
+        shard.add_array(chunk)
+        merged.merge(shard)
+
+    expected = reference_moments(data)
+    for moments in (online, merged):
+        actual = (moments.mean, moments.variance, moments.skewness, moments.kurtosis)
+        for value, reference in zip(actual, expected):
+            assert abs(value - reference) <= 1e-9 * max(1.0, abs(reference)), (value, reference)
+    assert merged.count == online.count == len(data)
+    print("✓ 線上與合併動差正確")
+
+
+def test_simulation_result_moments():
+    """測試模擬結果的動差與總額一致，且分片合併後保留"""
+    simulator = GameSimulator()
+    basic = simulator.run_basic_simulation(SimulationConfig(total_spins=3000, seed=21, auto_buy_threshold=0.02))
+    batch = simulator.run_batch_simulation(SimulationConfig(total_spins=5000, seed=22, auto_buy_threshold=0.02))
+
+    for result in (basic, batch):
+        assert result.win_moments.count == result.total_spins
+        assert abs(result.win_moments.mean * result.total_spins - result.total_win) < 1e-6 * result.total_win
+        assert abs(result.net_moments.mean * result.total_spins - result.net_result) < 1e-6 * abs(result.net_result)
+        assert result.feature_moments.count > 0
+        assert result.win_to_bet_std_dev > 0
+    assert batch.feature_moments.count >= batch.feature_buys
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        exported, _ = simulator.run_simulation_with_json_export(
+            SimulationConfig(total_spins=3000, seed=21, auto_buy_threshold=0.02), export_json=False)
+    assert abs(exported.win_moments.mean * exported.win_moments.count - exported.total_win) < 1e-6 * exported.total_win
+    assert exported.net_moments.count == exported.win_moments.count
+    assert exported.feature_moments.count > 0 and "feature_moments" in exported.to_dict()
+    # 相同種子下兩個逐次旋轉模擬共用累計邏輯，押注與各項動差相同
+    assert exported.total_bet == basic.total_bet
+    for name in SimulationResult.MOMENT_FIELDS:
+        assert getattr(exported, name).summary() == getattr(basic, name).summary()
+
+    merged = SimulationResult.merge([basic, batch])
+    assert merged.win_moments.count == 8000
+    assert "win_moments" in merged.to_dict() and "skewness" in merged.to_dict()["win_moments"]
+    print(f"✓ 模擬結果動差一致 (贏分/押注標準差 {basic.win_to_bet_std_dev:.2f})")
+
+
+def test_bought_rounds_include_first_free_spin():
+    """測試每次購買時，回合贏分包含購買旋轉 (第一次免費旋轉)，各回合贏分總和等於總贏分"""
+    simulator = GameSimulator()
+    config = SimulationConfig(total_spins=3000, seed=3, auto_buy_threshold=1.0, player_initial_credit=10 ** 12)
+    sink = BufferSink()
+    simulator.run_basic_simulation(config, sink)
+    # 截至最後一個完整回合結束，確保沒有未完成的回合
+    last_round_end = max(record["spin_number"] for record in sink.records if record["free_spins_remaining"] == 0)
+
+    config.total_spins = last_round_end
+    result = simulator.run_basic_simulation(config)
+    assert result.feature_moments.count == result.feature_buys
+    round_total = result.feature_moments.mean * result.feature_moments.count
+    assert abs(round_total - result.total_win) < 1e-9 * result.total_win
+    print(f"✓ 購買回合贏分完整 ({result.feature_buys} 回合)")
+
+
+def test_volatility_analysis_uses_moments():
+    """測試波動性分析由動差產生統計"""
+    analysis = GameSimulator().run_volatility_analysis(num_sessions=6, spins_per_session=300)
+
+    assert analysis["positive_sessions"] + analysis["break_even_sessions"] + analysis["negative_sessions"] == 6
+    assert analysis["max_loss"] <= analysis["mean_result"] <= analysis["max_win"]
+    assert analysis["spin_win_std_dev"] > 0
+    print("✓ 波動性分析不保留場次列表")
+
+
+if __name__ == "__main__":
+    test_online_and_merged_moments()
+    test_simulation_result_moments()
+    test_bought_rounds_include_first_free_spin()
+    test_volatility_analysis_uses_moments()
+    print("\n🎉 線上動差測試通過！")
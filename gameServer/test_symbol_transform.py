@@ -0,0 +1,64 @@
+"""
+整盤符號變換測試 - 驗證 transform_grid 的形狀、變換範圍與分布
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from core.game_engine import GameEngine
+from core.rng import RandomStream
+
+
+def test_transform_grid_shapes():
+    """測試平坦、單盤與批量陣列皆只變換 P 系列格子"""
+    engine = GameEngine(rng=RandomStream(51))
+    transformer = engine.symbol_transformer
+    stops = engine.rng.integers(0, np.array(engine.reel_tables.stop_counts), size=(2000, 5))
+    grids = engine.reel_tables.gather_windows(stops)
+
+    for grid in (grids, grids[0], grids[0].ravel()):
+        transformed = transformer.transform_grid(grid)
+        assert transformed.shape == grid.shape
+        p_cells = transformer.is_p_symbol[grid]
+        assert np.array_equal(transformed[~p_cells], grid[~p_cells])
+        assert transformer.is_p_symbol[transformed[p_cells]].all()
+    print("✓ 整盤變換形狀與範圍正確")
+
+
+def test_transform_grid_distribution():
+    """測試批量變換後 P 系列分布與變換權重一致"""
+    engine = GameEngine(rng=RandomStream(52))
+    transformer = engine.symbol_transformer
+    grids = np.full((20000, 5, 3), transformer.p_symbols["P1"])
+
+    transformed = transformer.transform_grid(grids)
+    total_weight = sum(transformer.transform_weights.values())
+    for name, weight in transformer.transform_weights.items():
+        frequency = (transformed == transformer.p_symbols[name]).mean()
+        assert abs(frequency - weight / total_weight) < 0.01
+    print("✓ 批量變換分布與權重一致")
+
+
+def test_transform_grid_rejects_invalid_ids():
+    """測試負數或超出符號表的 ID 拋出 ValueError，不會被視為 P 系列符號"""
+    transformer = GameEngine(rng=RandomStream(53)).symbol_transformer
+    for invalid in (-1, len(transformer.is_p_symbol)):
+        grid = np.full((5, 3), transformer.p_symbols["P1"])
+        grid[2, 1] = invalid
+        try:
+            transformer.transform_grid(grid)
+            assert False, "應拋出 ValueError"
+        except ValueError:
+            pass
+    assert transformer.transform_grid(np.zeros((0, 5, 3), dtype=np.int64)).shape == (0, 5, 3)
+    print("✓ 無效符號 ID 拋出 ValueError")
+
+
+if __name__ == "__main__":
+    test_transform_grid_shapes()
+    test_transform_grid_distribution()
+    test_transform_grid_rejects_invalid_ids()
+    print("\n🎉 整盤符號變換測試通過！")